@@ -0,0 +1,266 @@
+"""
+🌐 SERVIÇO HTTP HEADLESS - FutPrevisão
+Expõe os motores de predição sem Streamlit, a partir de um único processo aquecido.
+
+Uso:
+    python api_service.py                 # http://0.0.0.0:8080
+    python api_service.py --port 9000 --workers 8
+
+Endpoints:
+    GET  /health
+    POST /predict          {"home": "Arsenal", "away": "Chelsea", "referee": "A Taylor"}  (referee opcional)
+    POST /predict/batch    {"fixtures": [{"home": "...", "away": "..."}, ...]}
+    POST /lines            {"home": "Arsenal", "away": "Chelsea", "date": "DD/MM/YYYY"}  (date opcional: odds reais)
+    GET  /scan?date=DD/MM/YYYY&min_conf=70&min_prob=60&min_ev=10
+    GET  /metrics          (formato texto do Prometheus)
+
+Nomes de times passam pelo TeamResolver (apelidos e grafias aproximadas).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+from aiohttp import web
+
+from core.calibration import load_calibration
+from core.data_loader import data_version, load_all_data
+from core.metrics import registry as metrics_registry
+from core.odds import drop_version, line_market, load_odds
+from core.oraculo import OraculoSupreme
+from core.predict import PredictionEngineSupreme
+from core.referees import RefereeIndex
+from core.resolver import TeamResolver
+from core.seasons import open_history
+
+MAX_BATCH_SIZE = 500
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+
+class EngineState:
+    """Dados e motores compartilhados por todas as requisições, recarregados só quando os CSVs mudam"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+
+    def get(self) -> Dict:
+        version, odds_version = data_version(), drop_version()
+        state = self._state
+        if state is None or (state['version'], state['odds_version']) != (version, odds_version):
+            with self._lock:
+                if self._state is None or (self._state['version'], self._state['odds_version']) != (version, odds_version):
+                    df, calendar, refs, _ = load_all_data()
+                    predictor = PredictionEngineSupreme(df, history=open_history(), referees=RefereeIndex.load(df, refs),
+                                                        calibration=load_calibration(df), odds=load_odds(df))
+                    teams = set(df['HomeTeam'].dropna()) | set(df['AwayTeam'].dropna())
+                    self._state = {
+                        'version': version,
+                        'odds_version': odds_version,
+                        'df': df,
+                        'predictor': predictor,
+                        'oraculo': OraculoSupreme(df, refs, calendar, predictor),
+                        'resolver': TeamResolver(teams)
+                    }
+                    logging.info("Motores (re)carregados: %d jogos", len(df))
+                state = self._state
+        return state
+
+
+engine_state = EngineState()
+
+
+# ==============================================================================
+# OPERAÇÕES (síncronas, rodam no executor)
+# ==============================================================================
+
+def _resolve(state: Dict, home: str, away: str):
+    resolver = state['resolver']
+    return resolver.resolve(home or ''), resolver.resolve(away or '')
+
+
+def predict_fixture(home: str, away: str, referee: str = None) -> Dict:
+    state = engine_state.get()
+    home_team, away_team = _resolve(state, home, away)
+    if not home_team or not away_team:
+        return {'home': home, 'away': away, 'error': 'time não encontrado'}
+
+    predictor = state['predictor']
+    pred = predictor.predict_full(home_team, away_team, referee=referee)
+    if not pred:
+        return {'home': home_team, 'away': away_team, 'error': 'dados insuficientes'}
+
+    return {
+        'home': home_team,
+        'away': away_team,
+        'prediction': pred,
+        'smart_line': predictor.find_smart_line(pred)
+    }
+
+
+def predict_batch(fixtures: List[Dict]) -> List[Dict]:
+    state = engine_state.get()
+    predictor = state['predictor']
+    resolved = [_resolve(state, f.get('home'), f.get('away')) for f in fixtures]
+    known = [pair for pair in resolved if pair[0] and pair[1]]
+    predictions = iter(predictor.predict_batch(known))
+
+    results = []
+    for f, (home_team, away_team) in zip(fixtures, resolved):
+        if not home_team or not away_team:
+            results.append({'home': f.get('home'), 'away': f.get('away'), 'error': 'time não encontrado'})
+            continue
+        pred = next(predictions)
+        if not pred:
+            results.append({'home': home_team, 'away': away_team, 'error': 'dados insuficientes'})
+            continue
+        results.append({
+            'home': home_team,
+            'away': away_team,
+            'prediction': pred,
+            'smart_line': predictor.find_smart_line(pred)
+        })
+    return results
+
+
+def fixture_lines(home: str, away: str, date: str = None) -> Dict:
+    result = predict_fixture(home, away)
+    if 'error' in result:
+        return result
+    predictor = engine_state.get()['predictor']
+    lines = predictor.generate_all_lines(result['prediction'])
+    for line, odd in zip(lines, predictor.line_odds(result['home'], result['away'], date, lines)):
+        line['odd'] = None if np.isnan(odd) else round(float(odd), 2)
+    smart_line = predictor.find_smart_line(result['prediction'])
+    return {
+        'home': result['home'],
+        'away': result['away'],
+        'lines': lines,
+        'bookmaker_odds': predictor.get_bookmaker_odds(home=result['home'], away=result['away'], date=date,
+                                                       market=line_market(smart_line) if smart_line else None)
+    }
+
+
+def scan(date: str, min_conf: int, min_prob: float, min_ev: float) -> Dict:
+    opportunities = engine_state.get()['oraculo'].scan(date, min_conf, min_prob, min_ev)
+    return {'date': date, 'count': len(opportunities), 'opportunities': opportunities}
+
+
+# ==============================================================================
+# HTTP
+# ==============================================================================
+
+def _json(data, status: int = 200) -> web.Response:
+    # numpy.int64 etc. não são serializáveis por padrão
+    body = json.dumps(data, ensure_ascii=False, default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+    return web.Response(text=body, status=status, content_type='application/json')
+
+
+async def _run(request: web.Request, fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app['executor'], fn, *args)
+
+
+async def _body(request: web.Request) -> Optional[Dict]:
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, ValueError):
+        return None
+    return body if isinstance(body, dict) else None  # corpo precisa ser um objeto JSON
+
+
+def _valid_fixture(body, optional: tuple = ()) -> bool:
+    """Objeto com "home" e "away" em texto; os campos opcionais, se vierem, também em texto"""
+    return isinstance(body, dict) and \
+        all(isinstance(body.get(key), str) for key in ('home', 'away')) and \
+        all(body.get(key) is None or isinstance(body[key], str) for key in optional)
+
+
+async def health(request: web.Request) -> web.Response:
+    state = await _run(request, engine_state.get)
+    return _json({'status': 'ok', 'games': len(state['df']), 'files': len(state['version'])})
+
+
+async def predict(request: web.Request) -> web.Response:
+    body = await _body(request)
+    if not _valid_fixture(body, optional=('referee',)):
+        return _json({'error': 'informe "home" e "away" (e "referee", opcional) como texto'}, 400)
+    result = await _run(request, predict_fixture, body['home'], body['away'], body.get('referee'))
+    return _json(result, 404 if 'error' in result else 200)
+
+
+async def predict_batch_handler(request: web.Request) -> web.Response:
+    body = await _body(request)
+    fixtures = body.get('fixtures') if body else None
+    if not isinstance(fixtures, list) or not all(_valid_fixture(f) for f in fixtures):
+        return _json({'error': 'informe "fixtures": [{"home": ..., "away": ...}]'}, 400)
+    if len(fixtures) > MAX_BATCH_SIZE:
+        return _json({'error': f'máximo de {MAX_BATCH_SIZE} jogos por lote'}, 413)
+    results = await _run(request, predict_batch, fixtures)
+    return _json({'count': len(results), 'results': results})
+
+
+async def lines(request: web.Request) -> web.Response:
+    body = await _body(request)
+    if not _valid_fixture(body, optional=('date',)):
+        return _json({'error': 'informe "home" e "away" (e "date", opcional) como texto'}, 400)
+    result = await _run(request, fixture_lines, body['home'], body['away'], body.get('date'))
+    return _json(result, 404 if 'error' in result else 200)
+
+
+async def scan_handler(request: web.Request) -> web.Response:
+    query = request.query
+    if 'date' not in query:
+        return _json({'error': 'informe ?date=DD/MM/YYYY'}, 400)
+    try:
+        min_conf = int(query.get('min_conf', 70))
+        min_prob = float(query.get('min_prob', 60))
+        min_ev = float(query.get('min_ev', 10))
+    except ValueError:
+        return _json({'error': 'filtros numéricos inválidos'}, 400)
+    result = await _run(request, scan, query['date'], min_conf, min_prob, min_ev)
+    return _json(result)
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return web.Response(text=metrics_registry.to_prometheus(), content_type='text/plain', charset='utf-8')
+
+
+def create_app(workers: int = 4) -> web.Application:
+    app = web.Application()
+    app['executor'] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+
+    async def _shutdown(app: web.Application):
+        app['executor'].shutdown(wait=False)
+
+    app.on_cleanup.append(_shutdown)
+    app.add_routes([
+        web.get('/health', health),
+        web.post('/predict', predict),
+        web.post('/predict/batch', predict_batch_handler),
+        web.post('/lines', lines),
+        web.get('/scan', scan_handler),
+        web.get('/metrics', metrics),
+    ])
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serviço HTTP de predições FutPrevisão")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help="Threads para cálculo das predições")
+    args = parser.parse_args()
+
+    # Aquece os motores antes de aceitar conexões
+    engine_state.get()
+    web.run_app(create_app(args.workers), host=args.host, port=args.port)
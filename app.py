@@ -29,18 +29,28 @@ Versão: 36.3 PRO (Enterprise Grade)
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from scipy.stats import poisson
 from datetime import datetime, timedelta
-from difflib import get_close_matches
 from typing import Dict, List, Tuple, Optional
 import os
-import re
 import json
 import base64
 from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+
+from core.backtest import backtest
+from core.calibration import CalibrationMaps, load_calibration, reliability
+from core.clv import CLVTracker
+from core.config import BASE_ODD, HISTORY_TABLE_ROWS, LEAGUE_FILES, LEDGER_DEFAULT_USER
+from core.data_loader import DataLoadError, DataSnapshot, data_version, find_file, load_snapshot
+from core.ledger import Ledger
+from core.metrics import registry as metrics_registry, timer
+from core.odds import drop_version, line_market, load_odds
+from core.oraculo import OraculoSupreme
+from core.predict import MathEngineSupreme, PredictionEngineSupreme
+from core.referees import RefereeIndex
+from core.seasons import open_history
+from core.shopping import arbitrages, shop
+from core.validator import validate_leagues
+from core.ticket import render_ticket
 
 # ==============================================================================
 # CONFIGURAÇÃO GLOBAL
@@ -57,6 +67,12 @@ VERSION = "V36.3 PRO"
 AUTHOR = "Diego ADS"
 SYSTEM_RATING = "9.5/10"
 
+SECTIONS = [
+    "🏠 Dashboard", "🔨 Construtor", "🧠 Oráculo", "⭐ Favoritos",
+    "📅 Calendário", "🎯 Análise", "⚖️ Comparação", "🔍 Scanner",
+    "📊 Ligas", "👥 Times", "🎲 Monte Carlo", "📈 Histórico", "🚀 Performance"
+]
+
 # ==============================================================================
 # SESSION STATE INITIALIZATION
 # ==============================================================================
@@ -72,15 +88,7 @@ def init_session_state():
         },
         'chat_history': [],
         'bilhete': [],
-        'bets_history': [],
-        'favorites': [],
-        'alerts': [],
-        'streak': {
-            'current': 0,
-            'best': 0,
-            'total_wins': 0,
-            'total_bets': 0
-        },
+        'ledger_user': LEDGER_DEFAULT_USER,  # histórico, favoritos, alertas e streak ficam no Ledger (SQLite)
         'dashboard_date': datetime.today().strftime("%d/%m/%Y"),
         'dashboard_league': 'Todas'
     }
@@ -392,31 +400,6 @@ def get_theme_css():
 # Aplicar CSS
 st.markdown(get_theme_css(), unsafe_allow_html=True)
 
-# ==============================================================================
-# CONSTANTES
-# ==============================================================================
-
-LEAGUE_FILES = {
-    "Premier League": "Premier_League_25_26.csv",
-    "La Liga": "La_Liga_25_26.csv",
-    "Serie A": "Serie_A_25_26.csv",
-    "Bundesliga": "Bundesliga_25_26.csv",
-    "Ligue 1": "Ligue_1_25_26.csv",
-    "Championship": "Championship_Inglaterra_25_26.csv",
-    "Bundesliga 2": "Bundesliga_2.csv",
-    "Pro League": "Pro_League_Belgica_25_26.csv",
-    "Süper Lig": "Super_Lig_Turquia_25_26.csv",
-    "Premiership": "Premiership_Escocia_25_26.csv"
-}
-
-BOOKMAKERS = {
-    'Bet365': {'factor': 1.00},
-    'Pinnacle': {'factor': 0.98},
-    'Betfair': {'factor': 0.96},
-    'Betano': {'factor': 0.99},
-    '1xBet': {'factor': 1.02}
-}
-
 # ==============================================================================
 # UTILITÁRIOS
 # ==============================================================================
@@ -452,30 +435,25 @@ class Utils:
         except:
             return False
     
+    @staticmethod
+    def current_user() -> str:
+        """Usuário (partição) do Ledger nesta sessão"""
+        return st.session_state.get('ledger_user') or LEDGER_DEFAULT_USER
+    
     @staticmethod
     def add_to_favorites(game_id: str, game_name: str):
         """Adiciona jogo aos favoritos"""
-        if 'favorites' not in st.session_state:
-            st.session_state.favorites = []
-        
-        if game_id not in [f['id'] for f in st.session_state.favorites]:
-            st.session_state.favorites.append({
-                'id': game_id,
-                'name': game_name,
-                'added_at': datetime.now().isoformat()
-            })
+        get_ledger().add_favorite(Utils.current_user(), game_id, game_name)
     
     @staticmethod
     def remove_from_favorites(game_id: str):
         """Remove jogo dos favoritos"""
-        st.session_state.favorites = [
-            f for f in st.session_state.favorites if f['id'] != game_id
-        ]
+        get_ledger().remove_favorite(Utils.current_user(), game_id)
     
     @staticmethod
     def is_favorite(game_id: str) -> bool:
         """Verifica se jogo está nos favoritos"""
-        return game_id in [f['id'] for f in st.session_state.favorites]
+        return get_ledger().is_favorite(Utils.current_user(), game_id)
 
 # ==============================================================================
 # BACKUP ENGINE (NOVO V36.2!)
@@ -486,16 +464,13 @@ class BackupEngine:
     
     @staticmethod
     def export_backup() -> dict:
-        """Exporta todos os dados do session state"""
+        """Exporta as preferências da sessão e os dados do usuário no Ledger"""
         backup_data = {
             'version': VERSION,
             'export_date': datetime.now().isoformat(),
             'theme': st.session_state.theme,
             'banca': st.session_state.contexto_oraculo['banca'],
-            'favorites': st.session_state.favorites,
-            'bets_history': st.session_state.bets_history,
-            'streak': st.session_state.streak,
-            'alerts': st.session_state.alerts,
+            **get_ledger().export_user(Utils.current_user()),
             'dashboard_date': st.session_state.dashboard_date,
             'dashboard_league': st.session_state.dashboard_league
         }
@@ -512,15 +487,7 @@ class BackupEngine:
             # Restaurar dados
             st.session_state.theme = backup_data.get('theme', 'light')
             st.session_state.contexto_oraculo['banca'] = backup_data.get('banca', 1000.0)
-            st.session_state.favorites = backup_data.get('favorites', [])
-            st.session_state.bets_history = backup_data.get('bets_history', [])
-            st.session_state.streak = backup_data.get('streak', {
-                'current': 0,
-                'best': 0,
-                'total_wins': 0,
-                'total_bets': 0
-            })
-            st.session_state.alerts = backup_data.get('alerts', [])
+            get_ledger().import_user(Utils.current_user(), backup_data)
             st.session_state.dashboard_date = backup_data.get('dashboard_date', datetime.today().strftime("%d/%m/%Y"))
             st.session_state.dashboard_league = backup_data.get('dashboard_league', 'Todas')
             
@@ -653,7 +620,7 @@ class BadgeEngine:
         
         # Badge: High Value (se linha fornecida)
         if line and 'prob' in line:
-            ev = MathEngineSupreme.expected_value(line['prob'] / 100, 1.90) * 100
+            ev = MathEngineSupreme.expected_value(line['prob'] / 100, line.get('odd') or BASE_ODD) * 100
             if ev >= 15:
                 badges.append({
                     'name': 'HIGH VALUE',
@@ -750,20 +717,25 @@ class SystemHealthEngine:
             'details': 'Todas presentes' if has_all else 'Faltando colunas'
         })
         
-        # Teste 3: Dados numéricos válidos
-        has_negatives = (df['HC'] < 0).any() or (df['AC'] < 0).any()
+        # Testes 3 e 4: regras do validador, por liga (relatórios em cache pelo hash do CSV)
+        reports = validate_leagues(df, {league: find_file(f) for league, f in LEAGUE_FILES.items()})
+        violations = {}
+        for report in reports.values():
+            for rule, count in report.counts().items():
+                violations[rule] = violations.get(rule, 0) + count
+
+        negatives = violations.get('escanteios_negativos', 0)
         tests.append({
             'name': 'Dados numéricos válidos',
-            'passed': not has_negatives,
-            'details': 'OK' if not has_negatives else 'Valores negativos!'
+            'passed': not negatives,
+            'details': 'OK' if not negatives else f'Valores negativos! ({negatives} linhas)'
         })
         
-        # Teste 4: Sem valores impossíveis
-        impossible = (df['HC'] > 25).any() or (df['AC'] > 25).any()
+        impossible = violations.get('escanteios_impossiveis', 0)
         tests.append({
             'name': 'Sem valores impossíveis',
             'passed': not impossible,
-            'details': 'OK' if not impossible else 'Escanteios >25 detectados'
+            'details': 'OK' if not impossible else f'Escanteios >25 detectados ({impossible} linhas)'
         })
         
         # Teste 5: Calendário consistente
@@ -811,17 +783,18 @@ class SystemHealthEngine:
             'tests': tests,
             'passed': passed_count,
             'total': total_count,
-            'health_score': int((passed_count / total_count) * 100)
+            'health_score': int((passed_count / total_count) * 100),
+            'violations': {league: report.violations for league, report in reports.items() if report.violations}
         }
     
     @staticmethod
-    def get_system_stats(df: pd.DataFrame, bets_history: List) -> Dict:
+    def get_system_stats(df: pd.DataFrame, n_bets: int) -> Dict:
         """Retorna estatísticas globais do sistema"""
         return {
             'total_games': len(df),
             'total_leagues': df['League'].nunique(),
             'total_teams': pd.concat([df['HomeTeam'], df['AwayTeam']]).nunique(),
-            'predictions_generated': len(bets_history),
+            'predictions_generated': n_bets,
             'avg_corners': df['Total_Corners'].mean(),
             'avg_cards': df['Total_Cards'].mean()
         }
@@ -946,673 +919,56 @@ class TutorialEngine:
 
 
 # ==============================================================================
-# DATA ENGINE (mesmo da V36.0)
-# ==============================================================================
-
-class DataEngineSupreme:
-    """Motor de dados - SEM MOCK, 100% REAL"""
-    
-    @staticmethod
-    @st.cache_data(ttl=7200)  # 2h cache (otimização)
-    def load_all_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, Dict]:
-        matches_data = []
-        file_status = {}
-        
-        search_paths = [".", "data", "analytics", "./data", "./analytics", "../data", "/mnt/project"]
-        
-        # CRÍTICO: Sem fallback para mock - só dados reais
-        for league_name, filename in LEAGUE_FILES.items():
-            found = False
-            
-            for base_path in search_paths:
-                filepath = os.path.join(base_path, filename)
-                
-                if os.path.exists(filepath):
-                    try:
-                        df = pd.read_csv(filepath, encoding='utf-8')
-                    except:
-                        try:
-                            df = pd.read_csv(filepath, encoding='latin1')
-                        except Exception as e:
-                            file_status[league_name] = f"❌ ERRO: {str(e)[:50]}"
-                            continue
-                    
-                    df = DataEngineSupreme.normalize_columns(df)
-                    df['League'] = league_name
-                    
-                    # Validar dados
-                    is_valid, errors = DataEngineSupreme.validate_dataframe(df, league_name)
-                    
-                    if is_valid:
-                        matches_data.append(df)
-                        file_status[league_name] = f"✅ REAL ({len(df)} jogos)"
-                        found = True
-                        break
-                    else:
-                        file_status[league_name] = f"⚠️ DADOS INVÁLIDOS: {errors[0]}"
-                        found = True
-                        break
-            
-            if not found:
-                # SEM MOCK - Sistema para se arquivo crítico não existe
-                st.error(f"""
-                ❌ ARQUIVO CRÍTICO AUSENTE: {filename}
-                
-                O sistema não pode funcionar sem dados reais.
-                
-                Por favor:
-                1. Adicionar o arquivo {filename} na pasta do projeto
-                2. Recarregar o aplicativo
-                """)
-                st.stop()
-        
-        if not matches_data:
-            st.error("❌ NENHUM DADO VÁLIDO ENCONTRADO")
-            st.stop()
-        
-        full_df = pd.concat(matches_data, ignore_index=True)
-        full_df['Total_Corners'] = full_df['HC'] + full_df['AC']
-        full_df['Total_Cards'] = full_df['HY'] + full_df['AY']
-        full_df['Total_Goals'] = full_df['FTHG'] + full_df['FTAG']
-        full_df['Total_Fouls'] = full_df['HF'] + full_df['AF']
-        
-        calendar_df = DataEngineSupreme._load_calendar(search_paths, file_status)
-        refs_df = DataEngineSupreme._load_referees(search_paths, file_status)
-        
-        return full_df, calendar_df, refs_df, file_status
-    
-    @staticmethod
-    def validate_dataframe(df: pd.DataFrame, league_name: str) -> Tuple[bool, List[str]]:
-        """Valida qualidade dos dados"""
-        errors = []
-        
-        # Verificar colunas essenciais
-        required_cols = ['HomeTeam', 'AwayTeam', 'HC', 'AC', 'HY', 'AY']
-        missing = [c for c in required_cols if c not in df.columns]
-        if missing:
-            errors.append(f"Colunas ausentes: {missing}")
-            return False, errors
-        
-        # Verificar valores impossíveis
-        if (df['HC'] < 0).any() or (df['AC'] < 0).any():
-            errors.append("Escanteios negativos detectados")
-        
-        if (df['HC'] > 25).any() or (df['AC'] > 25).any():
-            errors.append("Escanteios impossíveis (>25) detectados")
-        
-        if (df['HY'] < 0).any() or (df['AY'] < 0).any():
-            errors.append("Cartões negativos detectados")
-        
-        # Verificar se tem dados suficientes
-        if len(df) < 10:
-            errors.append(f"Amostra muito pequena ({len(df)} jogos)")
-        
-        return len(errors) == 0, errors
-    
-    @staticmethod
-    def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-        column_mapping = {
-            'Mandante': 'HomeTeam', 'Visitante': 'AwayTeam',
-            'Time_Casa': 'HomeTeam', 'Time_Visitante': 'AwayTeam',
-            'Home': 'HomeTeam', 'Away': 'AwayTeam',
-            'HG': 'FTHG', 'AG': 'FTAG',
-            'Gols_Casa': 'FTHG', 'Gols_Fora': 'FTAG',
-            'Cantos_Casa': 'HC', 'Cantos_Fora': 'AC',
-            'Cartoes_Casa': 'HY', 'Cartoes_Fora': 'AY',
-            'Faltas_Casa': 'HF', 'Faltas_Fora': 'AF'
-        }
-        
-        df = df.rename(columns=column_mapping)
-        
-        numeric_columns = ['HC', 'AC', 'HY', 'AY', 'FTHG', 'FTAG', 'HF', 'AF', 'HST', 'AST']
-        for col in numeric_columns:
-            if col not in df.columns:
-                df[col] = 0
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        return df
-    
-    @staticmethod
-    def _load_calendar(search_paths: List[str], file_status: Dict) -> pd.DataFrame:
-        filename = "calendario_ligas.csv"
-        
-        for base_path in search_paths:
-            filepath = os.path.join(base_path, filename)
-            if os.path.exists(filepath):
-                try:
-                    df = pd.read_csv(filepath, encoding='utf-8')
-                    df = DataEngineSupreme.normalize_columns(df)
-                    if 'Data' not in df.columns and 'Date' in df.columns:
-                        df['Data'] = df['Date']
-                    file_status['Calendário'] = f"✅ REAL ({len(df)} jogos)"
-                    return df
-                except:
-                    pass
-        
-        st.error("❌ calendario_ligas.csv não encontrado!")
-        st.stop()
-    
-    @staticmethod
-    def _load_referees(search_paths: List[str], file_status: Dict) -> pd.DataFrame:
-        filename = "arbitros_5_ligas_2025_2026.csv"
-        
-        for base_path in search_paths:
-            filepath = os.path.join(base_path, filename)
-            if os.path.exists(filepath):
-                try:
-                    df = pd.read_csv(filepath, encoding='utf-8')
-                    file_status['Árbitros'] = f"✅ REAL ({len(df)} árbitros)"
-                    return df
-                except:
-                    pass
-        
-        # Árbitros é opcional
-        file_status['Árbitros'] = "⚠️ Não encontrado (opcional)"
-        return pd.DataFrame({
-            'Arbitro': [],
-            'Media_Cartoes_Por_Jogo': [],
-            'Jogos_Apitados': []
-        })
-
-# ==============================================================================
-# MATH ENGINE (mesmo da V36.0)
-# ==============================================================================
-
-class MathEngineSupreme:
-    """Motor matemático avançado"""
-    
-    @staticmethod
-    def weighted_average(values: np.ndarray, recent_weight: float = 0.6) -> float:
-        if len(values) == 0:
-            return 0.0
-        weights = np.linspace(1 - recent_weight, 1 + recent_weight, len(values))
-        return np.average(values, weights=weights)
-    
-    @staticmethod
-    def form_factor(recent_results: List[str], n_games: int = 5) -> float:
-        if not recent_results:
-            return 1.0
-        recent = recent_results[-n_games:]
-        wins = recent.count('W')
-        if wins >= 4:
-            return 1.15
-        elif wins >= 3:
-            return 1.10
-        elif wins >= 2:
-            return 1.05
-        elif wins >= 1:
-            return 0.95
-        else:
-            return 0.85
-    
-    @staticmethod
-    def volatility_index(values: np.ndarray) -> float:
-        if len(values) < 2:
-            return 0.0
-        mean = np.mean(values)
-        if mean == 0:
-            return 0.0
-        std = np.std(values)
-        return (std / mean) * 100
-    
-    @staticmethod
-    def poisson_probability(lmbda: float, k: int) -> float:
-        return poisson.pmf(k, lmbda)
-    
-    @staticmethod
-    def monte_carlo_simulation(lmbda: float, n_sims: int = 10000) -> Dict:
-        samples = np.random.poisson(lmbda, n_sims)
-        return {
-            'samples': samples,
-            'mean': float(np.mean(samples)),
-            'p50': int(np.percentile(samples, 50)),
-            'p80': int(np.percentile(samples, 80)),
-            'p95': int(np.percentile(samples, 95)),
-            'over_9_5': float(np.mean(samples >= 10)),
-            'over_10_5': float(np.mean(samples >= 11)),
-            'over_11_5': float(np.mean(samples >= 12)),
-            'over_12_5': float(np.mean(samples >= 13))
-        }
-    
-    @staticmethod
-    def kelly_criterion(prob: float, odds: float, bankroll: float, fraction: float = 0.25) -> float:
-        if odds <= 1 or prob <= 0 or prob >= 1:
-            return 0.0
-        b = odds - 1
-        q = 1 - prob
-        kelly = (b * prob - q) / b
-        if kelly <= 0:
-            return 0.0
-        return max(0, min(kelly * fraction * bankroll, bankroll * 0.05))
-    
-    @staticmethod
-    def expected_value(prob: float, odds: float) -> float:
-        return (prob * (odds - 1)) - (1 - prob)
-
-# ==============================================================================
-# CONFIDENCE ENGINE (mesmo da V36.0)
-# ==============================================================================
-
-class ConfidenceEngine:
-    """Motor de cálculo de confiança"""
-    
-    @staticmethod
-    def calculate_confidence(n_games: int, volatility: float, h2h_consistency: float = 0.5) -> Tuple[int, str]:
-        if n_games >= 15:
-            sample_score = 40
-        elif n_games >= 10:
-            sample_score = 30
-        elif n_games >= 5:
-            sample_score = 20
-        else:
-            sample_score = 10
-        
-        if volatility < 20:
-            volatility_score = 40
-        elif volatility < 30:
-            volatility_score = 30
-        elif volatility < 40:
-            volatility_score = 20
-        else:
-            volatility_score = 10
-        
-        h2h_score = int(h2h_consistency * 20)
-        total_score = sample_score + volatility_score + h2h_score
-        
-        if total_score >= 80:
-            label = "🟢 Alta"
-        elif total_score >= 60:
-            label = "🟡 Média"
-        else:
-            label = "🔴 Baixa"
-        
-        return total_score, label
-    
-    @staticmethod
-    def get_confidence_color(score: int) -> str:
-        if score >= 80:
-            return "#D1FAE5" if st.session_state.theme == 'light' else "#064e3b"
-        elif score >= 60:
-            return "#FEF3C7" if st.session_state.theme == 'light' else "#78350f"
-        else:
-            return "#FEE2E2" if st.session_state.theme == 'light' else "#7f1d1d"
-
-# ==============================================================================
-# PREDICTION ENGINE (mesmo da V36.0 mas com bookmaker comparison)
-# ==============================================================================
-
-class PredictionEngineSupreme:
-    """Motor de predição avançado"""
-    
-    def __init__(self, df: pd.DataFrame):
-        self.df = df
-        self.math_engine = MathEngineSupreme()
-        self.confidence_engine = ConfidenceEngine()
-    
-    def predict_full(self, home_team: str, away_team: str, league: str = None) -> Optional[Dict]:
-        home_data = self.df[(self.df['HomeTeam'] == home_team) | (self.df['AwayTeam'] == home_team)]
-        away_data = self.df[(self.df['HomeTeam'] == away_team) | (self.df['AwayTeam'] == away_team)]
-        
-        if home_data.empty or away_data.empty:
-            return None
-        
-        corners = self._calculate_corners(home_team, away_team, home_data, away_data)
-        cards = self._calculate_cards(home_team, away_team, home_data, away_data)
-        goals = self._calculate_goals(home_data, away_data)
-        fouls = self._calculate_fouls(home_data, away_data)
-        
-        volatility_home = self.math_engine.volatility_index(home_data['Total_Corners'].values)
-        confidence_score, confidence_label = self.confidence_engine.calculate_confidence(
-            n_games=min(len(home_data), len(away_data)),
-            volatility=(volatility_home + self.math_engine.volatility_index(away_data['Total_Corners'].values)) / 2
-        )
-        
-        return {
-            'corners': corners,
-            'cards': cards,
-            'goals': goals,
-            'fouls': fouls,
-            'confidence': {
-                'score': confidence_score,
-                'label': confidence_label,
-                'color': self.confidence_engine.get_confidence_color(confidence_score)
-            },
-            'volatility': {
-                'home': volatility_home,
-                'away': self.math_engine.volatility_index(away_data['Total_Corners'].values)
-            },
-            'games_played': {
-                'home': len(home_data),
-                'away': len(away_data)
-            }
-        }
-    
-    def _calculate_corners(self, home_team: str, away_team: str, home_data: pd.DataFrame, away_data: pd.DataFrame) -> Dict:
-        home_as_home = home_data[home_data['HomeTeam'] == home_team]
-        away_as_away = away_data[away_data['AwayTeam'] == away_team]
-        
-        corners_home = self.math_engine.weighted_average(home_as_home['HC'].values[-10:]) if len(home_as_home) > 0 else 5.0
-        corners_away = self.math_engine.weighted_average(away_as_away['AC'].values[-10:]) if len(away_as_away) > 0 else 4.5
-        
-        corners_home_proj = corners_home * 1.15
-        corners_away_proj = corners_away * 0.90
-        total = corners_home_proj + corners_away_proj
-        
-        return {
-            'home': corners_home_proj,
-            'away': corners_away_proj,
-            'total': total,
-            'p80': int(np.ceil(total + 1.5)),
-            'p95': int(np.ceil(total + 3.0))
-        }
-    
-    def _calculate_cards(self, home_team: str, away_team: str, home_data: pd.DataFrame, away_data: pd.DataFrame) -> Dict:
-        cards_home = home_data['HY'].mean() if 'HY' in home_data.columns else 2.0
-        cards_away = away_data['AY'].mean() if 'AY' in away_data.columns else 2.0
-        return {
-            'home': cards_home,
-            'away': cards_away,
-            'total': cards_home + cards_away
-        }
-    
-    def _calculate_goals(self, home_data: pd.DataFrame, away_data: pd.DataFrame) -> Dict:
-        return {
-            'home': home_data['FTHG'].mean(),
-            'away': away_data['FTAG'].mean(),
-            'total': home_data['FTHG'].mean() + away_data['FTAG'].mean()
-        }
-    
-    def _calculate_fouls(self, home_data: pd.DataFrame, away_data: pd.DataFrame) -> Dict:
-        return {
-            'home': home_data['HF'].mean(),
-            'away': away_data['AF'].mean(),
-            'total': home_data['HF'].mean() + away_data['AF'].mean()
-        }
-    
-    def generate_all_lines(self, prediction: Dict) -> List[Dict]:
-        lines = []
-        corners_total = prediction['corners']['total']
-        corners_home = prediction['corners']['home']
-        corners_away = prediction['corners']['away']
-        cards_total = prediction['cards']['total']
-        
-        for threshold in [8.5, 9.5, 10.5, 11.5, 12.5, 13.5]:
-            prob = 1 - poisson.cdf(int(threshold), corners_total)
-            lines.append({
-                'tipo': 'Escanteios Totais',
-                'mercado': f"Over {threshold}",
-                'projecao': corners_total,
-                'prob': prob * 100,
-                'icon': '⚽'
-            })
-        
-        for threshold in [2.5, 3.5, 4.5, 5.5]:
-            prob = 1 - poisson.cdf(int(threshold), corners_home)
-            lines.append({
-                'tipo': 'Escanteios Casa',
-                'mercado': f"Casa Over {threshold}",
-                'projecao': corners_home,
-                'prob': prob * 100,
-                'icon': '🏠'
-            })
-        
-        for threshold in [2.5, 3.5, 4.5, 5.5]:
-            prob = 1 - poisson.cdf(int(threshold), corners_away)
-            lines.append({
-                'tipo': 'Escanteios Fora',
-                'mercado': f"Fora Over {threshold}",
-                'projecao': corners_away,
-                'prob': prob * 100,
-                'icon': '✈️'
-            })
-        
-        for threshold in [2.5, 3.5, 4.5, 5.5]:
-            prob = 1 - poisson.cdf(int(threshold), cards_total)
-            lines.append({
-                'tipo': 'Cartões Totais',
-                'mercado': f"Over {threshold}",
-                'projecao': cards_total,
-                'prob': prob * 100,
-                'icon': '🟨'
-            })
-        
-        return lines
-    
-    def find_smart_line(self, prediction: Dict) -> Dict:
-        all_lines = self.generate_all_lines(prediction)
-        good_lines = [l for l in all_lines if 60 <= l['prob'] <= 75]
-        if not good_lines:
-            good_lines = [l for l in all_lines if l['prob'] >= 55]
-        if good_lines:
-            return max(good_lines, key=lambda x: x['prob'])
-        return None
-    
-    def get_bookmaker_odds(self, base_odd: float = 1.90) -> Dict:
-        """Simula odds de diferentes bookmakers"""
-        odds = {}
-        for bookie, config in BOOKMAKERS.items():
-            odds[bookie] = round(base_odd * config['factor'], 2)
-        return odds
-
-# ==============================================================================
-# ORÁCULO SUPREME (mesmo da V36.0)
+# DATA ENGINE (core/ + cache Streamlit)
 # ==============================================================================
 
-class OraculoSupreme:
-    """Oráculo com recomendações automáticas"""
-    
-    def __init__(self, df: pd.DataFrame, refs: pd.DataFrame, calendar: pd.DataFrame, predictor: PredictionEngineSupreme):
-        self.df = df
-        self.refs = refs
-        self.calendar = calendar
-        self.predictor = predictor
-    
-    def auto_recommendations(self, date_filter: str = None, league_filter: str = 'Todas', n_games: int = 5) -> List[Dict]:
-        """Gera recomendações filtradas por data e liga"""
-        
-        recommendations = []
-        calendar = self.calendar.copy()
-        
-        # Filtrar por data
-        if date_filter:
-            calendar = calendar[calendar['Data'] == date_filter]
-        
-        # Filtrar por liga
-        if league_filter != 'Todas':
-            calendar = calendar[calendar['Liga'] == league_filter]
-        
-        for _, row in calendar.head(30).iterrows():
-            home = row['HomeTeam']
-            away = row['AwayTeam']
-            
-            pred = self.predictor.predict_full(home, away)
-            
-            if pred and pred['confidence']['score'] >= 70:
-                smart_line = self.predictor.find_smart_line(pred)
-                
-                if smart_line and smart_line['prob'] >= 65:
-                    recommendations.append({
-                        'jogo': f"{home} x {away}",
-                        'data': row.get('Data', 'N/A'),
-                        'liga': row.get('Liga', 'N/A'),
-                        'linha': smart_line['mercado'],
-                        'prob': smart_line['prob'],
-                        'confidence': pred['confidence']['score'],
-                        'ev': self._estimate_ev(smart_line['prob']),
-                        'pred': pred
-                    })
-        
-        recommendations = sorted(recommendations, key=lambda x: x['ev'], reverse=True)
-        return recommendations[:n_games]
-    
-    def _estimate_ev(self, prob: float) -> float:
-        return MathEngineSupreme.expected_value(prob / 100, 1.90) * 100
-    
-    def processar_chat(self, query: str, contexto: Dict) -> Dict:
-        query_lower = query.lower()
-        
-        if any(w in query_lower for w in ['analisa', 'analise', ' x ', 'vs']):
-            return self._analise_completa(query, contexto)
-        elif any(w in query_lower for w in ['top', 'melhores', 'recomenda']):
-            return self._top_jogos(contexto)
-        elif any(w in query_lower for w in ['comparar', 'comparado']):
-            return self._comparacao(query, contexto)
-        else:
-            return self._fallback()
-    
-    def _analise_completa(self, query: str, contexto: Dict) -> Dict:
-        times = self._extrair_times(query)
-        
-        if len(times) < 2:
-            return {
-                'texto': '⚠️ Não consegui identificar 2 times. Tente: "Analisa Arsenal x Chelsea"',
-                'tipo': 'erro'
-            }
-        
-        home, away = times[0], times[1]
-        pred = self.predictor.predict_full(home, away)
-        
-        if not pred:
-            return {
-                'texto': f'⚠️ Dados insuficientes para {home} ou {away}.',
-                'tipo': 'erro'
-            }
-        
-        contexto['ultimo_jogo'] = {'nome': f"{home} x {away}", 'pred': pred}
-        smart_line = self.predictor.find_smart_line(pred)
-        
-        texto = f"""
-## 🎯 ANÁLISE SUPREMA
-
-### {home} ⚔️ {away}
-
-<div class="card-info">
-
-#### ⚽ ESCANTEIOS
-
-**Projeção {home}:** {pred['corners']['home']:.2f} escanteios  
-**Projeção {away}:** {pred['corners']['away']:.2f} escanteios  
-**Total Esperado:** {pred['corners']['total']:.2f} escanteios
+@st.cache_resource(max_entries=1, show_spinner="📂 Carregando dados...")
+def get_snapshot(version: tuple) -> DataSnapshot:
+    """Um único snapshot dos CSVs por processo, lido por todas as sessões sem cópia
 
-**Margens de Segurança:**
-- P80: {pred['corners']['p80']} escanteios
-- P95: {pred['corners']['p95']} escanteios
+    A chave é a assinatura dos arquivos (data_version): quando o atualizador grava dados
+    novos o snapshot é recarregado e o anterior sai do cache (max_entries=1).
+    """
+    return load_snapshot()
 
-</div>
 
-<div class="card-light">
-
-#### 🟨 CARTÕES
-
-**Total:** {pred['cards']['total']:.2f} cartões  
-**{home}:** {pred['cards']['home']:.2f} cartões  
-**{away}:** {pred['cards']['away']:.2f} cartões
-
-</div>
-
-<div class="card-success">
-
-#### 💎 CONFIANÇA
-
-**Score:** {pred['confidence']['score']}/100 {pred['confidence']['label']}  
-**Volatilidade:** {pred['volatility']['home']:.1f}% (casa) | {pred['volatility']['away']:.1f}% (fora)
-
-</div>
-
-{'<div class="card-success">#### 🎯 LINHA RECOMENDADA: ' + smart_line["mercado"] + f' (Prob: {smart_line["prob"]:.1f}%)</div>' if smart_line else ''}
-"""
-        
-        return {'texto': texto, 'tipo': 'analise'}
-    
-    def _top_jogos(self, contexto: Dict) -> Dict:
-        recomendacoes = self.auto_recommendations(
-            date_filter=st.session_state.dashboard_date,
-            league_filter=st.session_state.dashboard_league,
-            n_games=5
-        )
-        
-        if not recomendacoes:
-            return {
-                'texto': '⚠️ Nenhuma oportunidade de alta confiança encontrada.',
-                'tipo': 'info'
-            }
-        
-        texto = "## 🔥 TOP 5 OPORTUNIDADES\n\n"
-        
-        for i, rec in enumerate(recomendacoes, 1):
-            texto += f"""
-<div class="card-success">
+def load_data_snapshot(version: tuple) -> DataSnapshot:
+    """Snapshot da versão atual; DataLoadError vira erro na tela"""
+    try:
+        return get_snapshot(version)
+    except DataLoadError as e:
+        st.error(str(e))
+        st.stop()
 
-### #{i} {rec['jogo']}
 
-**Linha:** {rec['linha']}  
-**Probabilidade:** {rec['prob']:.1f}%  
-**Confiança:** {rec['confidence']}/100  
-**EV Estimado:** {rec['ev']:+.1f}%
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_engines(version: tuple, odds_version: tuple = ()) -> Tuple[PredictionEngineSupreme, OraculoSupreme]:
+    """Preditor e Oráculo construídos uma vez por versão dos dados e da pasta de odds (compartilhados entre sessões)"""
+    snapshot = get_snapshot(version)
+    referees = RefereeIndex.load(snapshot.matches, snapshot.referees)
+    predictor = PredictionEngineSupreme(snapshot.matches, history=open_history(), referees=referees,
+                                        calibration=load_calibration(snapshot.matches),
+                                        odds=load_odds(snapshot.matches))
+    return predictor, OraculoSupreme(snapshot.matches, snapshot.referees, snapshot.calendar, predictor)
 
-</div>
-"""
-        
-        return {'texto': texto, 'tipo': 'recomendacoes'}
-    
-    def _comparacao(self, query: str, contexto: Dict) -> Dict:
-        if 'ultimo_jogo' not in contexto:
-            return {'texto': '⚠️ Analise um jogo primeiro para comparar.', 'tipo': 'erro'}
-        
-        times = self._extrair_times(query)
-        
-        if len(times) < 2:
-            return {'texto': '⚠️ Especifique o jogo para comparar.', 'tipo': 'erro'}
-        
-        home, away = times[0], times[1]
-        pred_novo = self.predictor.predict_full(home, away)
-        
-        if not pred_novo:
-            return {'texto': f'⚠️ Dados insuficientes para {home} x {away}.', 'tipo': 'erro'}
-        
-        ultimo = contexto['ultimo_jogo']
-        pred_antigo = ultimo['pred']
-        
-        texto = f"""
-## ⚖️ COMPARAÇÃO
 
-### {ultimo['nome']} vs {home} x {away}
+@st.cache_resource
+def get_ledger() -> Ledger:
+    """Ledger SQLite compartilhado entre as sessões (conexões por thread)"""
+    return Ledger.open()
 
-| Métrica | Jogo Anterior | Jogo Novo | Diferença |
-|---------|---------------|-----------|-----------|
-| **Escanteios** | {pred_antigo['corners']['total']:.2f} | {pred_novo['corners']['total']:.2f} | {abs(pred_antigo['corners']['total'] - pred_novo['corners']['total']):.2f} |
-| **Confiança** | {pred_antigo['confidence']['score']} | {pred_novo['confidence']['score']} | {abs(pred_antigo['confidence']['score'] - pred_novo['confidence']['score'])} |
-| **P80** | {pred_antigo['corners']['p80']} | {pred_novo['corners']['p80']} | {abs(pred_antigo['corners']['p80'] - pred_novo['corners']['p80'])} |
 
-**Melhor Jogo:** {'Anterior' if pred_antigo['confidence']['score'] > pred_novo['confidence']['score'] else 'Novo'}
-"""
-        
-        return {'texto': texto, 'tipo': 'comparacao'}
-    
-    def _extrair_times(self, query: str) -> List[str]:
-        all_teams = list(self.df['HomeTeam'].unique())
-        words = re.findall(r'[A-ZÀ-Ÿ][a-zà-ÿ]+(?:\s[A-ZÀ-Ÿ][a-zà-ÿ]+)*', query)
-        
-        teams_found = []
-        for word in words:
-            match = get_close_matches(word, all_teams, n=1, cutoff=0.5)
-            if match:
-                teams_found.append(match[0])
-        
-        return list(set(teams_found))
-    
-    def _fallback(self) -> Dict:
-        return {
-            'texto': """
-⚠️ **Comando não reconhecido**
+@st.cache_resource(max_entries=1, show_spinner="📐 Rodando backtest...")
+def get_calibration_report(version: tuple, holdout: float = 0.3) -> Dict:
+    """Backtest da temporada + calibração ajustada no trecho inicial e avaliada no final
 
-**Exemplos:**
-- "Analisa Arsenal x Chelsea"
-- "Top 5 jogos de hoje"
-- "Comparado ao anterior, qual melhor?"
-""",
-            'tipo': 'ajuda'
-        }
+    As tabelas em produção usam a temporada inteira; aqui o ajuste deixa de fora o trecho
+    final para o diagrama mostrar o efeito fora da amostra.
+    """
+    result = backtest(get_snapshot(version).matches)
+    test = np.arange(len(result.games)) >= int(len(result.games) * (1 - holdout))
+    maps = CalibrationMaps.fit(result.subset(~test))
+    return {'result': result.subset(test), 'maps': maps}
 
 # ==============================================================================
 # UI COMPONENTS
@@ -1683,185 +1039,46 @@ class ExportEngine:
     
     @staticmethod
     def create_ticket_image(bilhete: List[Dict], odd_combinada: float) -> BytesIO:
-        """Cria imagem PNG PROFISSIONAL do bilhete"""
-        
-        # Configurações PRO
-        width = 800
-        n_selections = len(bilhete)
-        header_height = 120
-        selection_height = 100
-        stats_height = 180
-        footer_height = 60
-        
-        height = header_height + (n_selections * selection_height) + stats_height + footer_height
-        
-        theme = st.session_state.theme
-        
-        # Cores profissionais baseadas no tema
-        if theme == 'light':
-            bg_color = (248, 250, 252)  # #F8FAFC
-            card_color = (255, 255, 255)
-            text_color = (30, 41, 59)    # #1E293B
-            accent_color = (59, 130, 246) # #3B82F6
-            border_color = (226, 232, 240)
-        else:
-            bg_color = (15, 23, 42)      # #0f172a
-            card_color = (30, 41, 59)    # #1e293b
-            text_color = (241, 245, 249) # #f1f5f9
-            accent_color = (59, 130, 246)
-            border_color = (71, 85, 105)
-        
-        # Criar imagem
-        img = Image.new('RGB', (width, height), bg_color)
-        draw = ImageDraw.Draw(img)
-        
-        # === HEADER ===
-        y = 20
-        
-        # Logo/Título
-        draw.text((width//2, y), "⚽", fill=accent_color, anchor="mm", font=None)
-        y += 30
-        draw.text((width//2, y), "FUTPREVISÃO V36.3 PRO", fill=accent_color, anchor="mm", font=None)
-        y += 25
-        draw.text((width//2, y), "Bilhete Premium", fill=text_color, anchor="mm", font=None)
-        y += 30
-        
-        # Linha divisória
-        draw.line([(40, y), (width-40, y)], fill=accent_color, width=3)
-        y += 30
-        
-        # === SELEÇÕES ===
-        for i, sel in enumerate(bilhete):
-            # Card da seleção
-            card_y = y
-            card_height = 90
-            
-            # Fundo do card
-            draw.rectangle(
-                [(50, card_y), (width-50, card_y + card_height)],
-                fill=card_color,
-                outline=border_color,
-                width=2
-            )
-            
-            # Número da seleção
-            draw.text((70, card_y + 15), f"🎯 SELEÇÃO #{i+1}", fill=accent_color, font=None)
-            
-            # Jogo
-            draw.text((70, card_y + 35), sel['jogo'], fill=text_color, font=None)
-            
-            # Mercado
-            draw.text((70, card_y + 55), f"💎 {sel['mercado']}", fill=text_color, font=None)
-            
-            # Odd e Prob
-            draw.text((70, card_y + 75), 
-                     f"📊 Odd: {sel['odd']:.2f} | Prob: {sel.get('prob', 0):.0f}%",
-                     fill=text_color, font=None)
-            
-            y += card_height + 15
-        
-        # Linha divisória
-        draw.line([(40, y), (width-40, y)], fill=accent_color, width=3)
-        y += 30
-        
-        # === ESTATÍSTICAS ===
-        draw.text((width//2, y), "📊 ESTATÍSTICAS DO BILHETE", fill=accent_color, anchor="mm", font=None)
-        y += 30
-        
-        # Calcular estatísticas
-        prob_combinada = 1.0
-        for sel in bilhete:
-            prob_combinada *= sel.get('prob', 70) / 100
-        
-        avg_confidence = sum(sel.get('confidence', 75) for sel in bilhete) / len(bilhete)
-        
-        # Stake Kelly (exemplo)
-        banca = st.session_state.contexto_oraculo.get('banca', 1000)
-        stake_kelly = MathEngineSupreme.kelly_criterion(prob_combinada, odd_combinada, banca)
-        
-        # EV
-        ev = MathEngineSupreme.expected_value(prob_combinada, odd_combinada) * 100
-        
-        # Mostrar stats
-        stats_x = 70
-        draw.text((stats_x, y), f"💰 Odd Combinada: {odd_combinada:.2f}x", fill=text_color, font=None)
-        y += 25
-        draw.text((stats_x, y), f"💵 Stake Kelly: R$ {stake_kelly:.2f}", fill=text_color, font=None)
-        y += 25
-        draw.text((stats_x, y), f"📈 EV Total: {ev:+.1f}%", fill=text_color, font=None)
-        y += 25
-        draw.text((stats_x, y), f"🎯 Confiança Média: {avg_confidence:.1f}/100", fill=text_color, font=None)
-        y += 25
-        draw.text((stats_x, y), f"🎲 Prob. Combinada: {prob_combinada*100:.1f}%", fill=text_color, font=None)
-        y += 35
-        
-        # Linha divisória
-        draw.line([(40, y), (width-40, y)], fill=accent_color, width=3)
-        y += 20
-        
-        # === FOOTER ===
-        timestamp = datetime.now().strftime("%d/%m/%Y • %H:%M")
-        backup_id = f"FP{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        draw.text((width//2, y), f"📅 {timestamp}", fill=text_color, anchor="mm", font=None)
-        y += 20
-        draw.text((width//2, y), f"💾 ID: {backup_id}", fill=text_color, anchor="mm", font=None)
-        
-        # Converter para bytes
-        buf = BytesIO()
-        img.save(buf, format='PNG', quality=95)
-        buf.seek(0)
-        return buf
+        """Cria imagem PNG PROFISSIONAL do bilhete (core.ticket, no tema da sessão)"""
+        return render_ticket(
+            bilhete,
+            odd_combinada,
+            theme=st.session_state.theme,
+            banca=st.session_state.contexto_oraculo.get('banca', 1000)
+        )
 
 # ==============================================================================
 # ANALYTICS ENGINE (COM HISTORICAL TRACKING)
 # ==============================================================================
 
 class AnalyticsEngine:
-    """Motor de analytics e tracking"""
+    """Motor de analytics e tracking (apostas no Ledger, partição do usuário da sessão)"""
     
     @staticmethod
-    def add_bet(bet_data: Dict):
+    def add_bet(bet_data: Dict) -> int:
         """Adiciona aposta ao histórico"""
-        if 'bets_history' not in st.session_state:
-            st.session_state.bets_history = []
-        
-        bet_data['id'] = len(st.session_state.bets_history)
         bet_data['timestamp'] = datetime.now().isoformat()
-        st.session_state.bets_history.append(bet_data)
+        bet_data['id'] = get_ledger().add_bet(Utils.current_user(), bet_data)
+        return bet_data['id']
     
     @staticmethod
     def update_bet_result(bet_id: int, result: str, return_value: float = 0):
-        """Atualiza resultado de uma aposta"""
-        for bet in st.session_state.bets_history:
-            if bet['id'] == bet_id:
-                bet['result'] = result
-                bet['return'] = return_value
-                
-                # Atualizar streak
-                if result == 'win':
-                    st.session_state.streak['current'] += 1
-                    st.session_state.streak['total_wins'] += 1
-                    if st.session_state.streak['current'] > st.session_state.streak['best']:
-                        st.session_state.streak['best'] = st.session_state.streak['current']
-                else:
-                    st.session_state.streak['current'] = 0
-                
-                st.session_state.streak['total_bets'] += 1
-                break
+        """Atualiza resultado de uma aposta (e a streak, na mesma transação)"""
+        get_ledger().update_bet_result(Utils.current_user(), bet_id, result, return_value)
     
     @staticmethod
     def calculate_roi(bets: List[Dict] = None) -> Dict:
         """Calcula ROI"""
         if bets is None:
-            bets = st.session_state.bets_history
+            totals = get_ledger().totals(Utils.current_user())
+            total_stake, total_return = totals['stake'], totals['win_return']
+        else:
+            total_stake = sum(b.get('stake', 0) for b in bets)
+            total_return = sum(b.get('return', 0) for b in bets if b.get('result') == 'win')
         
-        if not bets:
+        if not total_stake:
             return {'roi': 0, 'total_stake': 0, 'total_return': 0, 'profit': 0}
         
-        total_stake = sum(b.get('stake', 0) for b in bets)
-        total_return = sum(b.get('return', 0) for b in bets if b.get('result') == 'win')
-        
         roi = ((total_return - total_stake) / total_stake * 100) if total_stake > 0 else 0
         
         return {
@@ -1875,17 +1092,42 @@ class AnalyticsEngine:
     def win_rate(bets: List[Dict] = None) -> float:
         """Calcula win rate"""
         if bets is None:
-            bets = st.session_state.bets_history
-        
-        if not bets:
-            return 0.0
+            totals = get_ledger().totals(Utils.current_user())
+            wins, completed = totals['wins'], totals['wins'] + totals['losses']
+        else:
+            wins = sum(1 for b in bets if b.get('result') == 'win')
+            completed = sum(1 for b in bets if b.get('result') in ['win', 'loss'])
         
-        completed = [b for b in bets if b.get('result') in ['win', 'loss']]
         if not completed:
             return 0.0
         
-        wins = sum(1 for b in completed if b.get('result') == 'win')
-        return (wins / len(completed)) * 100
+        return (wins / completed) * 100
+    
+    @staticmethod
+    def equity_curve() -> np.ndarray:
+        """Lucro acumulado da banca (curva do Ledger): a sessão guarda o array e só lê os pontos novos"""
+        ledger, user = get_ledger(), Utils.current_user()
+        key = (user, ledger.generation(user))
+        curve = st.session_state.get('equity_curve')
+        if curve is None or st.session_state.get('equity_curve_key') != key:
+            curve = np.zeros(0)
+            st.session_state.equity_curve_key = key
+        new = ledger.equity(user, since_seq=len(curve))
+        if len(new):
+            curve = np.concatenate([curve, new])
+        st.session_state.equity_curve = curve
+        return curve
+    
+    @staticmethod
+    def clv_tracker(store) -> CLVTracker:
+        """CLV das apostas do usuário: só as novas/pendentes são procuradas no store"""
+        ledger, user = get_ledger(), Utils.current_user()
+        key = (user, ledger.generation(user))  # histórico limpo/restaurado = recomeça
+        tracker = st.session_state.get('clv_tracker')
+        if tracker is None or st.session_state.get('clv_tracker_key') != key:
+            tracker = st.session_state.clv_tracker = CLVTracker()
+            st.session_state.clv_tracker_key = key
+        return tracker.sync(ledger.bets(user, since_id=tracker.next_id), store)
 
 # ==============================================================================
 # VISUALIZATION ENGINE
@@ -1896,6 +1138,8 @@ class VisualizationEngine:
     
     @staticmethod
     def radar_chart(home_stats: Dict, away_stats: Dict, home_name: str, away_name: str):
+        import plotly.graph_objects as go
+        
         categories = ['Escanteios', 'Cartões', 'Gols', 'Faltas']
         
         fig = go.Figure()
@@ -1936,32 +1180,448 @@ class VisualizationEngine:
         return fig
 
 # ==============================================================================
-# MAIN APPLICATION
+# SEÇÕES COM RERUN PARCIAL (st.fragment)
 # ==============================================================================
 
-def main():
-    """Aplicação principal"""
+@st.fragment
+def render_analise(df: pd.DataFrame, predictor: PredictionEngineSupreme, viz: VisualizationEngine):
+    """Análise 360°"""
+    st.markdown("# 🎯 Análise 360°")
     
-    # Tutorial de boas-vindas (primeira vez)
-    if TutorialEngine.should_show() and 'tutorial_step' not in st.session_state:
-        TutorialEngine.show_welcome()
-        st.stop()
-    
-    # Carregar dados
-    try:
-        df, calendar, refs, file_status = DataEngineSupreme.load_all_data()
-        predictor = PredictionEngineSupreme(df)
-        oraculo = OraculoSupreme(df, refs, calendar, predictor)
-        ui = UIComponents()
-        viz = VisualizationEngine()
-        export = ExportEngine()
-        analytics = AnalyticsEngine()
-    except Exception as e:
-        st.error(f"❌ Erro ao carregar dados: {e}")
-        st.stop()
+    teams = sorted(list(df['HomeTeam'].unique()))
     
-    # Sidebar
-    with st.sidebar:
+    if teams:
+        col_an1, col_an2 = st.columns(2)
+        
+        home_sel = col_an1.selectbox("🏠 Casa:", teams, key="an_home")
+        away_sel = col_an2.selectbox("✈️ Fora:", teams, key="an_away")
+        
+        referee_names = predictor.referees.names() if predictor.referees is not None else []
+        referee_sel = None
+        if referee_names:
+            referee_sel = st.selectbox("🧑‍⚖️ Árbitro (opcional):", ["Não informado"] + referee_names, key="an_referee")
+            referee_sel = None if referee_sel == "Não informado" else referee_sel
+        
+        if st.button("🔥 ANALISAR", type="primary", use_container_width=True):
+            with st.spinner("🔮 Processando análise completa..."):
+                pred = predictor.predict_full(home_sel, away_sel, referee=referee_sel)
+                
+                if pred:
+                    st.success("✅ Análise concluída!")
+                    
+                    # NOVO V36.3: Validações e Avisos de Qualidade
+                    warnings = ValidationEngine.validate_prediction(pred, home_sel, away_sel)
+                    quality_score = ValidationEngine.calculate_quality_score(pred, warnings)
+                    
+                    if warnings:
+                        st.markdown("### ⚠️ Avisos de Qualidade")
+                        for warning in warnings:
+                            if warning['type'] == 'danger':
+                                st.error(f"{warning['icon']} {warning['message']}")
+                            elif warning['type'] == 'warning':
+                                st.warning(f"{warning['icon']} {warning['message']}")
+                            elif warning['type'] == 'success':
+                                st.success(f"{warning['icon']} {warning['message']}")
+                            else:
+                                st.info(f"{warning['icon']} {warning['message']}")
+                        
+                        # Score de Qualidade
+                        if quality_score >= 80:
+                            st.success(f"📊 **Score de Qualidade:** {quality_score}/100 - Excelente!")
+                        elif quality_score >= 60:
+                            st.info(f"📊 **Score de Qualidade:** {quality_score}/100 - Bom")
+                        else:
+                            st.warning(f"📊 **Score de Qualidade:** {quality_score}/100 - Revisar análise")
+                        
+                        st.markdown("---")
+                    
+                    col1, col2, col3, col4 = st.columns(4)
+                    
+                    col1.metric("Escanteios", f"{pred['corners']['total']:.2f}")
+                    col2.metric("P80", pred['corners']['p80'])
+                    col3.metric("Cartões", f"{pred['cards']['total']:.2f}")
+                    col4.metric("Confiança", f"{pred['confidence']['score']}/100")
+                    
+                    ref = pred['cards']['referee']
+                    if ref:
+                        st.caption(f"🧑‍⚖️ {ref['name']}: {ref['cards_per_game']:.1f} cartões/jogo, "
+                                   f"{ref['red_rate']:.2f} vermelhos/jogo, casa {ref['home_cards_per_game']:.1f} x "
+                                   f"fora {ref['away_cards_per_game']:.1f}, fator casa {ref['home_factor']:.2f} / "
+                                   f"fora {ref['away_factor']:.2f} "
+                                   f"({ref['games']} jogos, fonte: {ref['source']})")
+                    
+                    st.markdown("---")
+                    
+                    st.markdown("### 📊 Comparação Visual")
+                    
+                    home_stats = {
+                        'corners': pred['corners']['home'],
+                        'cards': pred['cards']['home'],
+                        'goals': pred['goals']['home'],
+                        'fouls': pred['fouls']['home']
+                    }
+                    
+                    away_stats = {
+                        'corners': pred['corners']['away'],
+                        'cards': pred['cards']['away'],
+                        'goals': pred['goals']['away'],
+                        'fouls': pred['fouls']['away']
+                    }
+                    
+                    fig_radar = viz.radar_chart(home_stats, away_stats, home_sel, away_sel)
+                    st.plotly_chart(fig_radar, use_container_width=True)
+                    
+                    st.markdown("---")
+                    
+                    st.markdown("### 📋 Todas as Linhas")
+                    
+                    all_lines = predictor.generate_all_lines(pred)
+                    lines_df = pd.DataFrame(all_lines)
+                    lines_df = lines_df[lines_df['prob'] >= 50].sort_values('prob', ascending=False)
+                    
+                    st.dataframe(
+                        lines_df[['tipo', 'mercado', 'projecao', 'prob']].style.format({
+                            'projecao': '{:.2f}',
+                            'prob': '{:.1f}%'
+                        }),
+                        use_container_width=True
+                    )
+                else:
+                    st.error("❌ Dados insuficientes para análise.")
+
+@st.fragment
+def render_comparacao(df: pd.DataFrame, viz: VisualizationEngine):
+    """Comparação de times"""
+    st.markdown("# ⚖️ Comparação de Times")
+    
+    teams = sorted(list(df['HomeTeam'].unique()))
+    
+    col_comp1, col_comp2 = st.columns(2)
+    
+    team1 = col_comp1.selectbox("Time 1:", teams, key="comp_t1")
+    team2 = col_comp2.selectbox("Time 2:", teams, key="comp_t2")
+    
+    if st.button("⚖️ COMPARAR", type="primary", use_container_width=True):
+        with st.spinner("Comparando..."):
+            data1 = df[(df['HomeTeam'] == team1) | (df['AwayTeam'] == team1)]
+            data2 = df[(df['HomeTeam'] == team2) | (df['AwayTeam'] == team2)]
+            
+            if not data1.empty and not data2.empty:
+                stats1 = {
+                    'corners': data1['Total_Corners'].mean(),
+                    'cards': data1['Total_Cards'].mean(),
+                    'goals': data1['Total_Goals'].mean(),
+                    'fouls': data1['Total_Fouls'].mean(),
+                    'volatility': MathEngineSupreme.volatility_index(data1['Total_Corners'].values)
+                }
+                
+                stats2 = {
+                    'corners': data2['Total_Corners'].mean(),
+                    'cards': data2['Total_Cards'].mean(),
+                    'goals': data2['Total_Goals'].mean(),
+                    'fouls': data2['Total_Fouls'].mean(),
+                    'volatility': MathEngineSupreme.volatility_index(data2['Total_Corners'].values)
+                }
+                
+                st.markdown("### 📊 Comparação Estatística")
+                
+                col_s1, col_s2, col_s3 = st.columns(3)
+                
+                with col_s1:
+                    st.markdown(f"#### {team1}")
+                    st.metric("Escanteios/Jogo", f"{stats1['corners']:.2f}")
+                    st.metric("Cartões/Jogo", f"{stats1['cards']:.2f}")
+                    st.metric("Gols/Jogo", f"{stats1['goals']:.2f}")
+                    st.metric("Volatilidade", f"{stats1['volatility']:.1f}%")
+                
+                with col_s2:
+                    st.markdown("#### vs")
+                    st.markdown("<br>" * 10, unsafe_allow_html=True)
+                
+                with col_s3:
+                    st.markdown(f"#### {team2}")
+                    st.metric("Escanteios/Jogo", f"{stats2['corners']:.2f}")
+                    st.metric("Cartões/Jogo", f"{stats2['cards']:.2f}")
+                    st.metric("Gols/Jogo", f"{stats2['goals']:.2f}")
+                    st.metric("Volatilidade", f"{stats2['volatility']:.1f}%")
+                
+                st.markdown("---")
+                
+                st.markdown("### 📊 Radar Chart Comparativo")
+                fig_comp = viz.radar_chart(stats1, stats2, team1, team2)
+                st.plotly_chart(fig_comp, use_container_width=True)
+
+@st.fragment
+def render_scanner(calendar: pd.DataFrame, oraculo: OraculoSupreme):
+    """Scanner multi-critério"""
+    st.markdown("# 🔍 Scanner Multi-Critério")
+    
+    st.markdown("### ⚙️ Filtros")
+    
+    # NOVO V36.2: Filtro de Data
+    datas_scanner = sorted(calendar['Data'].unique())
+    
+    col_scan_date, col_scan_today = st.columns([3, 1])
+    
+    with col_scan_date:
+        if 'scanner_date' not in st.session_state:
+            st.session_state.scanner_date = datetime.today().strftime("%d/%m/%Y")
+        
+        # Garantir que a data existe na lista
+        if st.session_state.scanner_date not in datas_scanner:
+            st.session_state.scanner_date = datas_scanner[0] if datas_scanner else datetime.today().strftime("%d/%m/%Y")
+        
+        selected_scanner_date = st.selectbox(
+            "📅 Data:",
+            datas_scanner,
+            index=datas_scanner.index(st.session_state.scanner_date) if st.session_state.scanner_date in datas_scanner else 0,
+            key="scanner_date_select"
+        )
+        st.session_state.scanner_date = selected_scanner_date
+    
+    with col_scan_today:
+        if st.button("📅 Hoje", key="scanner_today_btn", use_container_width=True):
+            st.session_state.scanner_date = datetime.today().strftime("%d/%m/%Y")
+            st.rerun()
+    
+    st.markdown("---")
+    
+    col_f1, col_f2, col_f3 = st.columns(3)
+    
+    min_conf = col_f1.slider("Confiança Mínima:", 0, 100, 70)
+    min_prob = col_f2.slider("Probabilidade Mínima:", 0, 100, 60)
+    min_ev = col_f3.slider("EV Mínimo (%):", -20, 50, 10)
+    
+    if st.button("🔍 ESCANEAR", type="primary", use_container_width=True):
+        with st.spinner("🔍 Escaneando calendário..."):
+            # NOVO V36.2: Filtrar calendário pela data selecionada
+            calendar_filtered = calendar[calendar['Data'] == st.session_state.scanner_date]
+            
+            if calendar_filtered.empty:
+                st.warning(f"⚠️ Nenhum jogo encontrado para {st.session_state.scanner_date}")
+            else:
+                opportunities = oraculo.scan(st.session_state.scanner_date, min_conf, min_prob, min_ev)
+                
+                if opportunities:
+                    df_opp = pd.DataFrame(opportunities)
+                    df_opp = df_opp.sort_values('Score', ascending=False)
+                    
+                    st.success(f"✅ {len(df_opp)} oportunidades encontradas para {st.session_state.scanner_date}!")
+                    
+                    st.dataframe(
+                        df_opp.style.format({
+                            'Prob (%)': '{:.1f}',
+                            'Odd': '{:.2f}',
+                            'EV (%)': '{:+.1f}',
+                            'Score': '{:.1f}'
+                        }),
+                        use_container_width=True
+                    )
+                else:
+                    st.warning(f"⚠️ Nenhuma oportunidade encontrada para {st.session_state.scanner_date} com os critérios selecionados.")
+    
+    st.markdown("---")
+    st.markdown("### 🛒 Line Shopping do Dia")
+    reference = st.radio("Probabilidade justa:", ["Consenso das casas", "Pinnacle"], horizontal=True, key="scanner_shop_ref")
+    shopping = oraculo.line_shopping(st.session_state.scanner_date,
+                                     reference='Pinnacle' if reference == "Pinnacle" else None)
+    if shopping.empty:
+        st.info("Sem cotações reais para os jogos desta data (largue arquivos de odds na pasta odds/).")
+    else:
+        render_shopping(shopping)
+
+def render_shopping(shopping: pd.DataFrame, show_game: bool = True):
+    """Melhor preço por seleção, com as arbitragens em destaque"""
+    arb = arbitrages(shopping)
+    if not arb.empty:
+        st.error(f"⚡ {len(arb)} arbitragem(ns) encontrada(s): uma aposta em cada seleção, na casa indicada, lucra em qualquer resultado")
+        st.dataframe(arb.style.format({'Lucro (%)': '{:+.2f}'}), use_container_width=True, hide_index=True)
+    
+    columns = [c for c in shopping.columns if show_game or c not in ('Jogo', 'Data')]
+    st.dataframe(
+        shopping[columns].style.format({
+            'Melhor odd': '{:.2f}',
+            'Prob. justa (%)': '{:.1f}',
+            'Valor (%)': '{:+.1f}',
+            'Margem média (%)': '{:.1f}',
+            'Overround melhor (%)': '{:.1f}',
+            'Stake arb. (%)': '{:.0f}'
+        }, na_rep='-'),
+        use_container_width=True,
+        hide_index=True
+    )
+
+@st.fragment
+def render_times(df: pd.DataFrame, ui: UIComponents):
+    """DNA dos times"""
+    st.markdown("# 👥 DNA dos Times")
+    
+    teams = sorted(list(df['HomeTeam'].unique()))
+    time_sel = st.selectbox("Selecione Time:", teams, key="times_sel")
+    
+    if time_sel:
+        time_data = df[(df['HomeTeam'] == time_sel) | (df['AwayTeam'] == time_sel)]
+        
+        st.markdown("### 📊 Métricas Principais")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        col1.metric("⚽ Escanteios/Jogo", f"{time_data['Total_Corners'].mean():.2f}")
+        col2.metric("🟨 Cartões/Jogo", f"{time_data['Total_Cards'].mean():.2f}")
+        col3.metric("🎯 Gols/Jogo", f"{time_data['Total_Goals'].mean():.2f}")
+        col4.metric("🚫 Faltas/Jogo", f"{time_data['Total_Fouls'].mean():.2f}")
+        
+        st.markdown("---")
+        
+        volatility = MathEngineSupreme.volatility_index(time_data['Total_Corners'].values)
+        
+        st.markdown("### 📈 Análise de Volatilidade")
+        st.markdown(ui.progress_bar(volatility, 50, f"{volatility:.1f}%"), unsafe_allow_html=True)
+        
+        if volatility < 20:
+            st.success("✅ Time muito consistente (volatilidade baixa)")
+        elif volatility < 35:
+            st.info("ℹ️ Time moderadamente consistente")
+        else:
+            st.warning("⚠️ Time imprevisível (volatilidade alta)")
+        
+        st.markdown("---")
+        
+        st.markdown("### 📋 Relatório Técnico")
+        
+        col_r1, col_r2 = st.columns(2)
+        
+        with col_r1:
+            st.markdown("#### 🏠 Como Mandante")
+            home_games = time_data[time_data['HomeTeam'] == time_sel]
+            if not home_games.empty:
+                st.metric("Escanteios", f"{home_games['HC'].mean():.2f}")
+                st.metric("Cartões", f"{home_games['HY'].mean():.2f}")
+                st.metric("Faltas", f"{home_games['HF'].mean():.2f}")
+        
+        with col_r2:
+            st.markdown("#### ✈️ Como Visitante")
+            away_games = time_data[time_data['AwayTeam'] == time_sel]
+            if not away_games.empty:
+                st.metric("Escanteios", f"{away_games['AC'].mean():.2f}")
+                st.metric("Cartões", f"{away_games['AY'].mean():.2f}")
+                st.metric("Faltas", f"{away_games['AF'].mean():.2f}")
+        
+        st.markdown("---")
+        
+        import plotly.express as px
+        fig = px.histogram(
+            time_data,
+            x='Total_Corners',
+            nbins=15,
+            title=f"Distribuição de Escanteios - {time_sel}",
+            color_discrete_sequence=['#3B82F6']
+        )
+        
+        theme = st.session_state.theme
+        fig.update_layout(
+            paper_bgcolor='white' if theme == 'light' else '#0f172a',
+            plot_bgcolor='#F8FAFC' if theme == 'light' else '#1e293b',
+            font=dict(color='#1E293B' if theme == 'light' else '#f1f5f9')
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def render_monte_carlo():
+    """Monte Carlo estratégico"""
+    st.markdown("# 🎲 Monte Carlo Estratégico")
+    
+    lam = st.number_input("Média Esperada:", value=10.0, min_value=1.0, max_value=20.0, step=0.5)
+    n_sims = st.selectbox("Nº Simulações:", [1000, 5000, 10000], index=2)
+    
+    if st.button("🎲 SIMULAR", type="primary", use_container_width=True):
+        with st.spinner(f"🎲 Simulando {n_sims:,} jogos..."):
+            result = MathEngineSupreme.monte_carlo_simulation(lam, n_sims)
+            
+            st.success(f"✅ {n_sims:,} simulações concluídas!")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            col1.metric("Média", f"{result['mean']:.2f}")
+            col2.metric("P50", result['p50'])
+            col3.metric("P80", result['p80'])
+            col4.metric("P95", result['p95'])
+            
+            st.markdown("---")
+            
+            st.markdown("### 💎 Recomendações Estratégicas")
+            
+            if result['over_10_5'] >= 0.70:
+                st.markdown(f"""
+                <div class="card-success">
+                <strong>✅ Over 10.5:</strong> Altamente recomendado (Prob: {result['over_10_5']*100:.1f}%)
+                </div>
+                """, unsafe_allow_html=True)
+            
+            if result['over_11_5'] >= 0.60:
+                st.markdown(f"""
+                <div class="card-success">
+                <strong>✅ Over 11.5:</strong> Recomendado (Prob: {result['over_11_5']*100:.1f}%)
+                </div>
+                """, unsafe_allow_html=True)
+            
+            if result['over_12_5'] < 0.40:
+                st.markdown(f"""
+                <div class="card-warning">
+                <strong>⚠️ Over 12.5:</strong> Risco alto (Prob: {result['over_12_5']*100:.1f}%)
+                </div>
+                """, unsafe_allow_html=True)
+            
+            st.markdown("---")
+            
+            import plotly.express as px
+            fig = px.histogram(
+                x=result['samples'],
+                nbins=20,
+                title="Distribuição das Simulações",
+                color_discrete_sequence=['#3B82F6']
+            )
+            
+            theme = st.session_state.theme
+            fig.update_layout(
+                paper_bgcolor='white' if theme == 'light' else '#0f172a',
+                plot_bgcolor='#F8FAFC' if theme == 'light' else '#1e293b',
+                font=dict(color='#1E293B' if theme == 'light' else '#f1f5f9'),
+                xaxis_title="Escanteios",
+                yaxis_title="Frequência"
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+
+# ==============================================================================
+# MAIN APPLICATION
+# ==============================================================================
+
+def main():
+    """Aplicação principal"""
+    
+    # Tutorial de boas-vindas (primeira vez)
+    if TutorialEngine.should_show() and 'tutorial_step' not in st.session_state:
+        TutorialEngine.show_welcome()
+        st.stop()
+    
+    # Carregar dados
+    try:
+        version = data_version()
+        snapshot = load_data_snapshot(version)
+        df, calendar, refs, file_status = snapshot.matches, snapshot.calendar, snapshot.referees, snapshot.file_status
+        predictor, oraculo = get_engines(version, drop_version())
+        ui = UIComponents()
+        viz = VisualizationEngine()
+        export = ExportEngine()
+        analytics = AnalyticsEngine()
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar dados: {e}")
+        st.stop()
+    
+    # Sidebar
+    with st.sidebar:
         st.markdown(f"## ⚽ {VERSION}")
         st.caption(f"Por {AUTHOR}")
         
@@ -1996,9 +1656,13 @@ def main():
         
         st.markdown("---")
         
+        # Perfil: partição do Ledger (histórico, favoritos, alertas e streak)
+        st.text_input("👤 Perfil:", key="ledger_user", help="Cada perfil tem seu próprio histórico salvo em disco")
+        
         # NOVO: Streak Tracker
         st.markdown("### 🔥 Streak Tracker")
-        streak = st.session_state.streak
+        ledger, user = get_ledger(), Utils.current_user()
+        streak = ledger.streak(user)
         st.metric("Sequência Atual", f"{streak['current']} 🔥")
         st.metric("Melhor Sequência", f"{streak['best']} 🏆")
         if streak['total_bets'] > 0:
@@ -2009,10 +1673,10 @@ def main():
         
         # NOVO: Alertas
         st.markdown("### 🔔 Alertas")
-        n_alerts = len(st.session_state.alerts)
+        n_alerts = ledger.alert_count(user)
         if n_alerts > 0:
             st.info(f"{n_alerts} alerta(s) ativo(s)")
-            for alert in st.session_state.alerts[:3]:
+            for alert in ledger.alerts(user, limit=3):
                 st.caption(f"• {alert.get('message', '')}")
         else:
             st.caption("Nenhum alerta no momento")
@@ -2068,6 +1732,10 @@ def main():
                 for test in health_check['tests']:
                     icon = "✅" if test['passed'] else "❌"
                     st.caption(f"{icon} {test['name']}: {test['details']}")
+                for league, rules in health_check['violations'].items():
+                    for rule, rows in rules.items():
+                        lines = ", ".join(str(r + 2) for r in rows[:10])  # linha no CSV (cabeçalho = 1)
+                        st.caption(f"⚠️ {league} - {rule}: linhas {lines}{'...' if len(rows) > 10 else ''}")
         except:
             st.info("🧪 Auto-verificação disponível após carregar dados")
         
@@ -2075,6 +1743,7 @@ def main():
         
         if st.button("🔄 Limpar Cache", use_container_width=True):
             st.cache_data.clear()
+            st.cache_resource.clear()
             st.success("✅ Cache limpo!")
             st.rerun()
         
@@ -2118,15 +1787,17 @@ def main():
                 except Exception as e:
                     st.error(f"❌ Erro: {e}")
     
-    # Tabs
-    tabs = st.tabs([
-        "🏠 Dashboard", "🔨 Construtor", "🧠 Oráculo", "⭐ Favoritos",
-        "📅 Calendário", "🎯 Análise", "⚖️ Comparação", "🔍 Scanner",
-        "📊 Ligas", "👥 Times", "🎲 Monte Carlo", "📈 Histórico", "🚀 Performance"
-    ])
+    # Navegação: só a seção ativa é executada a cada rerun
+    section = st.radio(
+        "Seção:",
+        SECTIONS,
+        horizontal=True,
+        key="nav_section",
+        label_visibility="collapsed"
+    )
     
     # ABA 1: DASHBOARD COM FILTROS
-    with tabs[0]:
+    if section == SECTIONS[0]:
         st.markdown("# 🏠 Dashboard Supreme")
         
         # NOVO: Filtros de Data e Liga
@@ -2200,7 +1871,7 @@ def main():
                     
                     with col_rec1:
                         # NOVO V36.3: Criar objeto line para badges
-                        line_obj = {'mercado': rec['linha'], 'prob': rec['prob']}
+                        line_obj = {'mercado': rec['linha'], 'prob': rec['prob'], 'odd': rec['odd']}
                         pred_obj = {
                             'confidence': {'score': rec['confidence']},
                             'volatility': {'home': 20, 'away': 20},  # Placeholder
@@ -2219,7 +1890,7 @@ def main():
                             <p><strong>💎 Linha:</strong> {rec['linha']}</p>
                             <p><strong>📊 Probabilidade:</strong> {rec['prob']:.1f}%</p>
                             <p><strong>🎯 Confiança:</strong> {rec['confidence']}/100</p>
-                            <p><strong>📈 EV Estimado:</strong> {rec['ev']:+.1f}%</p>
+                            <p><strong>📈 EV Estimado:</strong> {rec['ev']:+.1f}% @ {rec['odd']:.2f}</p>
                         </div>
                         """, unsafe_allow_html=True)
                     
@@ -2233,6 +1904,7 @@ def main():
         st.markdown("---")
         
         # Gráfico de distribuição
+        import plotly.express as px
         fig = px.histogram(
             df,
             x='Total_Corners',
@@ -2253,7 +1925,7 @@ def main():
         st.plotly_chart(fig, use_container_width=True)
     
     # ABA 2: CONSTRUTOR COM BOOKMAKER COMPARISON + PROFIT CALCULATOR + EXPORT
-    with tabs[1]:
+    if section == SECTIONS[1]:
         st.markdown("# 🔨 Construtor de Bilhetes ULTIMATE")
         
         col_const1, col_const2 = st.columns([2, 1])
@@ -2281,28 +1953,63 @@ def main():
                         
                         st.markdown("---")
                         
-                        # NOVO: Bookmaker Comparison
+                        # Gerar linhas (com a melhor odd real de cada uma, quando houver cotação)
+                        all_lines = predictor.generate_all_lines(pred)
+                        for line, odd in zip(all_lines, predictor.line_odds(home, away, data_sel, all_lines)):
+                            line['odd'] = None if np.isnan(odd) else float(odd)
+                        
+                        # NOVO: Bookmaker Comparison (mercado da linha recomendada)
+                        smart_line = predictor.find_smart_line(pred)
+                        market = line_market(smart_line) if smart_line else None
+                        base_odd = BASE_ODD
+                        bookmaker_odds = predictor.get_bookmaker_odds(base_odd, home, away, data_sel, market)
+                        real_odds = bool(market) and predictor.odds is not None and \
+                            bool(predictor.odds.market_odds(home, away, data_sel, market))
+                        
                         st.markdown("### 💰 Comparação de Bookmakers")
-                        base_odd = 1.90
-                        bookmaker_odds = predictor.get_bookmaker_odds(base_odd)
+                        if real_odds:
+                            st.caption(f"Cotações reais: {market}")
+                        else:
+                            st.caption(f"Sem cotação para o jogo: odds simuladas a partir de {base_odd:.2f}")
                         
                         best_bookie = max(bookmaker_odds, key=bookmaker_odds.get)
                         best_odd = bookmaker_odds[best_bookie]
+                        reference = min(bookmaker_odds.values()) if real_odds else base_odd
                         
-                        cols_book = st.columns(5)
+                        cols_book = st.columns(len(bookmaker_odds))
                         for i, (bookie, odd) in enumerate(bookmaker_odds.items()):
                             with cols_book[i]:
                                 if bookie == best_bookie:
                                     st.success(f"⭐ **{bookie}**")
-                                    st.metric("Odd", f"{odd:.2f}", delta=f"+{((odd-base_odd)/base_odd*100):.1f}%")
+                                    st.metric("Odd", f"{odd:.2f}", delta=f"+{((odd-reference)/reference*100):.1f}%")
                                 else:
                                     st.info(f"**{bookie}**")
                                     st.metric("Odd", f"{odd:.2f}")
                         
-                        st.markdown("---")
+                        shopping = shop(predictor.odds, [(home, away, data_sel)])
+                        if not shopping.empty:
+                            with st.expander("🛒 Line Shopping (melhor preço, margem e prob. justa)"):
+                                render_shopping(shopping, show_game=False)
+                                
+                                # Seleções no nome do OddsStore: 1X2/gols/handicap têm fechamento nos CSVs (CLV)
+                                selecoes = shopping.to_dict('records')
+                                col_sel, col_add = st.columns([4, 1])
+                                selecao = col_sel.selectbox(
+                                    "Adicionar ao bilhete:", selecoes, key="const_shop_sel",
+                                    format_func=lambda r: f"{r['Seleção']} @ {r['Melhor odd']:.2f} ({r['Casa']})")
+                                if col_add.button("➕", key="const_shop_add"):
+                                    st.session_state.bilhete.append({
+                                        'jogo': jogo_sel,
+                                        'data': data_sel,
+                                        'market': selecao['Seleção'],
+                                        'mercado': selecao['Seleção'],
+                                        'odd': round(float(selecao['Melhor odd']), 2),
+                                        # Sem estimativa do modelo para esses mercados: 'prob' fica de fora
+                                        'prob_justa': float(selecao['Prob. justa (%)'])
+                                    })
+                                    st.rerun()
                         
-                        # Gerar linhas
-                        all_lines = predictor.generate_all_lines(pred)
+                        st.markdown("---")
                         
                         tipos = {}
                         for line in all_lines:
@@ -2316,17 +2023,20 @@ def main():
                         for tipo, linhas in tipos.items():
                             with st.expander(f"{linhas[0]['icon']} {tipo}", expanded=True):
                                 for linha in linhas:
-                                    col_a, col_b, col_c, col_d = st.columns([3, 1, 1, 1])
+                                    col_a, col_b, col_c, col_e, col_d = st.columns([3, 1, 1, 1, 1])
                                     
                                     col_a.markdown(f"**{linha['mercado']}**")
                                     col_b.metric("Proj", f"{linha['projecao']:.2f}")
                                     col_c.metric("Prob", f"{linha['prob']:.0f}%")
+                                    col_e.metric("Odd", f"{linha['odd']:.2f}" if linha['odd'] else "-")
                                     
                                     if col_d.button("➕", key=f"add_{tipo}_{linha['mercado']}"):
                                         st.session_state.bilhete.append({
                                             'jogo': jogo_sel,
+                                            'data': data_sel,
+                                            'market': line_market(linha),
                                             'mercado': linha['mercado'],
-                                            'odd': best_odd,  # Usa melhor odd
+                                            'odd': linha['odd'] or best_odd,  # Odd real da linha ou melhor simulada
                                             'prob': linha['prob']
                                         })
                                         st.rerun()
@@ -2341,7 +2051,8 @@ def main():
                         <strong>{aposta['jogo']}</strong><br>
                         {aposta['mercado']}<br>
                         <strong>Odd:</strong> {aposta['odd']:.2f}<br>
-                        <strong>Prob:</strong> {aposta['prob']:.0f}%
+                        {f"<strong>Prob:</strong> {aposta['prob']:.0f}%" if 'prob' in aposta
+                         else f"<strong>Prob. justa (casas):</strong> {aposta['prob_justa']:.0f}%"}
                     </div>
                     """, unsafe_allow_html=True)
                     
@@ -2381,6 +2092,14 @@ def main():
                 
                 st.markdown("---")
                 
+                # Cada seleção vira uma aposta simples no histórico (ROI e CLV)
+                stake_selecao = st.number_input("Stake por seleção (R$):", min_value=1.0, value=10.0, step=5.0, key="const_stake")
+                if st.button("📝 Registrar no Histórico", use_container_width=True):
+                    for aposta in st.session_state.bilhete:
+                        analytics.add_bet({**aposta, 'stake': stake_selecao, 'result': 'pending'})
+                    st.session_state.bilhete = []
+                    st.rerun()
+                
                 col_btn1, col_btn2 = st.columns(2)
                 
                 # NOVO: Export para PNG
@@ -2401,7 +2120,7 @@ def main():
                 st.info("Nenhuma seleção adicionada ainda.")
     
     # ABA 3: ORÁCULO (mesmo da V36.0)
-    with tabs[2]:
+    if section == SECTIONS[2]:
         st.markdown("# 🧠 Oráculo Supreme")
         
         st.markdown("""
@@ -2432,6 +2151,9 @@ def main():
             
             with st.chat_message('assistant', avatar='🧠'):
                 with st.spinner("🧠 Analisando..."):
+                    # Filtros do Dashboard valem para "Top 5 jogos de hoje"
+                    st.session_state.contexto_oraculo['dashboard_date'] = st.session_state.dashboard_date
+                    st.session_state.contexto_oraculo['dashboard_league'] = st.session_state.dashboard_league
                     resultado = oraculo.processar_chat(prompt, st.session_state.contexto_oraculo)
                     st.markdown(resultado['texto'], unsafe_allow_html=True)
             
@@ -2444,13 +2166,14 @@ def main():
             st.rerun()
     
     # ABA 4: FAVORITOS (NOVO!)
-    with tabs[3]:
+    if section == SECTIONS[3]:
         st.markdown("# ⭐ Meus Favoritos")
         
-        if st.session_state.favorites:
-            st.success(f"Você tem {len(st.session_state.favorites)} jogo(s) favoritado(s)")
+        favorites = get_ledger().favorites(Utils.current_user())
+        if favorites:
+            st.success(f"Você tem {len(favorites)} jogo(s) favoritado(s)")
             
-            for fav in st.session_state.favorites:
+            for fav in favorites:
                 col1, col2 = st.columns([5, 1])
                 
                 with col1:
@@ -2469,7 +2192,7 @@ def main():
             st.info("Você ainda não tem favoritos. Adicione jogos clicando em ⭐ no Dashboard!")
     
     # ABA 5: CALENDÁRIO
-    with tabs[4]:
+    if section == SECTIONS[4]:
         st.markdown("# 📅 Calendário de Jogos")
         
         datas_cal = sorted(calendar['Data'].unique())
@@ -2482,249 +2205,19 @@ def main():
             st.dataframe(cal_filtrado, use_container_width=True, height=600)
     
     # ABA 6: ANÁLISE 360°
-    with tabs[5]:
-        st.markdown("# 🎯 Análise 360°")
-        
-        teams = sorted(list(df['HomeTeam'].unique()))
-        
-        if teams:
-            col_an1, col_an2 = st.columns(2)
-            
-            home_sel = col_an1.selectbox("🏠 Casa:", teams, key="an_home")
-            away_sel = col_an2.selectbox("✈️ Fora:", teams, key="an_away")
-            
-            if st.button("🔥 ANALISAR", type="primary", use_container_width=True):
-                with st.spinner("🔮 Processando análise completa..."):
-                    pred = predictor.predict_full(home_sel, away_sel)
-                    
-                    if pred:
-                        st.success("✅ Análise concluída!")
-                        
-                        # NOVO V36.3: Validações e Avisos de Qualidade
-                        warnings = ValidationEngine.validate_prediction(pred, home_sel, away_sel)
-                        quality_score = ValidationEngine.calculate_quality_score(pred, warnings)
-                        
-                        if warnings:
-                            st.markdown("### ⚠️ Avisos de Qualidade")
-                            for warning in warnings:
-                                if warning['type'] == 'danger':
-                                    st.error(f"{warning['icon']} {warning['message']}")
-                                elif warning['type'] == 'warning':
-                                    st.warning(f"{warning['icon']} {warning['message']}")
-                                elif warning['type'] == 'success':
-                                    st.success(f"{warning['icon']} {warning['message']}")
-                                else:
-                                    st.info(f"{warning['icon']} {warning['message']}")
-                            
-                            # Score de Qualidade
-                            if quality_score >= 80:
-                                st.success(f"📊 **Score de Qualidade:** {quality_score}/100 - Excelente!")
-                            elif quality_score >= 60:
-                                st.info(f"📊 **Score de Qualidade:** {quality_score}/100 - Bom")
-                            else:
-                                st.warning(f"📊 **Score de Qualidade:** {quality_score}/100 - Revisar análise")
-                            
-                            st.markdown("---")
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        
-                        col1.metric("Escanteios", f"{pred['corners']['total']:.2f}")
-                        col2.metric("P80", pred['corners']['p80'])
-                        col3.metric("Cartões", f"{pred['cards']['total']:.2f}")
-                        col4.metric("Confiança", f"{pred['confidence']['score']}/100")
-                        
-                        st.markdown("---")
-                        
-                        st.markdown("### 📊 Comparação Visual")
-                        
-                        home_stats = {
-                            'corners': pred['corners']['home'],
-                            'cards': pred['cards']['home'],
-                            'goals': pred['goals']['home'],
-                            'fouls': pred['fouls']['home']
-                        }
-                        
-                        away_stats = {
-                            'corners': pred['corners']['away'],
-                            'cards': pred['cards']['away'],
-                            'goals': pred['goals']['away'],
-                            'fouls': pred['fouls']['away']
-                        }
-                        
-                        fig_radar = viz.radar_chart(home_stats, away_stats, home_sel, away_sel)
-                        st.plotly_chart(fig_radar, use_container_width=True)
-                        
-                        st.markdown("---")
-                        
-                        st.markdown("### 📋 Todas as Linhas")
-                        
-                        all_lines = predictor.generate_all_lines(pred)
-                        lines_df = pd.DataFrame(all_lines)
-                        lines_df = lines_df[lines_df['prob'] >= 50].sort_values('prob', ascending=False)
-                        
-                        st.dataframe(
-                            lines_df[['tipo', 'mercado', 'projecao', 'prob']].style.format({
-                                'projecao': '{:.2f}',
-                                'prob': '{:.1f}%'
-                            }),
-                            use_container_width=True
-                        )
-                    else:
-                        st.error("❌ Dados insuficientes para análise.")
+    if section == SECTIONS[5]:
+        render_analise(df, predictor, viz)
     
     # ABA 7: TEAM COMPARISON TOOL (NOVO!)
-    with tabs[6]:
-        st.markdown("# ⚖️ Comparação de Times")
-        
-        teams = sorted(list(df['HomeTeam'].unique()))
-        
-        col_comp1, col_comp2 = st.columns(2)
-        
-        team1 = col_comp1.selectbox("Time 1:", teams, key="comp_t1")
-        team2 = col_comp2.selectbox("Time 2:", teams, key="comp_t2")
-        
-        if st.button("⚖️ COMPARAR", type="primary", use_container_width=True):
-            with st.spinner("Comparando..."):
-                data1 = df[(df['HomeTeam'] == team1) | (df['AwayTeam'] == team1)]
-                data2 = df[(df['HomeTeam'] == team2) | (df['AwayTeam'] == team2)]
-                
-                if not data1.empty and not data2.empty:
-                    stats1 = {
-                        'corners': data1['Total_Corners'].mean(),
-                        'cards': data1['Total_Cards'].mean(),
-                        'goals': data1['Total_Goals'].mean(),
-                        'fouls': data1['Total_Fouls'].mean(),
-                        'volatility': MathEngineSupreme.volatility_index(data1['Total_Corners'].values)
-                    }
-                    
-                    stats2 = {
-                        'corners': data2['Total_Corners'].mean(),
-                        'cards': data2['Total_Cards'].mean(),
-                        'goals': data2['Total_Goals'].mean(),
-                        'fouls': data2['Total_Fouls'].mean(),
-                        'volatility': MathEngineSupreme.volatility_index(data2['Total_Corners'].values)
-                    }
-                    
-                    st.markdown("### 📊 Comparação Estatística")
-                    
-                    col_s1, col_s2, col_s3 = st.columns(3)
-                    
-                    with col_s1:
-                        st.markdown(f"#### {team1}")
-                        st.metric("Escanteios/Jogo", f"{stats1['corners']:.2f}")
-                        st.metric("Cartões/Jogo", f"{stats1['cards']:.2f}")
-                        st.metric("Gols/Jogo", f"{stats1['goals']:.2f}")
-                        st.metric("Volatilidade", f"{stats1['volatility']:.1f}%")
-                    
-                    with col_s2:
-                        st.markdown("#### vs")
-                        st.markdown("<br>" * 10, unsafe_allow_html=True)
-                    
-                    with col_s3:
-                        st.markdown(f"#### {team2}")
-                        st.metric("Escanteios/Jogo", f"{stats2['corners']:.2f}")
-                        st.metric("Cartões/Jogo", f"{stats2['cards']:.2f}")
-                        st.metric("Gols/Jogo", f"{stats2['goals']:.2f}")
-                        st.metric("Volatilidade", f"{stats2['volatility']:.1f}%")
-                    
-                    st.markdown("---")
-                    
-                    st.markdown("### 📊 Radar Chart Comparativo")
-                    fig_comp = viz.radar_chart(stats1, stats2, team1, team2)
-                    st.plotly_chart(fig_comp, use_container_width=True)
+    if section == SECTIONS[6]:
+        render_comparacao(df, viz)
     
     # ABA 8: SCANNER
-    with tabs[7]:
-        st.markdown("# 🔍 Scanner Multi-Critério")
-        
-        st.markdown("### ⚙️ Filtros")
-        
-        # NOVO V36.2: Filtro de Data
-        datas_scanner = sorted(calendar['Data'].unique())
-        
-        col_scan_date, col_scan_today = st.columns([3, 1])
-        
-        with col_scan_date:
-            if 'scanner_date' not in st.session_state:
-                st.session_state.scanner_date = datetime.today().strftime("%d/%m/%Y")
-            
-            # Garantir que a data existe na lista
-            if st.session_state.scanner_date not in datas_scanner:
-                st.session_state.scanner_date = datas_scanner[0] if datas_scanner else datetime.today().strftime("%d/%m/%Y")
-            
-            selected_scanner_date = st.selectbox(
-                "📅 Data:",
-                datas_scanner,
-                index=datas_scanner.index(st.session_state.scanner_date) if st.session_state.scanner_date in datas_scanner else 0,
-                key="scanner_date_select"
-            )
-            st.session_state.scanner_date = selected_scanner_date
-        
-        with col_scan_today:
-            if st.button("📅 Hoje", key="scanner_today_btn", use_container_width=True):
-                st.session_state.scanner_date = datetime.today().strftime("%d/%m/%Y")
-                st.rerun()
-        
-        st.markdown("---")
-        
-        col_f1, col_f2, col_f3 = st.columns(3)
-        
-        min_conf = col_f1.slider("Confiança Mínima:", 0, 100, 70)
-        min_prob = col_f2.slider("Probabilidade Mínima:", 0, 100, 60)
-        min_ev = col_f3.slider("EV Mínimo (%):", -20, 50, 10)
-        
-        if st.button("🔍 ESCANEAR", type="primary", use_container_width=True):
-            with st.spinner("🔍 Escaneando calendário..."):
-                opportunities = []
-                
-                # NOVO V36.2: Filtrar calendário pela data selecionada
-                calendar_filtered = calendar[calendar['Data'] == st.session_state.scanner_date]
-                
-                if calendar_filtered.empty:
-                    st.warning(f"⚠️ Nenhum jogo encontrado para {st.session_state.scanner_date}")
-                else:
-                    for _, row in calendar_filtered.iterrows():
-                        home = row['HomeTeam']
-                        away = row['AwayTeam']
-                        
-                        pred = predictor.predict_full(home, away)
-                        
-                        if pred and pred['confidence']['score'] >= min_conf:
-                            smart_line = predictor.find_smart_line(pred)
-                            
-                            if smart_line and smart_line['prob'] >= min_prob:
-                                ev = MathEngineSupreme.expected_value(smart_line['prob'] / 100, 1.90) * 100
-                                
-                                if ev >= min_ev:
-                                    opportunities.append({
-                                        'Jogo': f"{home} x {away}",
-                                        'Data': row.get('Data', 'N/A'),
-                                        'Linha': smart_line['mercado'],
-                                        'Prob (%)': smart_line['prob'],
-                                        'Confiança': pred['confidence']['score'],
-                                        'EV (%)': ev,
-                                        'Score': pred['confidence']['score'] + smart_line['prob'] / 2
-                                    })
-                    
-                    if opportunities:
-                        df_opp = pd.DataFrame(opportunities)
-                        df_opp = df_opp.sort_values('Score', ascending=False)
-                        
-                        st.success(f"✅ {len(df_opp)} oportunidades encontradas para {st.session_state.scanner_date}!")
-                        
-                        st.dataframe(
-                            df_opp.style.format({
-                                'Prob (%)': '{:.1f}',
-                                'EV (%)': '{:+.1f}',
-                                'Score': '{:.1f}'
-                            }),
-                            use_container_width=True
-                        )
-                    else:
-                        st.warning(f"⚠️ Nenhuma oportunidade encontrada para {st.session_state.scanner_date} com os critérios selecionados.")
+    if section == SECTIONS[7]:
+        render_scanner(calendar, oraculo)
     
     # ABA 9: LIGAS
-    with tabs[8]:
+    if section == SECTIONS[8]:
         st.markdown("# 📊 Análise por Liga")
         
         liga_stats = df.groupby('League').agg({
@@ -2739,6 +2232,7 @@ def main():
         
         st.markdown("---")
         
+        import plotly.express as px
         fig = px.bar(
             liga_stats.reset_index(),
             x='League',
@@ -2758,149 +2252,20 @@ def main():
         st.plotly_chart(fig, use_container_width=True)
     
     # ABA 10: TIMES
-    with tabs[9]:
-        st.markdown("# 👥 DNA dos Times")
-        
-        teams = sorted(list(df['HomeTeam'].unique()))
-        time_sel = st.selectbox("Selecione Time:", teams, key="times_sel")
-        
-        if time_sel:
-            time_data = df[(df['HomeTeam'] == time_sel) | (df['AwayTeam'] == time_sel)]
-            
-            st.markdown("### 📊 Métricas Principais")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            col1.metric("⚽ Escanteios/Jogo", f"{time_data['Total_Corners'].mean():.2f}")
-            col2.metric("🟨 Cartões/Jogo", f"{time_data['Total_Cards'].mean():.2f}")
-            col3.metric("🎯 Gols/Jogo", f"{time_data['Total_Goals'].mean():.2f}")
-            col4.metric("🚫 Faltas/Jogo", f"{time_data['Total_Fouls'].mean():.2f}")
-            
-            st.markdown("---")
-            
-            volatility = MathEngineSupreme.volatility_index(time_data['Total_Corners'].values)
-            
-            st.markdown("### 📈 Análise de Volatilidade")
-            st.markdown(ui.progress_bar(volatility, 50, f"{volatility:.1f}%"), unsafe_allow_html=True)
-            
-            if volatility < 20:
-                st.success("✅ Time muito consistente (volatilidade baixa)")
-            elif volatility < 35:
-                st.info("ℹ️ Time moderadamente consistente")
-            else:
-                st.warning("⚠️ Time imprevisível (volatilidade alta)")
-            
-            st.markdown("---")
-            
-            st.markdown("### 📋 Relatório Técnico")
-            
-            col_r1, col_r2 = st.columns(2)
-            
-            with col_r1:
-                st.markdown("#### 🏠 Como Mandante")
-                home_games = time_data[time_data['HomeTeam'] == time_sel]
-                if not home_games.empty:
-                    st.metric("Escanteios", f"{home_games['HC'].mean():.2f}")
-                    st.metric("Cartões", f"{home_games['HY'].mean():.2f}")
-                    st.metric("Faltas", f"{home_games['HF'].mean():.2f}")
-            
-            with col_r2:
-                st.markdown("#### ✈️ Como Visitante")
-                away_games = time_data[time_data['AwayTeam'] == time_sel]
-                if not away_games.empty:
-                    st.metric("Escanteios", f"{away_games['AC'].mean():.2f}")
-                    st.metric("Cartões", f"{away_games['AY'].mean():.2f}")
-                    st.metric("Faltas", f"{away_games['AF'].mean():.2f}")
-            
-            st.markdown("---")
-            
-            fig = px.histogram(
-                time_data,
-                x='Total_Corners',
-                nbins=15,
-                title=f"Distribuição de Escanteios - {time_sel}",
-                color_discrete_sequence=['#3B82F6']
-            )
-            
-            theme = st.session_state.theme
-            fig.update_layout(
-                paper_bgcolor='white' if theme == 'light' else '#0f172a',
-                plot_bgcolor='#F8FAFC' if theme == 'light' else '#1e293b',
-                font=dict(color='#1E293B' if theme == 'light' else '#f1f5f9')
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+    if section == SECTIONS[9]:
+        render_times(df, ui)
     
     # ABA 11: MONTE CARLO
-    with tabs[10]:
-        st.markdown("# 🎲 Monte Carlo Estratégico")
-        
-        lam = st.number_input("Média Esperada:", value=10.0, min_value=1.0, max_value=20.0, step=0.5)
-        n_sims = st.selectbox("Nº Simulações:", [1000, 5000, 10000], index=2)
-        
-        if st.button("🎲 SIMULAR", type="primary", use_container_width=True):
-            with st.spinner(f"🎲 Simulando {n_sims:,} jogos..."):
-                result = MathEngineSupreme.monte_carlo_simulation(lam, n_sims)
-                
-                st.success(f"✅ {n_sims:,} simulações concluídas!")
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                col1.metric("Média", f"{result['mean']:.2f}")
-                col2.metric("P50", result['p50'])
-                col3.metric("P80", result['p80'])
-                col4.metric("P95", result['p95'])
-                
-                st.markdown("---")
-                
-                st.markdown("### 💎 Recomendações Estratégicas")
-                
-                if result['over_10_5'] >= 0.70:
-                    st.markdown(f"""
-                    <div class="card-success">
-                    <strong>✅ Over 10.5:</strong> Altamente recomendado (Prob: {result['over_10_5']*100:.1f}%)
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                if result['over_11_5'] >= 0.60:
-                    st.markdown(f"""
-                    <div class="card-success">
-                    <strong>✅ Over 11.5:</strong> Recomendado (Prob: {result['over_11_5']*100:.1f}%)
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                if result['over_12_5'] < 0.40:
-                    st.markdown(f"""
-                    <div class="card-warning">
-                    <strong>⚠️ Over 12.5:</strong> Risco alto (Prob: {result['over_12_5']*100:.1f}%)
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("---")
-                
-                fig = px.histogram(
-                    x=result['samples'],
-                    nbins=20,
-                    title="Distribuição das Simulações",
-                    color_discrete_sequence=['#3B82F6']
-                )
-                
-                theme = st.session_state.theme
-                fig.update_layout(
-                    paper_bgcolor='white' if theme == 'light' else '#0f172a',
-                    plot_bgcolor='#F8FAFC' if theme == 'light' else '#1e293b',
-                    font=dict(color='#1E293B' if theme == 'light' else '#f1f5f9'),
-                    xaxis_title="Escanteios",
-                    yaxis_title="Frequência"
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+    if section == SECTIONS[10]:
+        render_monte_carlo()
     
     # ABA 12: HISTÓRICO (NOVO!)
-    with tabs[11]:
+    if section == SECTIONS[11]:
         st.markdown("# 📈 Histórico & Analytics")
         
-        if st.session_state.bets_history:
+        ledger, user = get_ledger(), Utils.current_user()
+        n_bets = ledger.totals(user)['bets']
+        if n_bets:
             roi_data = analytics.calculate_roi()
             win_rate = analytics.win_rate()
             
@@ -2915,19 +2280,34 @@ def main():
             
             st.markdown("### 📊 Histórico de Apostas")
             
-            df_bets = pd.DataFrame(st.session_state.bets_history)
+            df_bets = pd.DataFrame(ledger.recent_bets(user, HISTORY_TABLE_ROWS))
+            resolved = analytics.clv_tracker(predictor.odds).resolved
+            df_bets['fechamento'] = [resolved[i]['closing'] if i in resolved else None for i in df_bets['id']]
+            df_bets['clv (%)'] = [round(resolved[i]['clv'], 2) if i in resolved else None for i in df_bets['id']]
             st.dataframe(df_bets, use_container_width=True)
+            st.caption(f"Últimas {len(df_bets)} apostas de {n_bets}. Fechamento/CLV vêm dos CSVs só para 1X2, "
+                       "gols 2.5 e handicap asiático (quando a linha de fechamento é a da aposta); escanteios e "
+                       "cartões dependem da coluna Fechamento em odds/.")
+            
+            # Resolver apostas pendentes: atualiza totais, streak e curva da banca no Ledger
+            pending = ledger.pending_bets(user, limit=HISTORY_TABLE_ROWS)
+            if pending:
+                st.markdown("### ✅ Resolver Aposta")
+                col1, col2, col3 = st.columns([3, 1, 1])
+                bet = col1.selectbox("Aposta pendente:", pending, key="settle_bet",
+                                     format_func=lambda b: f"#{b['id']} {b.get('jogo', '')} - {b.get('mercado', '')} "
+                                                           f"@ {b.get('odd', 0):.2f} (R$ {b['stake']:.2f})")
+                result = col2.radio("Resultado:", ['win', 'loss'], key="settle_result", horizontal=True,
+                                    format_func=lambda r: "✅ Green" if r == 'win' else "❌ Red")
+                if col3.button("Resolver", use_container_width=True):
+                    return_value = bet['stake'] * bet.get('odd', 0) if result == 'win' else 0
+                    analytics.update_bet_result(bet['id'], result, return_value)
+                    st.rerun()
             
             st.markdown("---")
             
             if st.button("🗑️ Limpar Histórico"):
-                st.session_state.bets_history = []
-                st.session_state.streak = {
-                    'current': 0,
-                    'best': 0,
-                    'total_wins': 0,
-                    'total_bets': 0
-                }
+                ledger.clear_bets(user)
                 st.rerun()
         else:
             st.info("📊 Nenhuma aposta registrada ainda. Comece a usar o Construtor!")
@@ -2943,10 +2323,12 @@ def main():
                 st.rerun()
     
     # ABA 13: PERFORMANCE & INSIGHTS (NOVO V36.3 PRO!)
-    with tabs[12]:
+    if section == SECTIONS[12]:
         st.markdown("# 🚀 Performance & Insights")
         
-        if not st.session_state.bets_history:
+        ledger, user = get_ledger(), Utils.current_user()
+        totals = ledger.totals(user)
+        if not totals['bets']:
             st.info("""
             📊 **Relatório de Performance**
             
@@ -2956,14 +2338,14 @@ def main():
             para ver análises detalhadas de performance!
             """)
         else:
-            # Calcular métricas
-            total_bets = len(st.session_state.bets_history)
-            wins = sum(1 for b in st.session_state.bets_history if b.get('result') == 'win')
-            losses = sum(1 for b in st.session_state.bets_history if b.get('result') == 'loss')
+            # Calcular métricas (totais mantidos pelo Ledger)
+            total_bets = totals['bets']
+            wins = totals['wins']
+            losses = totals['losses']
             win_rate = (wins / total_bets * 100) if total_bets > 0 else 0
             
-            total_staked = sum(b['stake'] for b in st.session_state.bets_history)
-            total_returns = sum(b.get('return', 0) for b in st.session_state.bets_history if b.get('result') == 'win')
+            total_staked = totals['stake']
+            total_returns = totals['win_return']
             roi = ((total_returns - total_staked) / total_staked * 100) if total_staked > 0 else 0
             profit = total_returns - total_staked
             
@@ -2984,32 +2366,16 @@ def main():
             # Performance por Mercado
             st.markdown("### 🎯 Performance por Mercado")
             
-            mercados = {}
-            for bet in st.session_state.bets_history:
-                mercado = bet['mercado']
-                if mercado not in mercados:
-                    mercados[mercado] = {'wins': 0, 'total': 0, 'profit': 0}
-                
-                mercados[mercado]['total'] += 1
-                if bet.get('result') == 'win':
-                    mercados[mercado]['wins'] += 1
-                    mercados[mercado]['profit'] += bet.get('return', 0) - bet['stake']
-                elif bet.get('result') == 'loss':
-                    mercados[mercado]['profit'] -= bet['stake']
-            
-            if mercados:
-                mercado_data = []
-                for merc, stats in mercados.items():
-                    wr = (stats['wins'] / stats['total'] * 100) if stats['total'] > 0 else 0
-                    mercado_data.append({
-                        'Mercado': merc,
-                        'Apostas': stats['total'],
-                        'Vitórias': stats['wins'],
-                        'Taxa (%)': wr,
-                        'Lucro (R$)': stats['profit']
-                    })
-                
-                df_mercados = pd.DataFrame(mercado_data)
+            mercados = ledger.market_totals(user)
+            
+            if not mercados.empty:
+                df_mercados = pd.DataFrame({
+                    'Mercado': mercados['mercado'],
+                    'Apostas': mercados['bets'],
+                    'Vitórias': mercados['wins'],
+                    'Taxa (%)': mercados['wins'] / mercados['bets'] * 100,
+                    'Lucro (R$)': mercados['profit']
+                })
                 df_mercados = df_mercados.sort_values('Taxa (%)', ascending=False)
                 
                 st.dataframe(
@@ -3028,19 +2394,51 @@ def main():
             
             st.markdown("---")
             
+            # CLV: odd apostada x odd de fechamento
+            st.markdown("### 📉 Closing Line Value (CLV)")
+            clv = analytics.clv_tracker(predictor.odds)
+            clv_summary = clv.summary()
+            
+            if clv_summary['apostas']:
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Apostas com Fechamento", clv_summary['apostas'])
+                col2.metric("CLV Médio", f"{clv_summary['clv_medio']:+.2f}%")
+                col3.metric("CLV Ponderado (stake)", f"{clv_summary['clv_ponderado']:+.2f}%")
+                col4.metric("Bateu o Fechamento", f"{clv_summary['bateu_fechamento']:.0f}%")
+                
+                clv_format = {'CLV médio (%)': '{:+.2f}', 'CLV ponderado (%)': '{:+.2f}', 'Bateu fechamento (%)': '{:.0f}'}
+                col_clv1, col_clv2 = st.columns(2)
+                with col_clv1:
+                    st.markdown("**Por mercado**")
+                    st.dataframe(clv.table('market').style.format(clv_format), use_container_width=True, hide_index=True)
+                with col_clv2:
+                    st.markdown("**Por mês**")
+                    st.dataframe(clv.table('period').style.format(clv_format), use_container_width=True, hide_index=True)
+            
+            pendentes_csv = clv_summary['pendentes'] - clv_summary['pendentes_sem_csv']
+            if pendentes_csv:
+                st.caption(f"⏳ {pendentes_csv} aposta(s) aguardando a odd de fechamento nos próximos CSVs")
+            if clv_summary['pendentes_sem_csv']:
+                st.caption(f"ℹ️ {clv_summary['pendentes_sem_csv']} aposta(s) sem fechamento nos CSVs (escanteios, cartões "
+                           "ou handicap sem a linha): os CSVs só trazem 1X2, gols 2.5 e handicap asiático na linha do "
+                           "jogo; largue cotações com a coluna Fechamento em odds/ para medir o CLV dessas linhas.")
+            if clv_summary['linha_diferente']:
+                st.caption(f"↔️ {clv_summary['linha_diferente']} aposta(s) de handicap fora do CLV: a linha de fechamento "
+                           "(AHCh) não é a da aposta, então as odds não são comparáveis.")
+            if not clv_summary['apostas'] and not clv_summary['pendentes'] and not clv_summary['linha_diferente']:
+                st.caption("Registre apostas pelo Construtor (com data e mercado) para acompanhar o CLV. "
+                           "Seleções de 1X2, gols 2.5 e handicap pelo Line Shopping do jogo têm fechamento nos CSVs.")
+            
+            st.markdown("---")
+            
             # Evolução da Banca
             st.markdown("### 📈 Evolução da Banca")
             
             banca_inicial = 1000  # Assumindo
-            evolucao = [banca_inicial]
-            
-            for bet in st.session_state.bets_history:
-                if bet.get('result') == 'win':
-                    evolucao.append(evolucao[-1] + (bet.get('return', 0) - bet['stake']))
-                elif bet.get('result') == 'loss':
-                    evolucao.append(evolucao[-1] - bet['stake'])
+            evolucao = banca_inicial + np.concatenate([[0.0], analytics.equity_curve()])
             
             # Gráfico de linha
+            import plotly.graph_objects as go
             fig_evolucao = go.Figure()
             fig_evolucao.add_trace(go.Scatter(
                 x=list(range(len(evolucao))),
@@ -3080,7 +2478,7 @@ def main():
             else:
                 insights.append("🔴 ROI negativo ou muito baixo. Revise gestão de banca.")
             
-            if mercados:
+            if not mercados.empty:
                 worst_market = df_mercados.iloc[-1]['Mercado']
                 worst_wr = df_mercados.iloc[-1]['Taxa (%)']
                 if worst_wr < 40:
@@ -3088,6 +2486,128 @@ def main():
             
             for insight in insights:
                 st.info(insight)
+        
+        st.markdown("---")
+        
+        # Calibração das probabilidades (backtest walk-forward)
+        st.markdown("### 📐 Calibração das Probabilidades")
+        st.caption("Linhas do trecho final da temporada: probabilidade prevista x frequência observada. "
+                   "A calibrada foi ajustada só nos jogos anteriores ao trecho.")
+        
+        report = get_calibration_report(version)
+        calib_result, calib_maps = report['result'], report['maps']
+        tipos = list(dict.fromkeys(calib_result.tipos))
+        
+        if len(calib_result.games) and calib_maps.tables:
+            tipo_sel = st.selectbox("Mercado:", tipos, key="calib_tipo")
+            diagram = reliability(calib_result, calib_maps, tipo_sel)
+            
+            import plotly.graph_objects as go
+            fig_calib = go.Figure()
+            fig_calib.add_trace(go.Scatter(x=[0, 100], y=[0, 100], mode='lines', name='Perfeita',
+                                           line=dict(color='#94A3B8', dash='dash')))
+            for versao, color in (('Bruta', '#EF4444'), ('Calibrada', '#10B981')):
+                curve = diagram[diagram['versao'] == versao]
+                fig_calib.add_trace(go.Scatter(
+                    x=curve['prevista'], y=curve['observada'], mode='lines+markers', name=versao,
+                    line=dict(color=color, width=3), marker=dict(size=6 + 14 * curve['linhas'] / diagram['linhas'].max()),
+                    customdata=curve['linhas'], hovertemplate="prevista %{x:.1f}% | observada %{y:.1f}% | %{customdata} linhas"
+                ))
+            fig_calib.update_layout(
+                title=f"Diagrama de Confiabilidade — {tipo_sel}",
+                xaxis_title="Probabilidade prevista (%)", yaxis_title="Frequência observada (%)",
+                xaxis=dict(range=[0, 100]), yaxis=dict(range=[0, 100]), height=420
+            )
+            st.plotly_chart(fig_calib, use_container_width=True)
+            
+            col_c1, col_c2, col_c3 = st.columns(3)
+            col_c1.metric("Brier (Poisson)", f"{calib_result.brier(tipo_sel):.4f}")
+            mask = np.array([t == tipo_sel for t in calib_result.tipos])
+            probs_cal = calib_maps.apply(tipo_sel, calib_result.probs[:, mask]) / 100
+            brier_cal = float(np.nanmean((probs_cal - calib_result.hits[:, mask]) ** 2))
+            col_c2.metric("Brier (calibrada)", f"{brier_cal:.4f}", delta=f"{brier_cal - calib_result.brier(tipo_sel):+.4f}",
+                          delta_color="inverse")
+            col_c3.metric("Linhas no ajuste", f"{calib_maps.lines.get(tipo_sel, 0):,}")
+        else:
+            st.info("Jogos insuficientes para o backtest de calibração.")
+        
+        st.markdown("---")
+        
+        # NOVO: Perfil de execução (core.metrics) ao lado da saúde do sistema
+        st.markdown("### ⏱️ Perfil de Execução")
+        st.caption("Chamadas e latência por operação desde o início do processo (todas as sessões)")
+        
+        perf = metrics_registry.snapshot()
+        col_perf1, col_perf2 = st.columns([3, 1])
+        
+        with col_perf1:
+            if perf:
+                df_perf = pd.DataFrame([
+                    {
+                        'Operação': op,
+                        'Chamadas': stats['count'],
+                        'Erros': stats['errors'],
+                        'Média (ms)': stats['avg_ms'],
+                        'p50 (ms)': stats['p50_ms'],
+                        'p95 (ms)': stats['p95_ms'],
+                        'Máx (ms)': stats['max_ms'],
+                        'Total (s)': stats['total_ms'] / 1000
+                    }
+                    for op, stats in perf.items()
+                ])
+                
+                st.dataframe(
+                    df_perf.style.format({
+                        'Média (ms)': '{:.1f}',
+                        'p50 (ms)': '≤{:.0f}',
+                        'p95 (ms)': '≤{:.0f}',
+                        'Máx (ms)': '{:.1f}',
+                        'Total (s)': '{:.2f}'
+                    }),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("Nenhuma operação medida ainda neste processo.")
+        
+        with col_perf2:
+            health_check = SystemHealthEngine.run_sanity_tests(df, calendar, refs)
+            system_stats = SystemHealthEngine.get_system_stats(df, get_ledger().totals(Utils.current_user())['bets'])
+            
+            st.metric("🧪 Score de Saúde", f"{health_check['health_score']}/100")
+            st.caption(f"{health_check['passed']}/{health_check['total']} testes de sanidade")
+            st.metric("📊 Jogos na Base", f"{system_stats['total_games']:,}")
+            st.caption(f"{system_stats['total_leagues']} ligas | {system_stats['total_teams']} times")
+        
+        if perf:
+            with st.expander("📊 Histograma de latência"):
+                op_sel = st.selectbox("Operação:", list(perf.keys()), key="perf_op")
+                buckets = perf[op_sel]['buckets']
+                st.bar_chart(
+                    pd.DataFrame({'Chamadas': list(buckets.values())}, index=[f"≤{b}ms" if b != '+Inf' else b for b in buckets]),
+                    use_container_width=True
+                )
+        
+        col_exp1, col_exp2, col_exp3 = st.columns(3)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        col_exp1.download_button(
+            label="⬇️ Exportar JSON",
+            data=metrics_registry.to_json(),
+            file_name=f"futprevisao_metrics_{timestamp}.json",
+            mime="application/json",
+            use_container_width=True
+        )
+        col_exp2.download_button(
+            label="⬇️ Exportar Prometheus",
+            data=metrics_registry.to_prometheus(),
+            file_name=f"futprevisao_metrics_{timestamp}.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
+        if col_exp3.button("🔄 Zerar Métricas", use_container_width=True):
+            metrics_registry.reset()
+            st.rerun()
     
     # Footer
     st.markdown("---")
@@ -3100,4 +2620,6 @@ def main():
     )
 
 if __name__ == "__main__":
-    main()
+    # Tempo total do rerun por seção (aparece no Perfil de Execução)
+    with timer(f"render {st.session_state.get('nav_section', SECTIONS[0])}"):
+        main()
@@ -5,32 +5,35 @@ Atualiza CSVs direto do Football-Data.co.uk
 ✅ Tratamento de erros robusto
 ✅ Relatório detalhado
 ✅ Verificação de integridade
+✅ Histórico por temporada (historico/<liga>/<temporada>.csv)
+
+Uso:
+    python atualizador.py                  # temporada atual (CURRENT_SEASON)
+    python atualizador.py --historico 3    # + as 3 temporadas anteriores, se ainda não baixadas
 """
 
+import argparse
 import requests
 import pandas as pd
 import os
 import shutil
 from datetime import datetime
 
+from core.config import CURRENT_SEASON, HISTORY_DIR, LEAGUE_CODES, LEAGUE_FILES
+from core.seasons import partition_path, previous_seasons, write_partition
+
+parser = argparse.ArgumentParser(description="Atualiza os CSVs do Football-Data.co.uk")
+parser.add_argument('--historico', type=int, default=0, metavar='N',
+                    help="Baixa também as N temporadas anteriores para historico/")
+args = parser.parse_args()
+
 print("╔═══════════════════════════════════════════════════╗")
 print("║     ATUALIZADOR AUTOMÁTICO - FUTPREVISÃO V32.1    ║")
 print("╚═══════════════════════════════════════════════════╝")
 print()
 
-# Mapeamento das ligas
-LEAGUES = {
-    'E0': 'Premier_League_25_26.csv',
-    'SP1': 'La_Liga_25_26.csv',
-    'I1': 'Serie_A_25_26.csv',
-    'D1': 'Bundesliga_25_26.csv',
-    'F1': 'Ligue_1_25_26.csv',
-    'E1': 'Championship_Inglaterra_25_26.csv',
-    'D2': 'Bundesliga_2.csv',
-    'B1': 'Pro_League_Belgica_25_26.csv',
-    'T1': 'Super_Lig_Turquia_25_26.csv',
-    'SC0': 'Premiership_Escocia_25_26.csv'
-}
+# Mapeamento das ligas (código do Football-Data -> arquivo da temporada atual)
+LEAGUES = {LEAGUE_CODES[league]: filename for league, filename in LEAGUE_FILES.items()}
 
 # Criar backup antes de atualizar
 backup_folder = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -61,7 +64,7 @@ errors = []
 
 for code, filename in LEAGUES.items():
     try:
-        url = f"https://www.football-data.co.uk/mmz4281/2526/{code}.csv"
+        url = f"https://www.football-data.co.uk/mmz4281/{CURRENT_SEASON}/{code}.csv"
         
         print(f"📥 {filename:45s}", end=" ")
         
@@ -112,6 +115,49 @@ print()
 print("─────────────────────────────────────────────────────")
 print()
 
+# Histórico: temporadas encerradas não mudam, então só baixa partições que faltam
+history_downloaded = 0
+history_skipped = 0
+
+if args.historico > 0:
+    print(f"📚 Histórico ({args.historico} temporadas anteriores a {CURRENT_SEASON})...\n")
+
+    for season in previous_seasons(args.historico):
+        for code in LEAGUES:
+            target = partition_path(HISTORY_DIR, code, season)
+            label = f"{code}/{season}"
+
+            if os.path.exists(target):
+                history_skipped += 1
+                continue
+
+            print(f"📥 {label:45s}", end=" ")
+            try:
+                response = requests.get(f"https://www.football-data.co.uk/mmz4281/{season}/{code}.csv", timeout=15)
+                if response.status_code != 200:
+                    print(f"❌ HTTP {response.status_code}")
+                    errors.append(f"historico {label}: HTTP {response.status_code}")
+                    continue
+
+                test_df = pd.read_csv(pd.io.common.BytesIO(response.content))
+                if len(test_df) == 0:
+                    print(f"⚠️  Vazio")
+                    errors.append(f"historico {label}: CSV vazio")
+                    continue
+
+                write_partition(HISTORY_DIR, code, season, response.content)
+                history_downloaded += 1
+                print(f"✅ {len(test_df):3d} jogos")
+
+            except Exception as e:
+                print(f"❌ Erro")
+                errors.append(f"historico {label}: {str(e)[:50]}")
+
+    print(f"\n📚 Histórico: {history_downloaded} partições novas, {history_skipped} já existentes")
+    print()
+    print("─────────────────────────────────────────────────────")
+    print()
+
 # Resultado final
 if success_count == total:
     print(f"🎉 SUCESSO TOTAL! {success_count}/{total} ligas atualizadas")
@@ -134,6 +180,7 @@ report = f"""
    ✅ Atualizadas: {success_count}/{total}
    ❌ Erros: {error_count}/{total}
    💾 Backup: {backup_folder}
+   📚 Histórico: {history_downloaded} partições novas em {HISTORY_DIR}/
 
 📅 Data: {datetime.now().strftime('%d/%m/%Y')}
 ⏰ Hora: {datetime.now().strftime('%H:%M:%S')}
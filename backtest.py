@@ -0,0 +1,103 @@
+"""
+🧪 BACKTEST WALK-FORWARD - FutPrevisão
+Refaz a temporada jogo a jogo com predições que só enxergam os jogos anteriores e
+compara as linhas com os escanteios/cartões reais: acerto por mercado, calibração
+das probabilidades e ROI apostando a linha recomendada a uma odd fixa.
+
+Com --sweep, varre os parâmetros do modelo (fatores de escanteios, janela, peso
+recente, faixa da linha recomendada e limiares legados) num pool de processos e
+imprime o leaderboard.
+
+Uso:
+    python backtest.py                         # temporada atual, odd BASE_ODD
+    python backtest.py --historico 2           # inclui as 2 temporadas anteriores (historico/)
+    python backtest.py --odd 1.85 --min-conf 70
+    python backtest.py --path /dados/base --csv jogos_backtest.csv
+    python backtest.py --sweep random --trials 300 --workers 4 --top 15
+    python backtest.py --sweep grid --sort ece --csv leaderboard.csv
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from core.backtest import backtest, prepare
+from core.config import BASE_ODD, SEARCH_PATHS
+from core.data_loader import load_snapshot
+from core.seasons import SeasonStore, previous_seasons
+from core.sweep import SEARCH_SPACE, grid_candidates, random_candidates, run_sweep
+
+
+def sweep(matches: pd.DataFrame, args):
+    candidates = grid_candidates() if args.sweep == 'grid' else random_candidates(args.trials, seed=args.seed)
+    t0 = time.perf_counter()
+    features = prepare(matches, max_window=max(SEARCH_SPACE['window']))
+    print(f"🧮 Estado dos jogos montado em {time.perf_counter() - t0:.2f}s; avaliando {len(candidates):,} candidatos")
+
+    t0 = time.perf_counter()
+    board = run_sweep(features, candidates, workers=args.workers, odd=args.odd, min_conf=args.min_conf, sort_by=args.sort)
+    print(f"🏁 Varredura em {time.perf_counter() - t0:.1f}s\n")
+
+    with pd.option_context('display.float_format', '{:.3f}'.format, 'display.width', 200, 'display.max_columns', 30):
+        print(f"🏆 Leaderboard (ordenado por {args.sort}; roi_teste = trecho final, fora da ordenação)")
+        print(board.head(args.top).to_string())
+
+    if args.csv:
+        board.to_csv(args.csv, index=False)
+        print(f"\n📄 Leaderboard salvo: {args.csv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest walk-forward das linhas de escanteios e cartões")
+    parser.add_argument('--path', nargs='+', default=SEARCH_PATHS, help="Pastas com os CSVs")
+    parser.add_argument('--historico', type=int, default=0, help="Temporadas anteriores incluídas no replay")
+    parser.add_argument('--odd', type=float, default=BASE_ODD, help="Odd fixa para o ROI")
+    parser.add_argument('--min-conf', type=int, default=0, help="Confiança mínima para apostar")
+    parser.add_argument('--bins', type=int, default=10, help="Faixas da tabela de calibração")
+    parser.add_argument('--csv', help="Salva a projeção e a linha recomendada de cada jogo (ou o leaderboard)")
+    parser.add_argument('--sweep', choices=['grid', 'random'], help="Varredura de parâmetros em vez do backtest único")
+    parser.add_argument('--trials', type=int, default=200, help="Candidatos da varredura aleatória")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="Processos do pool (padrão: núcleos da máquina)")
+    parser.add_argument('--sort', default='roi', choices=['roi', 'acerto', 'brier', 'ece'])
+    parser.add_argument('--top', type=int, default=20, help="Linhas do leaderboard exibidas")
+    args = parser.parse_args()
+
+    matches = load_snapshot(args.path).matches
+    if args.historico > 0:
+        store = SeasonStore.open(args.path)
+        if store is None:
+            print("⚠️ Pasta historico/ não encontrada: só a temporada atual")
+        else:
+            past = store.load(seasons=previous_seasons(args.historico))
+            if not past.empty:
+                matches = pd.concat([past[past.columns.intersection(matches.columns)], matches], ignore_index=True)
+
+    if args.sweep:
+        sweep(matches, args)
+        return
+
+    t0 = time.perf_counter()
+    result = backtest(matches)
+    elapsed = time.perf_counter() - t0
+    print(f"🧪 {len(result.games):,} jogos reprocessados de {len(matches):,} em {elapsed:.2f}s\n")
+
+    with pd.option_context('display.float_format', '{:.1f}'.format, 'display.width', 140):
+        print("🎯 Acerto por mercado")
+        print(result.hit_rate(args.min_conf).to_string(), "\n")
+
+        print(f"💰 ROI da linha recomendada @ {args.odd:.2f}")
+        print(result.roi(args.odd, args.min_conf).to_string(), "\n")
+
+    with pd.option_context('display.float_format', '{:.3f}'.format, 'display.width', 140):
+        print(f"📐 Calibração (brier geral {result.brier():.4f})")
+        print(result.calibration(args.bins).to_string(index=False))
+
+    if args.csv:
+        result.games.to_csv(args.csv, index=False)
+        print(f"\n📄 Jogos salvos: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+📏 BENCHMARKS DOS MOTORES - FutPrevisão
+Mede carregamento, predição, linhas, recomendações, Monte Carlo, resolução de
+nomes e renderização do bilhete em bases de 1x, 10x e 100x o volume atual, e
+compara com a baseline gravada em benchmarks/baseline.json.
+
+Uso:
+    python benchmark.py                          # escalas 1 10 100, compara com a baseline
+    python benchmark.py --scales 1 10 --only predict
+    python benchmark.py --save-baseline          # grava a baseline desta máquina
+    python benchmark.py --threshold 0.4          # tolera até 40% de piora
+
+Sai com código 1 se algum benchmark ficar mais lento que baseline * (1 + threshold).
+A base escalada é montada num diretório temporário replicando os CSVs reais com
+os times renomeados por cópia (10x = 10 vezes mais jogos e times).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from core.config import CALENDAR_FILE, LEAGUE_FILES, REFEREES_FILE
+from core.backtest import backtest
+from core.data_loader import DataEngineSupreme, find_file, load_all_data
+from core.odds import OddsStore
+from core.oraculo import OraculoSupreme
+from core.predict import MathEngineSupreme, PredictionEngineSupreme
+from core.resolver import TeamResolver
+from core.ticket import render_ticket
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+N_FIXTURES = 50
+
+
+# ==============================================================================
+# BASE ESCALADA
+# ==============================================================================
+
+def _scaled(df: pd.DataFrame, scale: int, team_cols: Tuple[str, str]) -> pd.DataFrame:
+    """Replica o DataFrame `scale` vezes; a cópia j ganha times 'Nome #j'"""
+    copies = [df]
+    for j in range(1, scale):
+        copy = df.copy()
+        for col in team_cols:
+            copy[col] = copy[col].astype(str) + f" #{j}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def build_scaled_dataset(scale: int, target_dir: str) -> str:
+    """Grava ligas, calendário e árbitros escalados em target_dir"""
+    os.makedirs(target_dir, exist_ok=True)
+
+    for filename in LEAGUE_FILES.values():
+        source = find_file(filename)
+        if not source:
+            raise SystemExit(f"❌ {filename} não encontrado - benchmarks usam os CSVs reais como semente")
+        df = pd.read_csv(source, encoding='utf-8')
+        _scaled(df, scale, ('HomeTeam', 'AwayTeam')).to_csv(os.path.join(target_dir, filename), index=False)
+
+    calendar = find_file(CALENDAR_FILE)
+    cal = pd.read_csv(calendar, encoding='utf-8')
+    _scaled(cal, scale, ('Time_Casa', 'Time_Visitante')).to_csv(os.path.join(target_dir, CALENDAR_FILE), index=False)
+
+    referees = find_file(REFEREES_FILE)
+    if referees:
+        shutil.copy(referees, os.path.join(target_dir, REFEREES_FILE))
+
+    return target_dir
+
+
+# ==============================================================================
+# MEDIÇÃO
+# ==============================================================================
+
+def measure(fn: Callable, rounds: int, budget_s: float = 20.0, min_round_s: float = 0.05) -> Dict:
+    """Aquecimento + até `rounds` rodadas (para antes se estourar o orçamento)
+
+    Operações rápidas são repetidas dentro da rodada até somar min_round_s (como o
+    autorange do timeit), senão o ruído domina; os tempos reportados são por chamada.
+    """
+    t0 = time.perf_counter()
+    fn()
+    number = max(1, int(min_round_s / max(time.perf_counter() - t0, 1e-9)))
+
+    times = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+        if time.perf_counter() - started > budget_s and len(times) >= 2:
+            break
+    return {
+        'rounds': len(times),
+        'calls_per_round': number,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.mean(times),
+        'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0
+    }
+
+
+def sample_ticket() -> List[Dict]:
+    return [
+        {'jogo': f"Time {i} x Time {i + 1}", 'mercado': f"Over {8.5 + i}", 'odd': 1.80 + i / 10,
+         'prob': 70 - i, 'confidence': 80}
+        for i in range(5)
+    ]
+
+
+def noisy_queries(teams: List[str], n: int, seed: int = 42) -> List[str]:
+    """Nomes como usuários digitam: minúsculas, sem acento, com erro de digitação"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        name = rng.choice(teams).lower()
+        if len(name) > 4 and rng.random() < 0.5:
+            i = rng.randrange(1, len(name) - 1)
+            name = name[:i] + name[i + 1:]
+        queries.append(name)
+    return queries
+
+
+def cold_resolve(teams: List[str], queries: List[str]) -> List[str]:
+    """Resolver novo (sem memo): monta o índice e resolve todas as consultas"""
+    resolver = TeamResolver(teams)
+    return [resolver.resolve(q) for q in queries]
+
+
+def scale_benchmarks(data_dir: str) -> Dict[str, Callable]:
+    """Benchmarks que dependem do volume de dados"""
+    df, calendar, refs, _ = DataEngineSupreme.load_all_data([data_dir])
+    odds = OddsStore.from_matches(df)
+    predictor = PredictionEngineSupreme(df, odds=odds)
+    oraculo = OraculoSupreme(df, refs, calendar, predictor)
+
+    fixtures = list(zip(calendar['HomeTeam'], calendar['AwayTeam']))[:N_FIXTURES]
+    pred = next(p for p in (predictor.predict_full(h, a) for h, a in fixtures) if p)
+    busiest_date = calendar['Data'].value_counts().idxmax()
+    teams = sorted(set(df['HomeTeam']) | set(df['AwayTeam']))
+    queries = noisy_queries(teams, 200)
+    warm_resolver = TeamResolver(teams)
+
+    return {
+        'load_all_data': lambda: DataEngineSupreme.load_all_data([data_dir]),
+        'load_all_data (mmap)': lambda: load_all_data([data_dir], store_dir=os.path.join(data_dir, '.match_store')),
+        f'predict_full x{N_FIXTURES}': lambda: [predictor.predict_full(h, a) for h, a in fixtures],
+        f'predict_batch x{N_FIXTURES}': lambda: predictor.predict_batch(fixtures),
+        'generate_all_lines x100': lambda: [predictor.generate_all_lines(pred) for _ in range(100)],
+        'auto_recommendations': lambda: oraculo.auto_recommendations(date_filter=busiest_date),
+        'backtest walk-forward': lambda: backtest(df),
+        'odds extract': lambda: OddsStore.from_matches(df),
+        'resolve x200 (frio)': lambda: cold_resolve(teams, queries),
+        'resolve x200 (memo)': lambda: [warm_resolver.resolve(q) for q in queries],
+    }
+
+
+def fixed_benchmarks() -> Dict[str, Callable]:
+    """Benchmarks que não dependem do volume de dados (rodam uma vez)"""
+    ticket = sample_ticket()
+    return {
+        'monte_carlo 1k': lambda: MathEngineSupreme.monte_carlo_simulation(10.5, 1_000),
+        'monte_carlo 10k': lambda: MathEngineSupreme.monte_carlo_simulation(10.5, 10_000),
+        'monte_carlo 100k': lambda: MathEngineSupreme.monte_carlo_simulation(10.5, 100_000),
+        'render_ticket 5 seleções': lambda: render_ticket(ticket, 6.5),
+    }
+
+
+# ==============================================================================
+# BASELINE
+# ==============================================================================
+
+def machine_info() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'pandas': pd.__version__
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Tuple[str, float]]:
+    """(benchmark, razão mediana/baseline) dos que pioraram além do limite"""
+    regressions = []
+    for key, stats in results.items():
+        base = baseline.get(key)
+        if not base or base['median_s'] <= 0:
+            continue
+        ratio = stats['median_s'] / base['median_s']
+        stats['vs_baseline'] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def print_row(key: str, stats: Dict):
+    ratio = stats.get('vs_baseline')
+    flag = "" if ratio is None else f"  {ratio:5.2f}x baseline"
+    print(f"   {key:<40s} mediana {stats['median_s'] * 1000:10.2f}ms  "
+          f"mín {stats['min_s'] * 1000:10.2f}ms  ({stats['rounds']} rodadas){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks dos motores de predição e simulação")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help="Multiplicadores do volume atual")
+    parser.add_argument('--rounds', type=int, default=5, help="Rodadas medidas por benchmark")
+    parser.add_argument('--only', help="Roda só benchmarks cujo nome contém este texto")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Piora tolerada (0.25 = 25%%)")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="Grava os resultados como nova baseline")
+    parser.add_argument('--json', help="Salva os resultados em JSON")
+    args = parser.parse_args()
+
+    results = {}
+    selected = lambda name: not args.only or args.only in name
+
+    print("📏 Benchmarks fixos")
+    for name, fn in fixed_benchmarks().items():
+        if selected(name):
+            results[name] = measure(fn, args.rounds)
+            print_row(name, results[name])
+
+    with tempfile.TemporaryDirectory(prefix='futprevisao_bench_') as tmp:
+        for scale in args.scales:
+            t0 = time.perf_counter()
+            data_dir = build_scaled_dataset(scale, os.path.join(tmp, f"x{scale}"))
+            benches = scale_benchmarks(data_dir)
+            print(f"\n📏 Escala {scale}x (base montada em {time.perf_counter() - t0:.1f}s)")
+            for name, fn in benches.items():
+                if selected(name):
+                    key = f"{name} @{scale}x"
+                    results[key] = measure(fn, args.rounds)
+                    print_row(key, results[key])
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    regressions = compare(results, baseline, args.threshold) if baseline and not args.save_baseline else []
+
+    if baseline and not args.save_baseline:
+        print("\n📊 Comparação com a baseline")
+        for key, stats in results.items():
+            if 'vs_baseline' in stats:
+                print_row(key, stats)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_info(), 'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"\n📄 Resultado salvo: {args.json}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        merged = dict(baseline)
+        merged.update({k: {'median_s': round(v['median_s'], 6), 'min_s': round(v['min_s'], 6)} for k, v in results.items()})
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_info(), 'threshold': args.threshold, 'results': merged},
+                      f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Baseline gravada: {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressão(ões) acima de {args.threshold:.0%}:")
+        for key, ratio in regressions:
+            print(f"   {key}: {ratio:.2f}x")
+        sys.exit(1)
+    elif baseline and not args.save_baseline:
+        print(f"\n✅ Nenhuma regressão acima de {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+🔁 REPLAY LOCAL DO BOT TELEGRAM - FutPrevisão
+Mede throughput e latência dos handlers sem falar com o Telegram.
+
+Uso:
+    python bot_replay.py                              # 500 mensagens sintéticas do calendário
+    python bot_replay.py --messages 2000 --concurrency 50
+    python bot_replay.py --file conversas.jsonl       # replay gravado
+    python bot_replay.py --no-cache --no-rate-limit --json resultado.json
+
+Formato gravado: uma mensagem por linha, texto puro ou JSON
+{"chat_id": 123, "text": "Arsenal x Chelsea", "offset_ms": 150}.
+Com --realtime os offsets são respeitados; sem ele o replay roda o mais
+rápido possível, limitado por --concurrency mensagens simultâneas.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import traceback
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import bot_telegram as bot
+from core.config import CALENDAR_FILE
+from core.data_loader import find_file
+
+
+class ReplayChat:
+    def __init__(self, chat_id: int):
+        self.id = chat_id
+
+
+class ReplayMessage:
+    """Substituto de telegram.Message: guarda a resposta em vez de enviá-la"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.replies: List[str] = []
+        self.replied_at = None
+
+    async def reply_text(self, text: str, **kwargs):
+        self.replies.append(text)
+        self.replied_at = time.perf_counter()
+
+
+class ReplayUpdate:
+    """Substituto de telegram.Update com o mínimo usado pelos handlers"""
+
+    def __init__(self, chat_id: int, text: str):
+        self.effective_chat = ReplayChat(chat_id)
+        self.message = ReplayMessage(text)
+
+
+class UnlimitedBucket:
+    """Token bucket que nunca bloqueia (benchmark do caminho de análise)"""
+
+    def __init__(self, *args, **kwargs):
+        pass  # mesma assinatura do TokenBucket (ChatRateLimiter passa capacidade e recarga)
+
+    def try_take(self) -> bool:
+        return True
+
+
+def load_recorded(path: str) -> List[Dict]:
+    """Lê replay gravado (texto puro ou JSONL)"""
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                event = json.loads(line)
+            else:
+                event = {'text': line}
+            event.setdefault('chat_id', i)
+            event.setdefault('offset_ms', 0)
+            events.append(event)
+    return events
+
+
+def synthetic_events(n_messages: int, n_chats: int, seed: int = 42) -> List[Dict]:
+    """Gera consultas a partir do calendário, com poucos jogos concentrando a maior parte (dia de clássico)"""
+    fixtures = []
+    filepath = find_file(CALENDAR_FILE)
+    if filepath:
+        cal = pd.read_csv(filepath, encoding='utf-8')
+        fixtures = [f"{h} x {a}" for h, a in zip(cal['Time_Casa'], cal['Time_Visitante'])]
+    if not fixtures:
+        fixtures = ["Arsenal x Chelsea", "Real Madrid vs Betis", "Liverpool x Man City"]
+
+    rng = random.Random(seed)
+    # Popularidade tipo Zipf: o jogo i recebe peso 1/(i+1)
+    weights = [1 / (i + 1) for i in range(len(fixtures))]
+    variants = [str, str.lower, lambda q: q.replace(' x ', ' vs '), lambda q: f"Analisa {q}"]
+
+    events = []
+    offset = 0.0
+    for _ in range(n_messages):
+        fixture = rng.choices(fixtures, weights=weights)[0]
+        offset += rng.expovariate(1 / 20)  # ~50 msg/s de chegada no modo --realtime
+        events.append({
+            'chat_id': rng.randrange(n_chats),
+            'text': rng.choice(variants)(fixture),
+            'offset_ms': offset
+        })
+    return events
+
+
+def classify(reply: str) -> str:
+    if reply.startswith("⏳"):
+        return 'rate_limited'
+    if reply.startswith("🚦"):
+        return 'busy'
+    return 'ok'
+
+
+async def replay(events: List[Dict], concurrency: int, realtime: bool) -> Dict:
+    """Injeta as mensagens em handle_analysis e mede latência por mensagem"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    outcomes = {'ok': 0, 'rate_limited': 0, 'busy': 0, 'error': 0}
+    errors: Dict[str, int] = {}   # tipo da exceção -> ocorrências
+    first_traceback = []
+    started = time.perf_counter()
+
+    async def one(event: Dict):
+        if realtime:
+            delay = started + event['offset_ms'] / 1000 - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        async with semaphore:
+            update = ReplayUpdate(event['chat_id'], event['text'])
+            t0 = time.perf_counter()
+            try:
+                await bot.handle_analysis(update, None)
+            except Exception as e:
+                outcomes['error'] += 1
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                if not first_traceback:
+                    first_traceback.append(traceback.format_exc())
+                return
+            latencies.append((update.message.replied_at or time.perf_counter()) - t0)
+            outcomes[classify(update.message.replies[-1]) if update.message.replies else 'error'] += 1
+
+    await asyncio.gather(*(one(e) for e in events))
+    elapsed = time.perf_counter() - started
+
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'messages': len(events),
+        'elapsed_s': round(elapsed, 3),
+        'msgs_per_sec': round(len(events) / elapsed, 1) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'p50': round(float(np.percentile(lat_ms, 50)), 2),
+            'p95': round(float(np.percentile(lat_ms, 95)), 2),
+            'p99': round(float(np.percentile(lat_ms, 99)), 2),
+            'max': round(float(lat_ms.max()), 2)
+        },
+        'outcomes': outcomes,
+        'errors': errors,
+        'first_traceback': first_traceback[0] if first_traceback else None,
+        'dispatcher': bot.dispatcher.metrics(),
+        'cache': dict(bot.response_cache.stats)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay local do bot para medir throughput")
+    parser.add_argument('--file', help="Replay gravado (texto ou JSONL)")
+    parser.add_argument('--messages', type=int, default=500, help="Mensagens sintéticas")
+    parser.add_argument('--chats', type=int, default=200, help="Chats distintos (sintético)")
+    parser.add_argument('--concurrency', type=int, default=20, help="Mensagens simultâneas")
+    parser.add_argument('--realtime', action='store_true', help="Respeita offset_ms das mensagens")
+    parser.add_argument('--no-cache', action='store_true', help="Desliga o cache de relatórios")
+    parser.add_argument('--no-rate-limit', action='store_true', help="Desliga o limite por chat")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Salva o resultado em JSON (comparação entre versões)")
+    args = parser.parse_args()
+
+    events = load_recorded(args.file) if args.file else synthetic_events(args.messages, args.chats, args.seed)
+
+    if args.no_cache:
+        bot.response_cache.max_entries = 0
+    if args.no_rate_limit:
+        bot.TokenBucket = UnlimitedBucket
+
+    print("🔥 Aquecendo dados...")
+    t0 = time.perf_counter()
+    bot.data_context.snapshot()
+    print(f"✅ Dados carregados em {time.perf_counter() - t0:.2f}s\n")
+
+    result = asyncio.run(replay(events, args.concurrency, args.realtime))
+    bot.analysis_executor.shutdown(wait=False)
+
+    lat = result['latency_ms']
+    print("─────────────────────────────────────────────────────")
+    print(f"📨 Mensagens:   {result['messages']}  ({result['elapsed_s']:.2f}s)")
+    print(f"🚀 Throughput:  {result['msgs_per_sec']:.1f} msg/s")
+    print(f"⏱️  Latência:    p50 {lat['p50']:.1f}ms | p95 {lat['p95']:.1f}ms | p99 {lat['p99']:.1f}ms | máx {lat['max']:.1f}ms")
+    print(f"📊 Resultados:  {result['outcomes']}")
+    if result['errors']:
+        print(f"❌ Erros:       {result['errors']}")
+    print(f"🧠 Pool:        {result['dispatcher']}")
+    print(f"💾 Cache:       {result['cache']}")
+    print("─────────────────────────────────────────────────────")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"📄 Resultado salvo: {args.json}")
+
+    if result['first_traceback']:
+        print("\n❌ Primeira exceção nos handlers:\n" + result['first_traceback'], file=sys.stderr)
+    if result['messages'] and result['outcomes']['error'] == result['messages']:
+        sys.exit(1)  # handler quebrado: nenhuma mensagem respondida
+
+
+if __name__ == '__main__':
+    main()
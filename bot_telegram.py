@@ -1,11 +1,17 @@
+import asyncio
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from telegram import Update, constants
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler, filters
 
 # Importações do seu ecossistema Pro
-from core.data_loader import load_all_data
+from core.data_loader import load_all_data, data_version as store_version
 from core.assistant import answer as ai_assistant
-from core.config import LEAGUE_FILES
+from core.resolver import TeamResolver
 
 # Configurações do Bot
 TOKEN = "8481366979:AAF3lSzW_L-3d9keeLIDoZM23blaZ2g0etY"
@@ -15,6 +21,224 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+# Análise é CPU-bound (pandas/Poisson): roda fora do event loop
+ANALYSIS_WORKERS = 4
+MAX_PENDING_ANALYSES = 32  # Acima disso o bot responde "ocupado" em vez de enfileirar
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analise")
+
+# Limite por chat (token bucket): rajada de 3 consultas, 1 nova a cada 10s
+RATE_LIMIT_BURST = 3
+RATE_LIMIT_REFILL_SECONDS = 10.0
+
+# Assinatura dos CSVs (os.stat de cada arquivo) reaproveitada por alguns segundos
+VERSION_TTL_SECONDS = 5.0
+
+# Cache de relatórios prontos por confronto (TTL + LRU, invalidado na troca de versão)
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL_SECONDS = 900
+
+class DataContext:
+    """Dados carregados uma vez e compartilhados entre todas as conversas.
+
+    O snapshot (versão, jogos, árbitros) é trocado atomicamente e só é
+    recarregado quando a assinatura dos CSVs muda.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = (None, None, None)
+        self.resolver = None
+        self._version = (None, float('-inf'))  # (assinatura, instante da leitura)
+
+    def version(self) -> tuple:
+        """Assinatura dos CSVs, relida no máximo a cada VERSION_TTL_SECONDS (faz os.stat: rodar fora do loop)"""
+        version, checked_at = self._version
+        now = time.monotonic()
+        if now - checked_at > VERSION_TTL_SECONDS:
+            version = store_version()
+            self._version = (version, now)
+        return version
+
+    async def version_async(self) -> tuple:
+        """version() sem bloquear o event loop: dentro do TTL não toca no disco"""
+        version, checked_at = self._version
+        if time.monotonic() - checked_at <= VERSION_TTL_SECONDS:
+            return version
+        return await asyncio.get_running_loop().run_in_executor(None, self.version)
+
+    def snapshot(self) -> tuple:
+        """Retorna (versão, jogos, árbitros), recarregando se o store mudou"""
+        version = self.version()
+        if self._snapshot[0] != version:
+            with self._lock:
+                # Outra thread pode ter recarregado enquanto esperávamos o lock
+                if self._snapshot[0] != version:
+                    all_matches, _, all_referees, _ = load_all_data()
+                    teams = set(all_matches['HomeTeam'].dropna()) | set(all_matches['AwayTeam'].dropna())
+                    self.resolver = TeamResolver(teams)
+                    self._snapshot = (version, all_matches, all_referees)
+                    logging.info("Dados (re)carregados: %d arquivos, %d times", len(version), len(teams))
+        return self._snapshot
+
+class ResponseCache:
+    """Cache TTL + LRU de relatórios formatados, válido para uma única versão dos dados"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = None
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self._entries.pop(key, None)
+            self.stats['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def put(self, key, version, value: str):
+        self._check_version(version)
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+data_context = DataContext()
+
+class TokenBucket:
+    """Token bucket simples para limitar consultas por chat"""
+
+    def __init__(self, capacity: int = RATE_LIMIT_BURST, refill_seconds: float = RATE_LIMIT_REFILL_SECONDS):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def try_take(self) -> bool:
+        """Consome um token se disponível"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) / self.refill_seconds)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+class ChatRateLimiter:
+    """Um TokenBucket por chat; baldes cheios e parados são descartados (equivalem a um novo)"""
+
+    def __init__(self, capacity: int = RATE_LIMIT_BURST, refill_seconds: float = RATE_LIMIT_REFILL_SECONDS):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.idle_seconds = capacity * refill_seconds  # tempo parado para o balde voltar a encher
+        self._buckets = {}
+        self._swept_at = time.monotonic()
+
+    def try_take(self, chat_id) -> bool:
+        now = time.monotonic()
+        if now - self._swept_at > self.idle_seconds:
+            self._buckets = {k: b for k, b in self._buckets.items() if now - b.updated_at < self.idle_seconds}
+            self._swept_at = now
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.capacity, self.refill_seconds)
+        return bucket.try_take()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class AnalysisOverloaded(Exception):
+    """Fila de análises cheia"""
+
+class AnalysisDispatcher:
+    """Despacha análises para o pool com fila limitada e coalescência.
+
+    Consultas idênticas em andamento (ex.: vários usuários pedindo
+    "Arsenal x Chelsea" ao mesmo tempo) compartilham um único cálculo.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, max_pending: int = MAX_PENDING_ANALYSES):
+        self.executor = executor
+        self.max_pending = max_pending
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.running = 0
+        self.stats = {'submitted': 0, 'coalesced': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _done(self, key: str, future: asyncio.Future):
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            self.stats['failed'] += 1
+        else:
+            self.stats['completed'] += 1
+
+    async def submit(self, key: str, fn, *args):
+        """Executa fn(*args) no pool, reaproveitando cálculo idêntico em andamento"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise AnalysisOverloaded()
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self._run, fn, *args)
+            future.add_done_callback(lambda f, k=key: self._done(k, f))
+            self._inflight[key] = future
+            self.stats['submitted'] += 1
+        # shield: se um chat cancelar a espera, os demais continuam recebendo o resultado
+        return await asyncio.shield(future)
+
+    def metrics(self) -> dict:
+        """Profundidade da fila e contadores"""
+        pending = len(self._inflight)
+        return {
+            'pending': pending,
+            'running': self.running,
+            'queue_depth': max(0, pending - self.running),
+            'workers': ANALYSIS_WORKERS,
+            **self.stats
+        }
+
+dispatcher = AnalysisDispatcher(analysis_executor)
+response_cache = ResponseCache()
+rate_limiter = ChatRateLimiter()
+
+def normalize_query(user_query: str) -> str:
+    """Chave de coalescência: minúsculas, espaços colapsados e 'vs'/'x' unificados"""
+    query = re.sub(r'\s+', ' ', user_query.strip().lower())
+    return re.sub(r'\s+(?:vs\.?|versus|x)\s+', ' x ', query)
+
+def run_analysis(user_query: str) -> tuple:
+    """Executa o Oráculo sobre o snapshot atual (roda no executor) -> (versão, relatório)"""
+    version, all_matches, all_referees = data_context.snapshot()
+    
+    # Chama o Oráculo Inteligente (Melhoria 7 e 30)
+    response = ai_assistant(user_query, all_matches, all_referees)
+    
+    # Formatação para o Telegram
+    # Usamos bloco de código para manter o alinhamento do relatório técnico
+    return version, f"📊 *Relatório FutPrevisão Pro*\n\n```\n{response.body}\n```"
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Boas-vindas e instruções"""
     welcome_text = (
@@ -30,25 +254,55 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def handle_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Processa a mensagem do usuário e consulta o Oráculo"""
     user_query = update.message.text
+    chat_id = update.effective_chat.id
     
-    # Carrega os dados mais recentes dos seus CSVs
-    all_matches, all_referees, _ = load_all_data()
+    if not rate_limiter.try_take(chat_id):
+        await update.message.reply_text("⏳ Muitas consultas seguidas. Aguarde alguns segundos e tente de novo.")
+        return
     
-    # Chama o Oráculo Inteligente (Melhoria 7 e 30)
-    response = ai_assistant(user_query, all_matches, all_referees)
+    # Confronto canônico: "arsenal vs chelsea" e "Arsenal x Chelsea" viram a mesma chave
+    fixture = data_context.resolver.resolve_fixture(user_query) if data_context.resolver else None
+    if fixture:
+        cache_key = fixture
+        user_query = f"{fixture[0]} x {fixture[1]}"
+    else:
+        cache_key = normalize_query(user_query)
     
-    # Formatação para o Telegram
-    # Usamos bloco de código para manter o alinhamento do relatório técnico
-    formatted_resp = f"📊 *Relatório FutPrevisão Pro*\n\n```\n{response.body}\n```"
+    formatted_resp = response_cache.get(cache_key, await data_context.version_async())
+    if formatted_resp is None:
+        # Dados compartilhados + análise no pool: o event loop segue livre para outros chats
+        try:
+            version, formatted_resp = await dispatcher.submit(cache_key, run_analysis, user_query)
+        except AnalysisOverloaded:
+            await update.message.reply_text("🚦 Servidor ocupado no momento. Tente novamente em instantes.")
+            return
+        if version == await data_context.version_async():
+            response_cache.put(cache_key, version, formatted_resp)
     
     await update.message.reply_text(formatted_resp, parse_mode=constants.ParseMode.MARKDOWN)
 
+async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Métricas da fila de análises"""
+    m = dispatcher.metrics()
+    text = (
+        "📈 *Status do Oráculo*\n\n"
+        f"Fila: {m['queue_depth']} | Executando: {m['running']}/{m['workers']}\n"
+        f"Processadas: {m['completed']} | Falhas: {m['failed']}\n"
+        f"Coalescidas: {m['coalesced']} | Rejeitadas: {m['rejected']}\n"
+        f"Cache: {response_cache.stats['hits']} hits / {response_cache.stats['misses']} misses"
+    )
+    await update.message.reply_text(text, parse_mode=constants.ParseMode.MARKDOWN)
+
 if __name__ == '__main__':
+    # Aquece o cache antes de aceitar mensagens
+    data_context.snapshot()
+    
     # Inicializa o Bot
     application = ApplicationBuilder().token(TOKEN).build()
     
     # Handlers
     application.add_handler(CommandHandler('start', start))
+    application.add_handler(CommandHandler('status', status))
     application.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), handle_analysis))
     
     print("🚀 analytics_Diego_Bot online e monitorando 10 ligas...")
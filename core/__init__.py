@@ -0,0 +1,16 @@
+"""
+Núcleo do FutPrevisão: dados, predição e oráculo sem dependência de Streamlit.
+
+Importável pelo app, pelo bot Telegram, pelo serviço HTTP e por scripts.
+"""
+
+from core.data_loader import (
+    DataEngineSupreme, DataLoadError, DataSnapshot, data_version, load_all_data, load_snapshot
+)
+from core.ledger import Ledger
+from core.metrics import MetricsRegistry, registry as metrics_registry, timed, timer
+from core.odds import OddsStore, load_odds
+from core.oraculo import OraculoSupreme
+from core.predict import ConfidenceEngine, MathEngineSupreme, PredictionEngineSupreme
+from core.referees import RefereeIndex
+from core.resolver import TeamResolver
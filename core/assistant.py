@@ -0,0 +1,108 @@
+"""
+Assistente de texto puro (bot Telegram e scripts): relatório técnico de um confronto
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+from core.calibration import load_calibration
+from core.predict import PredictionEngineSupreme
+from core.referees import RefereeIndex
+from core.resolver import TeamResolver
+
+
+@dataclass
+class AssistantResponse:
+    body: str
+    home: Optional[str] = None
+    away: Optional[str] = None
+    tipo: str = 'analise'
+
+
+_engine_lock = threading.Lock()
+_engine_cache = (None, None, None)  # (df, predictor, resolver) do último snapshot
+
+# "Arsenal x Chelsea árbitro A Taylor"
+_REFEREE_PATTERN = re.compile(r'[,;]?\s*[áa]rbitro\s*:?\s*(.+)$', re.IGNORECASE)
+
+
+def _engines(matches: pd.DataFrame, referees: pd.DataFrame = None):
+    """Preditor e resolver reaproveitados enquanto o DataFrame for o mesmo objeto"""
+    global _engine_cache
+    with _engine_lock:
+        if _engine_cache[0] is not matches:
+            teams = set(matches['HomeTeam'].dropna()) | set(matches['AwayTeam'].dropna())
+            predictor = PredictionEngineSupreme(matches, referees=RefereeIndex.load(matches, referees),
+                                                calibration=load_calibration(matches))
+            _engine_cache = (matches, predictor, TeamResolver(teams))
+        return _engine_cache[1], _engine_cache[2]
+
+
+def render_report(home: str, away: str, pred: dict, predictor: PredictionEngineSupreme) -> str:
+    """Relatório alinhado em texto puro (vai dentro de bloco de código no Telegram)"""
+    lines = [
+        f"{home} x {away}",
+        "",
+        "ESCANTEIOS",
+        f"  {home:<20s} {pred['corners']['home']:6.2f}",
+        f"  {away:<20s} {pred['corners']['away']:6.2f}",
+        f"  {'Total':<20s} {pred['corners']['total']:6.2f}",
+        f"  P80 / P95            {pred['corners']['p80']} / {pred['corners']['p95']}",
+        "",
+        "CARTÕES",
+        f"  {home:<20s} {pred['cards']['home']:6.2f}",
+        f"  {away:<20s} {pred['cards']['away']:6.2f}",
+        f"  {'Total':<20s} {pred['cards']['total']:6.2f}",
+    ]
+    ref = pred['cards'].get('referee')
+    if ref:
+        lines.append(f"  Árbitro {ref['name']}: {ref['cards_per_game']:.1f}/jogo "
+                     f"(casa {ref['home_cards_per_game']:.1f} / fora {ref['away_cards_per_game']:.1f}), "
+                     f"fator casa {ref['home_factor']:.2f} / fora {ref['away_factor']:.2f}")
+
+    lines += [
+        "",
+        f"CONFIANÇA  {pred['confidence']['score']}/100 {pred['confidence']['label']}",
+        f"Amostra    {pred['games_played']['home']} / {pred['games_played']['away']} jogos",
+        "",
+        "LINHAS (prob >= 60%)",
+    ]
+
+    for line in predictor.generate_all_lines(pred):
+        if line['prob'] >= 60:
+            lines.append(f"  {line['tipo'][:18]:<18s} {line['mercado']:<16s} {line['prob']:5.1f}%")
+
+    smart_line = predictor.find_smart_line(pred)
+    if smart_line:
+        lines += ["", f"LINHA RECOMENDADA: {smart_line['tipo']} {smart_line['mercado']} ({smart_line['prob']:.1f}%)"]
+
+    return "\n".join(lines)
+
+
+def answer(query: str, matches: pd.DataFrame, referees: pd.DataFrame = None) -> AssistantResponse:
+    """Analisa 'Time A x Time B' (opcional: '... árbitro Nome') e devolve o relatório técnico"""
+    predictor, resolver = _engines(matches, referees)
+
+    referee = None
+    found = _REFEREE_PATTERN.search(query)
+    if found:
+        referee = found.group(1).strip()
+        query = query[:found.start()]
+
+    fixture = resolver.resolve_fixture(query)
+    if not fixture:
+        return AssistantResponse(
+            body="Não identifiquei o confronto.\nExemplo: Arsenal x Chelsea",
+            tipo='erro'
+        )
+
+    home, away = fixture
+    pred = predictor.predict_full(home, away, referee=referee)
+    if not pred:
+        return AssistantResponse(body=f"Dados insuficientes para {home} x {away}.", home=home, away=away, tipo='erro')
+
+    return AssistantResponse(body=render_report(home, away, pred, predictor), home=home, away=away)
@@ -0,0 +1,405 @@
+"""
+Backtest walk-forward: replay da temporada com predições "no ponto do tempo"
+
+Para cada jogo, a projeção usa só as linhas anteriores a ele (ordem de data) e
+reproduz predict_full + generate_all_lines + find_smart_line:
+
+    escanteios casa  = média ponderada dos últimos 10 HC do mandante em casa * 1.15
+    escanteios fora  = média ponderada dos últimos 10 AC do visitante fora * 0.90
+    cartões          = média de HY do mandante + média de AY do visitante (todos os jogos)
+    confiança        = amostra (menor nº de jogos) + volatilidade dos escanteios totais
+
+Nada é reajustado por data: o estado de cada time (somas acumuladas e a janela dos
+últimos 10 jogos) é calculado numa passada vetorizada com cumsum/shift por grupo,
+e as linhas de todos os jogos são precificadas de uma vez (matriz jogos x linhas).
+
+prepare() monta esse estado uma vez; evaluate() aplica um BacktestParams (fatores,
+janela, peso recente, faixa da linha recomendada) sobre ele - é o que a varredura
+de parâmetros (core/sweep.py) repete para cada candidato.
+
+Uso:
+    result = backtest(matches)
+    result = backtest(matches, BacktestParams(window=6, corners_home_factor=1.10))
+    result.hit_rate()          # acerto por mercado (linha recomendada e todas as linhas)
+    result.calibration()       # probabilidade prevista x frequência observada
+    result.roi(odd=1.90)       # ROI apostando a linha recomendada a odd fixa
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import BASE_ODD
+from core.metrics import timed
+from core.predict import LINE_MARKETS, _poisson
+
+
+@dataclass(frozen=True)
+class BacktestParams:
+    """Constantes do modelo; os padrões reproduzem o PredictionEngineSupreme"""
+    corners_home_factor: float = 1.15
+    corners_away_factor: float = 0.90
+    recent_weight: float = 0.6
+    window: int = 10
+    band_low: float = 60       # faixa de find_smart_line (%)
+    band_high: float = 75
+    fallback: float = 55
+    # Modificadores do motor legado V31 (inf = desligado, como no motor atual)
+    pressure_high: float = np.inf   # chutes no alvo em casa acima -> escanteios casa * 1.15 (legado: 6.0)
+    pressure_med: float = np.inf    # acima -> casa * 1.05, fora * 1.10 (legado: 4.5)
+    violence_high: float = np.inf   # faltas acima -> cartões do time * 1.1 (legado: 12.5)
+
+
+# Coluna de resultado de cada projeção (o que decide a linha)
+_ACTUALS = {
+    ('corners', 'total'): ('HC', 'AC'),
+    ('corners', 'home'): ('HC',),
+    ('corners', 'away'): ('AC',),
+    ('cards', 'total'): ('HY', 'AY'),
+}
+
+
+def _line_grid() -> Tuple[List[str], List[str], List[Tuple[str, str]], np.ndarray]:
+    """LINE_MARKETS achatado: uma coluna por linha (tipo, mercado, projeção, limite)"""
+    tipos, mercados, keys, thresholds = [], [], [], []
+    for tipo, label, key, values, _ in LINE_MARKETS:
+        for threshold in values:
+            tipos.append(tipo)
+            mercados.append(label.format(threshold))
+            keys.append(key)
+            thresholds.append(threshold)
+    return tipos, mercados, keys, np.array(thresholds)
+
+
+# ==============================================================================
+# ESTADO POR TIME (SÓ JOGOS ANTERIORES)
+# ==============================================================================
+
+def _chronological(matches: pd.DataFrame) -> pd.DataFrame:
+    """Jogos em ordem de data (estável: mesma data mantém a ordem dos arquivos)"""
+    dates = pd.to_datetime(matches['Date'], dayfirst=True, format='mixed', errors='coerce')
+    order = np.argsort(dates.to_numpy(dtype='datetime64[ns]'), kind='stable')
+    return matches.iloc[order].reset_index(drop=True).assign(_date=dates.iloc[order].to_numpy())
+
+
+def _lag_matrix(values: pd.Series, groups: pd.Series, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(lags, anteriores): lags[:, j] = valor do (j+1)-ésimo jogo anterior do grupo (NaN se não existe)"""
+    grouped = values.groupby(groups, sort=False)
+    lags = np.column_stack([grouped.shift(lag).to_numpy(dtype=float) for lag in range(1, window + 1)])
+    previous = groups.groupby(groups, sort=False).cumcount().to_numpy()
+    return lags, previous
+
+
+def _weighted_mean(lags: np.ndarray, previous: np.ndarray, window: int, recent_weight: float) -> np.ndarray:
+    """MathEngineSupreme.weighted_average dos últimos `window` valores; NaN quando o grupo não tem jogos"""
+    lags = lags[:, :window]
+    k = np.minimum(previous, window)
+
+    # Pesos de np.linspace(1 - w, 1 + w, k) do mais antigo (lag k) ao mais recente (lag 1)
+    lag = np.arange(1, window + 1)
+    step = np.where(k > 1, 2 * recent_weight / np.maximum(k - 1, 1), 0.0)
+    weights = (1 - recent_weight) + step[:, None] * (k[:, None] - lag[None, :])
+    weights = np.where(lag[None, :] <= k[:, None], weights, 0.0)
+
+    valid = ~np.isnan(lags)
+    weights = np.where(valid, weights, 0.0)
+    total = weights.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, (np.where(valid, lags, 0.0) * weights).sum(axis=1) / total, np.nan)
+
+
+def _prior_mean(games: pd.DataFrame, column: str, groups: pd.Series) -> np.ndarray:
+    """Média de `column` nos jogos anteriores do mesmo grupo (NaN sem jogos ou sem a coluna)"""
+    if column not in games.columns:
+        return np.full(len(games), np.nan)
+    values = games[column].astype(float)
+    filled = values.fillna(0)
+    present = values.notna().astype(int)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((filled.groupby(groups, sort=False).cumsum() - filled) /
+                (present.groupby(groups, sort=False).cumsum() - present)).to_numpy(dtype=float)
+
+
+def _team_state(games: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Para cada jogo, estatísticas acumuladas de mandante e visitante ANTES do jogo"""
+    n = len(games)
+    # Formato longo: cada jogo aparece para o mandante e para o visitante, em ordem de data
+    long = pd.DataFrame({
+        'team': np.concatenate([games['HomeTeam'].to_numpy(object), games['AwayTeam'].to_numpy(object)]),
+        'pos': np.tile(np.arange(n), 2),
+        'side': np.repeat([0, 1], n),
+        'HY': np.tile(games['HY'].to_numpy(dtype=float), 2),
+        'AY': np.tile(games['AY'].to_numpy(dtype=float), 2),
+        'TC': np.tile((games['HC'] + games['AC']).to_numpy(dtype=float), 2),
+    }).sort_values(['pos', 'side'], kind='stable')
+
+    grouped = long.groupby('team', sort=False)
+    prior = pd.DataFrame({'pos': long['pos'], 'side': long['side'], 'games': grouped.cumcount()})
+    for col in ('HY', 'AY', 'TC'):
+        filled = long[col].fillna(0)
+        prior[f'{col}_sum'] = filled.groupby(long['team'], sort=False).cumsum() - filled
+        present = long[col].notna().astype(int)
+        prior[f'{col}_n'] = present.groupby(long['team'], sort=False).cumsum() - present
+    prior['TC_sq'] = (long['TC'].fillna(0) ** 2).groupby(long['team'], sort=False).cumsum() - long['TC'].fillna(0) ** 2
+
+    home = prior[prior['side'] == 0].sort_values('pos').reset_index(drop=True)
+    away = prior[prior['side'] == 1].sort_values('pos').reset_index(drop=True)
+    return home, away
+
+
+def _volatility(count: np.ndarray, total: np.ndarray, squares: np.ndarray) -> np.ndarray:
+    """MathEngineSupreme.volatility_index a partir de somas (desvio populacional / média * 100)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(squares / count - mean ** 2, 0.0))
+        vol = std / mean * 100
+    return np.where((count < 2) | (mean == 0), 0.0, vol)
+
+
+def _confidence(n_games: np.ndarray, volatility: np.ndarray) -> np.ndarray:
+    """ConfidenceEngine.calculate_confidence vetorizado (h2h_consistency = 0.5)"""
+    sample = np.select([n_games >= 15, n_games >= 10, n_games >= 5], [40, 30, 20], 10)
+    vol = np.select([volatility < 20, volatility < 30, volatility < 40], [40, 30, 20], 10)
+    return sample + vol + 10
+
+
+# ==============================================================================
+# BACKTEST
+# ==============================================================================
+
+@dataclass
+class BacktestResult:
+    games: pd.DataFrame       # um jogo por linha: data, liga, times, projeções, confiança, linha recomendada
+    tipos: List[str]          # tipo de cada coluna de probs/hits
+    mercados: List[str]       # mercado de cada coluna de probs/hits
+    probs: np.ndarray         # jogos x linhas, em %
+    hits: np.ndarray          # jogos x linhas: 1 green, 0 red, NaN sem resultado
+    smart: np.ndarray         # coluna da linha recomendada por jogo (-1: nenhuma)
+
+    def _smart_bets(self, min_conf: int = 0) -> pd.DataFrame:
+        rows = np.flatnonzero((self.smart >= 0) & (self.games['confidence'].to_numpy() >= min_conf))
+        cols = self.smart[rows]
+        bets = pd.DataFrame({
+            'tipo': np.array(self.tipos, dtype=object)[cols],
+            'prob': self.probs[rows, cols],
+            'hit': self.hits[rows, cols]
+        })
+        return bets[bets['hit'].notna()]
+
+    def hit_rate(self, min_conf: int = 0) -> pd.DataFrame:
+        """Acerto por tipo: da linha recomendada e de todas as linhas precificadas"""
+        mask = self.games['confidence'].to_numpy() >= min_conf
+        smart = self._smart_bets(min_conf).groupby('tipo')['hit'].agg(['size', 'mean'])
+        rows = []
+        for tipo in self._types():
+            hits = self.hits[mask][:, self._cols(tipo)]
+            probs = self.probs[mask][:, self._cols(tipo)]
+            resolved = ~np.isnan(hits)
+            rows.append({
+                'tipo': tipo,
+                'recomendadas': int(smart['size'].get(tipo, 0)),
+                'acerto_recomendadas': smart['mean'].get(tipo, np.nan) * 100,
+                'linhas': int(resolved.sum()),
+                'acerto_linhas': hits[resolved].mean() * 100 if resolved.any() else np.nan,
+                'prob_media': probs[resolved].mean() if resolved.any() else np.nan
+            })
+        return pd.DataFrame(rows).set_index('tipo')
+
+    def _types(self) -> pd.Index:
+        return pd.Index(list(dict.fromkeys(self.tipos)))
+
+    def _cols(self, tipo: str) -> np.ndarray:
+        return np.flatnonzero(np.array(self.tipos) == tipo)
+
+    def calibration(self, bins: int = 10, tipo: str = None) -> pd.DataFrame:
+        """Probabilidade prevista (faixas) x frequência observada em todas as linhas; brier por faixa"""
+        cols = self._cols(tipo) if tipo else np.arange(len(self.tipos))
+        probs = self.probs[:, cols].ravel() / 100
+        hits = self.hits[:, cols].ravel()
+        keep = ~np.isnan(hits)
+        probs, hits = probs[keep], hits[keep]
+
+        edges = np.linspace(0, 1, bins + 1)
+        which = np.clip(np.digitize(probs, edges) - 1, 0, bins - 1)
+        count = np.bincount(which, minlength=bins)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table = pd.DataFrame({
+                'faixa': [f"{edges[i]*100:.0f}-{edges[i+1]*100:.0f}%" for i in range(bins)],
+                'linhas': count,
+                'prevista': np.bincount(which, probs, bins) / count * 100,
+                'observada': np.bincount(which, hits, bins) / count * 100,
+                'brier': np.bincount(which, (probs - hits) ** 2, bins) / count
+            })
+        return table[table['linhas'] > 0].reset_index(drop=True)
+
+    def brier(self, tipo: str = None) -> float:
+        cols = self._cols(tipo) if tipo else np.arange(len(self.tipos))
+        probs, hits = self.probs[:, cols] / 100, self.hits[:, cols]
+        return float(np.nanmean((probs - hits) ** 2))
+
+    def expected_calibration_error(self, bins: int = 10) -> float:
+        """Média ponderada de |prevista - observada| nas faixas, em pontos percentuais"""
+        table = self.calibration(bins)
+        if table.empty:
+            return float('nan')
+        return float(np.average((table['prevista'] - table['observada']).abs(), weights=table['linhas']))
+
+    def subset(self, mask: np.ndarray) -> 'BacktestResult':
+        """Resultado só dos jogos em mask (ex.: o trecho final da temporada)"""
+        return BacktestResult(self.games[mask].reset_index(drop=True), self.tipos, self.mercados,
+                              self.probs[mask], self.hits[mask], self.smart[mask])
+
+    def summary(self, odd: float = BASE_ODD, min_conf: int = 0) -> Dict[str, float]:
+        """Números de uma linha do leaderboard"""
+        bets = self._smart_bets(min_conf)
+        hits = bets['hit'].to_numpy()
+        profit = float(np.where(hits == 1, odd - 1, -1.0).sum())
+        return {
+            'jogos': len(self.games),
+            'apostas': len(bets),
+            'acerto': float(hits.mean() * 100) if len(hits) else float('nan'),
+            'roi': profit / len(bets) * 100 if len(bets) else float('nan'),
+            'brier': self.brier(),
+            'ece': self.expected_calibration_error()
+        }
+
+    def roi(self, odd: float = BASE_ODD, min_conf: int = 0) -> pd.DataFrame:
+        """Apostando 1 unidade na linha recomendada de cada jogo a odd fixa (total na linha 'Total')"""
+        bets = self._smart_bets(min_conf)
+        bets['lucro'] = np.where(bets['hit'] == 1, odd - 1, -1.0)
+        by_type = bets.groupby('tipo').agg(apostas=('hit', 'size'), greens=('hit', 'sum'), lucro=('lucro', 'sum'))
+        by_type.loc['Total'] = [len(bets), bets['hit'].sum(), bets['lucro'].sum()]
+        by_type['roi'] = by_type['lucro'] / by_type['apostas'].where(by_type['apostas'] > 0) * 100
+        by_type['apostas'] = by_type['apostas'].astype(int)
+        by_type['greens'] = by_type['greens'].astype(int)
+        return by_type
+
+
+@dataclass
+class BacktestFeatures:
+    """Estado "antes do jogo" de cada jogo, independente dos parâmetros (montado uma vez)"""
+    games: pd.DataFrame         # Date, League, HomeTeam, AwayTeam em ordem de data
+    hc_lags: np.ndarray         # últimos HC do mandante em casa (jogos x janela máxima)
+    hc_prev: np.ndarray
+    ac_lags: np.ndarray         # últimos AC do visitante fora
+    ac_prev: np.ndarray
+    cards_home: np.ndarray      # média de HY de todos os jogos do mandante
+    cards_away: np.ndarray      # média de AY de todos os jogos do visitante
+    shots_home: np.ndarray      # HST médio do mandante em casa (modificador legado)
+    shots_away: np.ndarray      # AST médio do visitante fora
+    fouls_home: np.ndarray      # HF médio do mandante em casa
+    fouls_away: np.ndarray      # AF médio do visitante fora
+    confidence: np.ndarray
+    actual: np.ndarray          # jogos x linhas: resultado que decide cada linha
+    max_window: int = field(default=10)
+
+
+@timed('backtest_prepare')
+def prepare(matches: pd.DataFrame, max_window: int = 10, min_games: int = 1) -> BacktestFeatures:
+    """Uma passada por todos os jogos; vale para qualquer BacktestParams com window <= max_window
+
+    min_games: jogos anteriores exigidos de cada time (predict_full exige 1)
+    """
+    games = _chronological(matches)
+    home, away = _team_state(games)
+    hc_lags, hc_prev = _lag_matrix(games['HC'], games['HomeTeam'], max_window)
+    ac_lags, ac_prev = _lag_matrix(games['AC'], games['AwayTeam'], max_window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cards_home = (home['HY_sum'] / home['HY_n']).to_numpy(dtype=float)
+        cards_away = (away['AY_sum'] / away['AY_n']).to_numpy(dtype=float)
+
+    n_home, n_away = home['games'].to_numpy(), away['games'].to_numpy()
+    volatility = (_volatility(home['TC_n'].to_numpy(), home['TC_sum'].to_numpy(), home['TC_sq'].to_numpy()) +
+                  _volatility(away['TC_n'].to_numpy(), away['TC_sum'].to_numpy(), away['TC_sq'].to_numpy())) / 2
+
+    _, _, keys, _ = _line_grid()
+    actual = np.column_stack([sum(games[c].to_numpy(dtype=float) for c in _ACTUALS[key]) for key in keys])
+
+    keep = (n_home >= min_games) & (n_away >= min_games)
+    kept = games[keep].reset_index(drop=True)
+    return BacktestFeatures(
+        games=pd.DataFrame({
+            'Date': kept['Date'],
+            'League': kept['League'] if 'League' in kept.columns else '',
+            'HomeTeam': kept['HomeTeam'],
+            'AwayTeam': kept['AwayTeam'],
+        }),
+        hc_lags=hc_lags[keep], hc_prev=hc_prev[keep],
+        ac_lags=ac_lags[keep], ac_prev=ac_prev[keep],
+        cards_home=cards_home[keep], cards_away=cards_away[keep],
+        shots_home=_prior_mean(games, 'HST', games['HomeTeam'])[keep],
+        shots_away=_prior_mean(games, 'AST', games['AwayTeam'])[keep],
+        fouls_home=_prior_mean(games, 'HF', games['HomeTeam'])[keep],
+        fouls_away=_prior_mean(games, 'AF', games['AwayTeam'])[keep],
+        confidence=_confidence(np.minimum(n_home, n_away), volatility)[keep],
+        actual=actual[keep],
+        max_window=max_window
+    )
+
+
+def evaluate(features: BacktestFeatures, params: BacktestParams = BacktestParams(), calibration=None) -> BacktestResult:
+    """Projeções, linhas e linha recomendada de todos os jogos para um conjunto de parâmetros
+
+    calibration: CalibrationMaps opcional, aplicado como em generate_all_lines
+    """
+    if params.window > features.max_window:
+        raise ValueError(f"window={params.window} maior que a janela preparada ({features.max_window})")
+
+    # Escanteios: média ponderada da janela * fator (+ pressão do motor legado)
+    corners_home = _weighted_mean(features.hc_lags, features.hc_prev, params.window, params.recent_weight)
+    corners_away = _weighted_mean(features.ac_lags, features.ac_prev, params.window, params.recent_weight)
+    press_home = np.where(features.shots_home > params.pressure_high, 1.15,
+                          np.where(features.shots_home > params.pressure_med, 1.05, 1.0))
+    press_away = np.where(features.shots_away > params.pressure_med, 1.10, 1.0)
+    corners_home = np.where(np.isnan(corners_home), 5.0, corners_home) * params.corners_home_factor * press_home
+    corners_away = np.where(np.isnan(corners_away), 4.5, corners_away) * params.corners_away_factor * press_away
+
+    # Cartões (+ violência do motor legado)
+    cards_home = features.cards_home * np.where(features.fouls_home > params.violence_high, 1.1, 1.0)
+    cards_away = features.cards_away * np.where(features.fouls_away > params.violence_high, 1.1, 1.0)
+
+    projections = {
+        ('corners', 'home'): corners_home,
+        ('corners', 'away'): corners_away,
+        ('corners', 'total'): corners_home + corners_away,
+        ('cards', 'total'): cards_home + cards_away,
+    }
+
+    # Todas as linhas de todos os jogos de uma vez
+    tipos, mercados, keys, thresholds = _line_grid()
+    lam = np.column_stack([projections[key] for key in keys])
+    probs = _poisson().sf(np.floor(thresholds)[None, :], lam) * 100
+    if calibration is not None:
+        for tipo in dict.fromkeys(tipos):
+            cols = [i for i, t in enumerate(tipos) if t == tipo]
+            probs[:, cols] = calibration.apply(tipo, probs[:, cols])
+    actual = features.actual
+    hits = np.where(np.isnan(actual), np.nan, (actual > thresholds[None, :]).astype(float))
+
+    # find_smart_line: maior prob dentro da faixa; senão maior prob >= fallback (empate: primeira linha)
+    in_band = (probs >= params.band_low) & (probs <= params.band_high)
+    fallback = probs >= params.fallback
+    band_best = np.argmax(np.where(in_band, probs, -1), axis=1)
+    fallback_best = np.argmax(np.where(fallback, probs, -1), axis=1)
+    smart = np.where(in_band.any(axis=1), band_best, np.where(fallback.any(axis=1), fallback_best, -1))
+
+    labels = np.array([f"{t} {m}" for t, m in zip(tipos, mercados)], dtype=object)
+    table = features.games.assign(
+        corners_home=corners_home,
+        corners_away=corners_away,
+        corners_total=corners_home + corners_away,
+        cards_total=cards_home + cards_away,
+        confidence=features.confidence,
+        smart_line=np.where(smart >= 0, labels[np.maximum(smart, 0)], None)
+    )
+    return BacktestResult(games=table, tipos=tipos, mercados=mercados, probs=probs, hits=hits, smart=smart)
+
+
+@timed('backtest')
+def backtest(matches: pd.DataFrame, params: BacktestParams = BacktestParams(), min_games: int = 1,
+             calibration=None) -> BacktestResult:
+    """Replay walk-forward de todos os jogos de `matches` (uma ou várias temporadas)"""
+    return evaluate(prepare(matches, params.window, min_games), params, calibration)
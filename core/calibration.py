@@ -0,0 +1,210 @@
+"""
+Calibração das probabilidades das linhas por mercado (isotônica ou Platt)
+
+generate_all_lines usa Poisson puro, que erra de forma sistemática (o backtest mostra
+linhas de 90% acertando ~75%). Cada tipo de mercado (Escanteios Totais/Casa/Fora,
+Cartões Totais) ganha um mapa prob. bruta -> prob. calibrada ajustado nos resultados
+do backtest walk-forward.
+
+O mapa é guardado como tabela de consulta de 101 pontos (0%, 1%, ..., 100%) e
+aplicado com np.interp sobre todas as linhas do mercado de uma vez - no caminho
+quente não há modelo, só interpolação. As tabelas ficam em disco por versão dos
+jogos (.calibration/<chave>.json): o ajuste (~0.1s) só roda quando os dados mudam.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.backtest import backtest
+from core.config import CALIBRATION_DIR, CALIBRATION_METHOD, CALIBRATION_MIN_LINES
+from core.metrics import timed
+from core.predict import LINE_MARKETS
+
+GRID = np.linspace(0, 100, 101)  # prob. bruta (%) de cada ponto da tabela
+CALIBRATION_FORMAT = 1
+_KEY_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'HC', 'AC', 'HY', 'AY']
+
+
+# ==============================================================================
+# AJUSTE
+# ==============================================================================
+
+def isotonic_table(probs: np.ndarray, hits: np.ndarray) -> np.ndarray:
+    """Regressão isotônica (pool adjacent violators) avaliada em GRID, em %
+
+    As linhas são somadas por prob. bruta arredondada a 0.1% antes do PAV: no máximo
+    1001 pontos, qualquer que seja o tamanho do backtest.
+    """
+    x, inverse = np.unique(np.round(probs, 1), return_inverse=True)
+    totals = np.bincount(inverse, hits.astype(float), len(x))
+    counts = np.bincount(inverse, minlength=len(x)).astype(float)
+
+    # Blocos (soma, peso, nº de pontos); junta vizinhos enquanto a média decrescer
+    sums, weights, sizes = [], [], []
+    for total, count in zip(totals, counts):
+        sums.append(total)
+        weights.append(count)
+        sizes.append(1)
+        while len(sums) > 1 and sums[-2] / weights[-2] >= sums[-1] / weights[-1]:
+            total, count, size = sums.pop(), weights.pop(), sizes.pop()
+            sums[-1] += total
+            weights[-1] += count
+            sizes[-1] += size
+
+    # Constante dentro de cada bloco; entre pontos vizinhos, interpolação linear
+    fitted = np.repeat(np.array(sums) / np.array(weights), sizes)
+    return np.interp(GRID, x, fitted * 100)
+
+
+def _log_loss(a: float, b: float, z: np.ndarray, y: np.ndarray) -> float:
+    margin = a * z + b
+    return float(np.sum(np.logaddexp(0, margin) - y * margin))
+
+
+def platt_table(probs: np.ndarray, hits: np.ndarray, iterations: int = 50) -> np.ndarray:
+    """Platt: logística sobre logit(prob. bruta), ajustada por Newton amortecido; avaliada em GRID, em %"""
+    logit = lambda p: np.log(np.clip(p, 0.005, 0.995) / (1 - np.clip(p, 0.005, 0.995)))
+    z, y = logit(probs / 100), hits.astype(float)
+    a, b = 1.0, 0.0
+    loss = _log_loss(a, b, z, y)
+    for _ in range(iterations):
+        p = 0.5 * (1 + np.tanh((a * z + b) / 2))  # sigmoide sem overflow
+        w = p * (1 - p) + 1e-9
+        grad = np.array([np.sum((p - y) * z), np.sum(p - y)])
+        hess = np.array([[np.sum(w * z * z), np.sum(w * z)], [np.sum(w * z), np.sum(w)]])
+        step = np.linalg.solve(hess + np.eye(2) * 1e-6, grad)
+
+        # Passo reduzido à metade até a perda cair
+        scale = 1.0
+        while scale > 1e-4 and _log_loss(a - scale * step[0], b - scale * step[1], z, y) > loss:
+            scale /= 2
+        a, b = a - scale * step[0], b - scale * step[1]
+        new_loss = _log_loss(a, b, z, y)
+        if loss - new_loss < 1e-9:
+            break
+        loss = new_loss
+    return 100 * 0.5 * (1 + np.tanh((a * logit(GRID / 100) + b) / 2))
+
+
+class CalibrationMaps:
+    """Tabelas tipo de mercado -> prob. calibrada em cada ponto de GRID"""
+
+    def __init__(self, tables: Dict[str, np.ndarray], method: str, lines: Dict[str, int] = None, key: str = ''):
+        self.tables = tables
+        self.method = method
+        self.lines = lines or {}  # linhas do backtest usadas em cada ajuste
+        self.key = key
+
+    def apply(self, tipo: str, probs) -> np.ndarray:
+        """Probabilidades brutas (%) -> calibradas (%); mercado sem tabela passa direto"""
+        table = self.tables.get(tipo)
+        probs = np.asarray(probs, dtype=float)
+        return probs if table is None else np.interp(probs, GRID, table)
+
+    @classmethod
+    def fit(cls, result, method: str = CALIBRATION_METHOD, min_lines: int = CALIBRATION_MIN_LINES,
+            key: str = '') -> 'CalibrationMaps':
+        """Uma tabela por tipo a partir de um BacktestResult; isotônica exige min_lines (senão Platt)"""
+        tables, lines = {}, {}
+        for tipo in dict.fromkeys(result.tipos):
+            cols = [i for i, t in enumerate(result.tipos) if t == tipo]
+            probs, hits = result.probs[:, cols].ravel(), result.hits[:, cols].ravel()
+            resolved = ~np.isnan(hits)
+            probs, hits = probs[resolved], hits[resolved]
+            if len(probs) < 2 or hits.min() == hits.max():
+                continue
+            use_isotonic = method == 'isotonic' and len(probs) >= min_lines
+            tables[tipo] = isotonic_table(probs, hits) if use_isotonic else platt_table(probs, hits)
+            lines[tipo] = int(len(probs))
+        return cls(tables, method, lines, key)
+
+    def to_dict(self) -> Dict:
+        return {'format': CALIBRATION_FORMAT, 'key': self.key, 'method': self.method, 'lines': self.lines,
+                'tables': {tipo: np.round(table, 4).tolist() for tipo, table in self.tables.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CalibrationMaps':
+        tables = {tipo: np.array(values, dtype=float) for tipo, values in data['tables'].items()}
+        return cls(tables, data['method'], data.get('lines'), data.get('key', ''))
+
+
+# ==============================================================================
+# CACHE EM DISCO
+# ==============================================================================
+
+def data_key(matches: pd.DataFrame, method: str = CALIBRATION_METHOD) -> str:
+    """Chave dos jogos usados no ajuste (conteúdo, não caminho) + método + linhas precificadas"""
+    columns = [c for c in _KEY_COLUMNS if c in matches.columns]
+    digest = pd.util.hash_pandas_object(matches[columns], index=False).to_numpy()
+    raw = hashlib.sha1(digest.tobytes())
+    raw.update(repr((CALIBRATION_FORMAT, method, CALIBRATION_MIN_LINES,
+                     [(m[0], m[3]) for m in LINE_MARKETS])).encode('utf-8'))
+    return raw.hexdigest()[:16]
+
+
+def _read(path: str) -> Optional[CalibrationMaps]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return CalibrationMaps.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write(root: str, key: str, maps: CalibrationMaps):
+    try:
+        os.makedirs(root, exist_ok=True)
+        tmp = os.path.join(root, f".tmp_{key}.json")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(maps.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(root, f"{key}.json"))
+        for name in os.listdir(root):
+            if name.endswith('.json') and name != f"{key}.json":
+                os.remove(os.path.join(root, name))
+    except OSError:
+        pass  # pasta só leitura: o ajuste vale só para este processo
+
+
+@timed('calibration_load')
+def load_calibration(matches: pd.DataFrame, method: str = CALIBRATION_METHOD,
+                     root: str = CALIBRATION_DIR) -> Optional[CalibrationMaps]:
+    """Tabelas da versão atual dos jogos (do disco, ou ajustadas agora); None se desligado"""
+    if not method or matches.empty:
+        return None
+    key = data_key(matches, method)
+    if root:
+        maps = _read(os.path.join(root, f"{key}.json"))
+        if maps is not None:
+            return maps
+
+    maps = CalibrationMaps.fit(backtest(matches), method, key=key)
+    if root:
+        _write(root, key, maps)
+    return maps
+
+
+def reliability(result, maps: Optional[CalibrationMaps], tipo: str, bins: int = 10) -> pd.DataFrame:
+    """Diagrama de confiabilidade de um tipo: prevista x observada, bruta e calibrada"""
+    cols = [i for i, t in enumerate(result.tipos) if t == tipo]
+    probs, hits = result.probs[:, cols].ravel(), result.hits[:, cols].ravel()
+    resolved = ~np.isnan(hits)
+    probs, hits = probs[resolved], hits[resolved]
+
+    frames = []
+    for label, values in (('Bruta', probs), ('Calibrada', maps.apply(tipo, probs) if maps else None)):
+        if values is None:
+            continue
+        which = np.clip((values / 100 * bins).astype(int), 0, bins - 1)
+        count = np.bincount(which, minlength=bins)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frames.append(pd.DataFrame({
+                'versao': label,
+                'prevista': np.bincount(which, values, bins) / count,
+                'observada': np.bincount(which, hits, bins) / count * 100,
+                'linhas': count
+            })[count > 0])
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,194 @@
+"""
+CLV (closing line value): a odd apostada contra a odd de fechamento do mercado
+
+    CLV (%) = (odd apostada / odd de fechamento - 1) * 100
+
+Bater o fechamento com frequência é o melhor sinal de valor real, muito antes do
+ROI estabilizar. O fechamento sai do OddsStore (colunas B365C*/PSC* dos CSVs ou
+coluna Fechamento das cotações largadas em odds/), da primeira casa de
+CLV_REFERENCE com cotação; sem nenhuma, a melhor odd de fechamento entre as casas.
+
+CLVTracker é incremental: cada aposta nova é procurada ao chegar e, sem fechamento,
+fica pendente até chegar um store novo (CSVs com o fechamento); as buscas são uma
+consulta vetorizada. Ao resolver, a aposta soma nos agregados por mercado e por mês;
+a aba Performance lê os agregados (O(mercados + meses)), sem percorrer o histórico.
+
+Uma aposta precisa de 'jogo' ("Casa x Fora"), 'data' (DD/MM/AAAA), 'odd' e do
+mercado no nome do OddsStore ('market', ou 'mercado' quando já estiver nesse formato).
+
+Os CSVs só trazem fechamento de 1X2, gols 2.5 e handicap asiático (CSV_MARKETS): as
+linhas de escanteios e cartões só resolvem com a coluna Fechamento das cotações de
+odds/; sem ela ficam pendentes (summary()['pendentes_sem_csv']).
+
+O handicap asiático fecha numa linha própria (AHCh), que pode não ser a da aposta: a
+aposta leva a linha no mercado ('AH Casa -0.5') e só resolve quando a linha de
+fechamento é a mesma; com linha diferente não há fechamento comparável e ela sai das
+pendentes sem entrar no CLV (summary()['linha_diferente']). Handicap sem linha no
+nome não tem fechamento nos CSVs.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import CLV_REFERENCE
+from core.metrics import timed
+from core.odds import AH_MARKETS, CSV_MARKETS, OddsStore, side_line, split_ah
+
+# Somas mantidas por grupo: apostas, stake, soma do CLV, soma stake*CLV, apostas que bateram o fechamento
+_FIELDS = ['n', 'stake', 'clv', 'stake_clv', 'beat']
+
+
+def bet_key(bet: Dict) -> Optional[Tuple[str, str, str, str]]:
+    """(mandante, visitante, data, mercado) de uma aposta; None se faltar algum"""
+    teams = str(bet.get('jogo', '')).split(' x ')
+    market = bet.get('market') or bet.get('mercado')
+    if len(teams) != 2 or not bet.get('data') or not market:
+        return None
+    return teams[0].strip(), teams[1].strip(), str(bet['data']), str(market)
+
+
+def bet_period(bet: Dict) -> str:
+    """Mês (AAAA-MM) do jogo; sem data, o do registro da aposta"""
+    date = str(bet.get('data') or '')
+    if len(date) == 10 and date[2] == '/' and date[5] == '/':
+        return f"{date[6:]}-{date[3:5]}"
+    return str(bet.get('timestamp', ''))[:7] or 'sem data'
+
+
+def has_csv_closing(market: str) -> bool:
+    """O mercado tem fechamento nos CSVs (handicap só com a linha no nome)"""
+    return split_ah(market) is not None or (market in CSV_MARKETS and market not in AH_MARKETS)
+
+
+def closing_lines(store: OddsStore, keys: List[Tuple[str, str, str, str]]) -> np.ndarray:
+    """Linha de fechamento (AHCh, do lado da seleção) das apostas de handicap; NaN nas demais"""
+    lines = np.full(len(keys), np.nan)
+    if store is None:
+        return lines
+    for k, (home, away, date, market) in enumerate(keys):
+        ah, row = split_ah(market), store.row(home, away, date)
+        if ah is not None and row is not None:
+            lines[k] = side_line(ah[0], float(store.ah_lines[row, 1]))
+    return lines
+
+
+def closing_odds(store: OddsStore, keys: List[Tuple[str, str, str, str]],
+                 reference: List[str] = CLV_REFERENCE) -> np.ndarray:
+    """Odd de fechamento de cada (mandante, visitante, data, mercado); NaN sem cotação
+
+    Handicap ('AH Casa -0.5'): a odd de fechamento do lado só vale se AHCh for a linha da aposta.
+    """
+    if store is None or not keys:
+        return np.full(len(keys), np.nan)
+    fixtures = [(home, away, date) for home, away, date, _ in keys]
+    ah = [split_ah(market) for *_, market in keys]
+    # Handicap sem linha ('AH Casa') fica sem mercado: a odd do CSV é de uma linha desconhecida
+    markets = [[a[0] if a else ('' if market in AH_MARKETS else market)] for (*_, market), a in zip(keys, ah)]
+    bet_lines = np.array([a[1] if a else np.nan for a in ah])
+    same_line = np.isclose(closing_lines(store, keys), bet_lines)
+    closing = np.full(len(keys), np.nan)
+    for bookmaker in list(reference) + [None]:  # None = melhor fechamento entre as casas
+        missing = np.isnan(closing)
+        if not missing.any():
+            break
+        values = store.lookup(fixtures, markets, bookmaker=bookmaker, closing=True)[:, 0]
+        closing = np.where(missing, values, closing)
+    return np.where(np.isnan(bet_lines) | same_line, closing, np.nan)
+
+
+class CLVTracker:
+    """Fechamento das apostas registradas + agregados por mercado e por mês
+
+    Recebe as apostas novas (com 'id' crescente) a cada sync; quem chama passa só as
+    de id >= next_id (ex.: Ledger.bets(user, since_id=tracker.next_id)).
+    """
+
+    def __init__(self):
+        self.next_id = 0         # apostas com id menor já foram lidas
+        self._store = None       # store usado na última resolução
+        self.pending: Dict[int, Dict] = {}    # id -> aposta ainda sem fechamento
+        self.resolved: Dict[int, Dict] = {}   # id -> {closing, clv, market, period}
+        self.unmatched: Dict[int, str] = {}   # id -> handicap que fechou em outra linha
+        self.by_market: Dict[str, np.ndarray] = {}
+        self.by_period: Dict[str, np.ndarray] = {}
+
+    def reset(self):
+        self.__init__()
+
+    @timed('clv_sync')
+    def sync(self, bets: List[Dict], store: Optional[OddsStore]) -> 'CLVTracker':
+        """Lê as apostas novas e procura o fechamento delas (e o das pendentes, se o store mudou)"""
+        new = []
+        for bet in bets:
+            if bet['id'] < self.next_id:
+                continue
+            self.next_id = bet['id'] + 1
+            key = bet_key(bet)
+            if key is not None:
+                self.pending[bet['id']] = {'key': key, 'odd': bet.get('odd', 0), 'stake': bet.get('stake', 0),
+                                           'period': bet_period(bet)}
+                new.append(bet['id'])
+
+        # Store novo: todas as pendentes podem ter fechamento; mesmo store: só as apostas novas
+        ids = list(self.pending) if store is not self._store else new
+        if ids:
+            self._resolve(store, ids)
+        self._store = store
+        return self
+
+    def _resolve(self, store: Optional[OddsStore], ids: List[int]):
+        keys = [self.pending[i]['key'] for i in ids]
+        closing = closing_odds(store, keys)
+        lines = closing_lines(store, keys)
+        for bet_id, key, close, line in zip(ids, keys, closing, lines):
+            ah = split_ah(key[3])
+            if ah is not None and not np.isnan(line) and not np.isclose(line, ah[1]):
+                self.unmatched[bet_id] = self.pending.pop(bet_id)['key'][3]
+                continue
+            if np.isnan(close) or close <= 1:
+                continue
+            bet = self.pending.pop(bet_id)
+            market, period = bet['key'][3], bet['period']
+            group = ah[0] if ah else market  # o handicap agrega todas as linhas no mesmo mercado
+            clv = (float(bet['odd']) / close - 1) * 100
+            stake = float(bet['stake'])
+            row = np.array([1, stake, clv, stake * clv, clv > 0], dtype=float)
+            self.by_market[group] = self.by_market.get(group, np.zeros(len(_FIELDS))) + row
+            self.by_period[period] = self.by_period.get(period, np.zeros(len(_FIELDS))) + row
+            self.resolved[bet_id] = {'closing': round(float(close), 2), 'clv': float(clv), 'market': market, 'period': period}
+
+    # ------------------------------------------------------------------
+    # LEITURA (só agregados)
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, float]:
+        total = sum(self.by_market.values(), np.zeros(len(_FIELDS)))
+        n, stake, clv, stake_clv, beat = total
+        return {
+            'apostas': int(n),
+            'pendentes': len(self.pending),
+            'pendentes_sem_csv': sum(not has_csv_closing(bet['key'][3]) for bet in self.pending.values()),
+            'linha_diferente': len(self.unmatched),
+            'clv_medio': float(clv / n) if n else 0.0,
+            'clv_ponderado': float(stake_clv / stake) if stake else 0.0,
+            'bateu_fechamento': float(beat / n * 100) if n else 0.0
+        }
+
+    def table(self, by: str = 'market') -> pd.DataFrame:
+        """CLV agregado por 'market' ou 'period'"""
+        groups = self.by_market if by == 'market' else self.by_period
+        label = 'Mercado' if by == 'market' else 'Mês'
+        if not groups:
+            return pd.DataFrame(columns=[label, 'Apostas', 'CLV médio (%)', 'CLV ponderado (%)', 'Bateu fechamento (%)'])
+        sums = np.array(list(groups.values()))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frame = pd.DataFrame({
+                label: list(groups),
+                'Apostas': sums[:, 0].astype(int),
+                'CLV médio (%)': sums[:, 2] / sums[:, 0],
+                'CLV ponderado (%)': sums[:, 3] / sums[:, 1],
+                'Bateu fechamento (%)': sums[:, 4] / sums[:, 0] * 100
+            })
+        return frame.sort_values(label if by == 'period' else 'Apostas', ascending=by == 'period', ignore_index=True)
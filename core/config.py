@@ -0,0 +1,80 @@
+"""
+Configurações compartilhadas do FutPrevisão (app Streamlit, bot e serviço HTTP)
+"""
+
+LEAGUE_FILES = {
+    "Premier League": "Premier_League_25_26.csv",
+    "La Liga": "La_Liga_25_26.csv",
+    "Serie A": "Serie_A_25_26.csv",
+    "Bundesliga": "Bundesliga_25_26.csv",
+    "Ligue 1": "Ligue_1_25_26.csv",
+    "Championship": "Championship_Inglaterra_25_26.csv",
+    "Bundesliga 2": "Bundesliga_2.csv",
+    "Pro League": "Pro_League_Belgica_25_26.csv",
+    "Süper Lig": "Super_Lig_Turquia_25_26.csv",
+    "Premiership": "Premiership_Escocia_25_26.csv"
+}
+
+# Códigos do football-data.co.uk (URL /mmz4281/<temporada>/<código>.csv)
+LEAGUE_CODES = {
+    "Premier League": "E0",
+    "La Liga": "SP1",
+    "Serie A": "I1",
+    "Bundesliga": "D1",
+    "Ligue 1": "F1",
+    "Championship": "E1",
+    "Bundesliga 2": "D2",
+    "Pro League": "B1",
+    "Süper Lig": "T1",
+    "Premiership": "SC0"
+}
+
+# Temporada dos arquivos de LEAGUE_FILES (formato do football-data: 2526 = 2025/26)
+CURRENT_SEASON = "2526"
+
+# Temporadas encerradas ficam particionadas em historico/<código>/<temporada>.csv
+HISTORY_DIR = "historico"
+HISTORY_SEASONS = 0  # temporadas anteriores somadas ao histórico das predições (0 = só a atual)
+
+# Carga das ligas: pool de processos só compensa acima deste volume (spawn custa ~0.5s por processo)
+LOAD_WORKERS = None  # None = os.cpu_count()
+LOAD_PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+# Jogos compilados em .npy mapeados em memória, compartilhados entre processos (None desliga)
+MATCH_STORE_DIR = ".match_store"
+
+# Calibração das probabilidades das linhas ('isotonic', 'platt' ou None = Poisson puro)
+CALIBRATION_METHOD = "isotonic"
+CALIBRATION_DIR = ".calibration"
+CALIBRATION_MIN_LINES = 300  # abaixo disso a isotônica sobreajusta: usa Platt
+
+# Histórico de apostas, favoritos, alertas e streak (SQLite em WAL), por usuário
+LEDGER_FILE = "ledger.db"
+LEDGER_DEFAULT_USER = "local"
+HISTORY_TABLE_ROWS = 500  # apostas mostradas na aba Histórico (as mais recentes)
+
+CALENDAR_FILE = "calendario_ligas.csv"
+REFEREES_FILE = "arbitros_5_ligas_2025_2026.csv"
+REFEREE_FACTORS_FILE = "arbitros.csv"  # Nome, Fator (opcional)
+REFEREE_BASELINE_CARDS = 4.0  # cartões/jogo de um árbitro "neutro" (fator 1.0)
+
+SEARCH_PATHS = [".", "data", "analytics", "./data", "./analytics", "../data", "/mnt/project"]
+
+BOOKMAKERS = {
+    'Bet365': {'factor': 1.00},
+    'Pinnacle': {'factor': 0.98},
+    'Betfair': {'factor': 0.96},
+    'Betano': {'factor': 0.99},
+    '1xBet': {'factor': 1.02}
+}
+
+BASE_ODD = 1.90  # odd usada quando não há cotação real do mercado
+
+# Comissão das bolsas sobre o lucro (a odd líquida entra no line shopping)
+EXCHANGE_COMMISSION = {'Betfair': 0.02}
+
+# Casas cujo fechamento mede o CLV, em ordem (sem nenhuma: melhor fechamento entre as casas)
+CLV_REFERENCE = ['Pinnacle', 'Média do mercado']
+
+# Cotações largadas em arquivo (Data, HomeTeam, AwayTeam, Casa, Mercado, Odd) para jogos futuros
+ODDS_DIR = "odds"
@@ -0,0 +1,383 @@
+"""
+Carregamento dos CSVs (ligas, calendário e árbitros) sem dependência de Streamlit
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import (CALENDAR_FILE, HISTORY_DIR, LEAGUE_FILES, LOAD_PARALLEL_MIN_BYTES, LOAD_WORKERS,
+                         MATCH_STORE_DIR, REFEREES_FILE, SEARCH_PATHS)
+from core.match_store import compile_store, open_store, store_key
+from core.metrics import timed
+from core.validator import ValidationReport, file_hash, remember_report, validate, validate_cached
+
+
+class DataLoadError(Exception):
+    """Arquivo crítico ausente ou nenhum dado válido"""
+
+
+def find_file(filename: str, search_paths: List[str] = SEARCH_PATHS) -> str:
+    """Primeiro caminho existente para o arquivo, ou None"""
+    for base_path in search_paths:
+        filepath = os.path.join(base_path, filename)
+        if os.path.exists(filepath):
+            return filepath
+    return None
+
+
+def data_version(search_paths: List[str] = SEARCH_PATHS) -> tuple:
+    """Assinatura (arquivo, mtime, tamanho) dos CSVs - muda quando o atualizador grava dados novos"""
+    signature = []
+    # O índice do histórico muda a cada partição gravada pelo atualizador
+    history_index = os.path.join(HISTORY_DIR, 'index.json')
+    for filename in list(LEAGUE_FILES.values()) + [CALENDAR_FILE, REFEREES_FILE, history_index]:
+        filepath = find_file(filename, search_paths)
+        if filepath:
+            stat = os.stat(filepath)
+            signature.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Dados carregados de uma versão dos CSVs, compartilhados entre sessões/threads
+
+    Somente leitura: as colunas numéricas têm arrays com writeable=False (escrita no
+    lugar levanta ValueError). Texto não tem essa trava: derive com filtros ou .copy()
+    antes de alterar, e nunca atribua colunas nos frames do snapshot.
+    """
+    version: tuple
+    matches: pd.DataFrame
+    calendar: pd.DataFrame
+    referees: pd.DataFrame
+    file_status: Mapping[str, str]
+
+
+# ==============================================================================
+# CARGA DAS LIGAS (pool de processos + buffer colunar)
+# ==============================================================================
+
+def _count_lines(filepath: str) -> int:
+    """Linhas de dados (sem cabeçalho) - limite superior das linhas que o read_csv devolve"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    return max(data.count(b'\n') + (0 if data.endswith(b'\n') else 1) - 1, 0)
+
+
+def _read_league(league_name: str, paths: List[str]) -> Tuple[str, str, Optional[pd.DataFrame], bool, Optional[Tuple[str, ValidationReport]]]:
+    """Lê, normaliza e valida uma liga -> (liga, status, jogos válidos ou None, achou arquivo, (hash, relatório))
+
+    Roda nos processos do pool: não toca em nada global e devolve só dados serializáveis.
+    """
+    status = None
+    for filepath in paths:
+        try:
+            try:
+                df = pd.read_csv(filepath, encoding='utf-8')
+            except UnicodeDecodeError:
+                df = pd.read_csv(filepath, encoding='latin1')
+        except (OSError, UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+            logging.warning("Falha ao ler %s (%s): %s", filepath, league_name, e)
+            status = f"❌ ERRO: {str(e)[:50]}"
+            continue
+
+        df = DataEngineSupreme.normalize_columns(df)
+
+        # Validar dados (relatório reaproveitado se o arquivo não mudou)
+        digest = file_hash(filepath)
+        report = validate_cached(df, digest)
+        if report.valid:
+            return league_name, f"✅ REAL ({len(df)} jogos)", df, True, (digest, report)
+        return league_name, f"⚠️ DADOS INVÁLIDOS: {report.errors[0]}", None, True, (digest, report)
+
+    return league_name, status, None, False, None
+
+
+def _read_leagues(candidates: Dict[str, List[str]], workers: int) -> Iterator[Tuple]:
+    """Resultados de _read_league à medida que ficam prontos (sequencial com workers=1)"""
+    if workers <= 1:
+        for league, paths in candidates.items():
+            yield _read_league(league, paths)
+        return
+
+    # spawn: o app/serviço têm threads vivas, e fork com threads pode travar o filho
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(candidates)), mp_context=context) as pool:
+        futures = [pool.submit(_read_league, league, paths) for league, paths in candidates.items()]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+class _ColumnBuffer:
+    """Colunas pré-alocadas para todas as ligas; cada liga escreve na sua faixa de linhas
+
+    Substitui o pd.concat: cada coluna é alocada uma vez (na primeira liga que a traz)
+    e as ligas podem chegar em qualquer ordem. Colunas que faltam numa liga ficam NaN,
+    como no concat (inteiros viram float nesse caso).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.columns: Dict[str, np.ndarray] = {}
+        self.parts: Dict[str, Tuple[int, int, List[str]]] = {}  # liga -> (início, linhas, colunas)
+
+    def _allocate(self, dtype: np.dtype) -> np.ndarray:
+        if dtype.kind in 'iub':
+            return np.zeros(self.capacity, dtype=dtype)
+        if dtype.kind == 'f':
+            return np.full(self.capacity, np.nan, dtype=dtype)
+        return np.full(self.capacity, np.nan, dtype=object)
+
+    def write(self, league_name: str, start: int, df: pd.DataFrame):
+        n = len(df)
+        for name in df.columns:
+            values = df[name].to_numpy()
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = self._allocate(values.dtype)
+            elif not np.can_cast(values.dtype, column.dtype, casting='safe'):
+                kind = np.result_type(column.dtype, values.dtype) if values.dtype.kind in 'iubf' and column.dtype.kind in 'iubf' else object
+                column = self.columns[name] = column.astype(kind)
+            column[start:start + n] = values
+
+        self.columns.setdefault('League', np.full(self.capacity, np.nan, dtype=object))[start:start + n] = league_name
+        self.parts[league_name] = (start, n, list(df.columns) + ['League'])
+
+    def to_frame(self, order: List[str]) -> pd.DataFrame:
+        """DataFrame na ordem das ligas, sem as linhas reservadas que sobraram"""
+        leagues = [league for league in order if league in self.parts]
+        keep = np.concatenate([np.arange(self.parts[l][0], self.parts[l][0] + self.parts[l][1]) for l in leagues])
+
+        names = list(dict.fromkeys(name for l in leagues for name in self.parts[l][2]))
+        data = {}
+        for name in names:
+            column = self.columns[name]
+            missing = [l for l in leagues if name not in self.parts[l][2]]
+            if missing and column.dtype.kind in 'iub':
+                column = column.astype(np.float64 if column.dtype.kind != 'b' else object)
+            for l in missing:
+                start, n, _ = self.parts[l]
+                column[start:start + n] = np.nan
+            data[name] = column if len(keep) == self.capacity else column[keep]
+
+        # Totais calculados nos vetores (sem inserir coluna a coluna no DataFrame)
+        data['Total_Corners'] = data['HC'] + data['AC']
+        data['Total_Cards'] = data['HY'] + data['AY']
+        data['Total_Goals'] = data['FTHG'] + data['FTAG']
+        data['Total_Fouls'] = data['HF'] + data['AF']
+        # Cópia única que consolida as colunas em um bloco por tipo (seleções de linhas ~3x mais rápidas)
+        return pd.DataFrame(data)
+
+
+class DataEngineSupreme:
+    """Motor de dados - SEM MOCK, 100% REAL"""
+
+    @staticmethod
+    @timed('load_all_data')
+    def load_all_data(search_paths: List[str] = SEARCH_PATHS,
+                      workers: int = LOAD_WORKERS) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, Dict]:
+        """Lê e valida as ligas (em paralelo se a base for grande) direto num buffer colunar pré-alocado"""
+        file_status = {}
+
+        # Capacidade de cada liga = linhas do maior candidato; a ordem final segue LEAGUE_FILES
+        candidates = {league: [os.path.join(p, f) for p in search_paths if os.path.exists(os.path.join(p, f))]
+                      for league, f in LEAGUE_FILES.items()}
+        capacity = {league: max((_count_lines(path) for path in paths), default=0)
+                    for league, paths in candidates.items()}
+        offsets, total = {}, 0
+        for league in LEAGUE_FILES:
+            offsets[league] = total
+            total += capacity[league]
+
+        buffer = _ColumnBuffer(total)
+        total_bytes = sum(os.path.getsize(paths[0]) for paths in candidates.values() if paths)
+        workers = workers or os.cpu_count() or 1
+        parallel = workers > 1 and total_bytes >= LOAD_PARALLEL_MIN_BYTES
+
+        # CRÍTICO: Sem fallback para mock - só dados reais
+        statuses = {}
+        for league_name, status, df, found, validation in _read_leagues(candidates, workers if parallel else 1):
+            if not found:
+                # SEM MOCK - Sistema para se arquivo crítico não existe
+                filename = LEAGUE_FILES[league_name]
+                raise DataLoadError(f"""
+                ❌ ARQUIVO CRÍTICO AUSENTE: {filename}
+
+                O sistema não pode funcionar sem dados reais.
+
+                Por favor:
+                1. Adicionar o arquivo {filename} na pasta do projeto
+                2. Recarregar o aplicativo
+                """)
+
+            statuses[league_name] = status
+            if validation is not None:
+                remember_report(*validation)  # relatórios do pool para o cache deste processo
+            if df is not None:
+                if len(df) > capacity[league_name]:
+                    raise DataLoadError(f"❌ {LEAGUE_FILES[league_name]} mudou durante a carga - recarregue")
+                buffer.write(league_name, offsets[league_name], df)
+
+        # Status na ordem de LEAGUE_FILES, qualquer que seja a ordem de chegada
+        file_status.update({league: statuses[league] for league in LEAGUE_FILES})
+
+        if not buffer.parts:
+            raise DataLoadError("❌ NENHUM DADO VÁLIDO ENCONTRADO")
+
+        full_df = buffer.to_frame(order=list(LEAGUE_FILES))
+
+        calendar_df = DataEngineSupreme._load_calendar(search_paths, file_status)
+        refs_df = DataEngineSupreme._load_referees(search_paths, file_status)
+
+        return full_df, calendar_df, refs_df, file_status
+
+    @staticmethod
+    def validate_dataframe(df: pd.DataFrame, league_name: str) -> Tuple[bool, List[str]]:
+        """Valida qualidade dos dados (regras de core.validator, numa passada)"""
+        report = validate(df)
+        return report.valid, report.errors
+
+    @staticmethod
+    def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+        column_mapping = {
+            'Mandante': 'HomeTeam', 'Visitante': 'AwayTeam',
+            'Time_Casa': 'HomeTeam', 'Time_Visitante': 'AwayTeam',
+            'Home': 'HomeTeam', 'Away': 'AwayTeam',
+            'HG': 'FTHG', 'AG': 'FTAG',
+            'Gols_Casa': 'FTHG', 'Gols_Fora': 'FTAG',
+            'Cantos_Casa': 'HC', 'Cantos_Fora': 'AC',
+            'Cartoes_Casa': 'HY', 'Cartoes_Fora': 'AY',
+            'Faltas_Casa': 'HF', 'Faltas_Fora': 'AF'
+        }
+
+        df = df.rename(columns=column_mapping)
+
+        numeric_columns = ['HC', 'AC', 'HY', 'AY', 'FTHG', 'FTAG', 'HF', 'AF', 'HST', 'AST']
+        for col in numeric_columns:
+            if col not in df.columns:
+                df[col] = 0
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+        return df
+
+    @staticmethod
+    def _load_calendar(search_paths: List[str], file_status: Dict) -> pd.DataFrame:
+        for base_path in search_paths:
+            filepath = os.path.join(base_path, CALENDAR_FILE)
+            if os.path.exists(filepath):
+                try:
+                    df = pd.read_csv(filepath, encoding='utf-8')
+                    df = DataEngineSupreme.normalize_columns(df)
+                    if 'Data' not in df.columns and 'Date' in df.columns:
+                        df['Data'] = df['Date']
+                    file_status['Calendário'] = f"✅ REAL ({len(df)} jogos)"
+                    return df
+                except:
+                    pass
+
+        raise DataLoadError(f"❌ {CALENDAR_FILE} não encontrado!")
+
+    @staticmethod
+    def _load_referees(search_paths: List[str], file_status: Dict) -> pd.DataFrame:
+        for base_path in search_paths:
+            filepath = os.path.join(base_path, REFEREES_FILE)
+            if os.path.exists(filepath):
+                try:
+                    df = pd.read_csv(filepath, encoding='utf-8')
+                    file_status['Árbitros'] = f"✅ REAL ({len(df)} árbitros)"
+                    return df
+                except:
+                    pass
+
+        # Árbitros é opcional
+        file_status['Árbitros'] = "⚠️ Não encontrado (opcional)"
+        return pd.DataFrame({
+            'Arbitro': [],
+            'Media_Cartoes_Por_Jogo': [],
+            'Jogos_Apitados': []
+        })
+
+
+def load_all_data(search_paths: List[str] = SEARCH_PATHS,
+                  store_dir: str = MATCH_STORE_DIR) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, Dict]:
+    """(jogos, calendário, árbitros, status dos arquivos) - levanta DataLoadError se faltar dado crítico
+
+    Com store_dir, os jogos vêm do store mapeado em memória da versão atual dos CSVs;
+    o primeiro processo a carregar uma versão nova compila o store para os demais.
+    """
+    if not store_dir:
+        return DataEngineSupreme.load_all_data(search_paths)
+
+    key = store_key(data_version(search_paths), search_paths)
+    stored = open_store(store_dir, key)
+    if stored is None:
+        matches, calendar_df, refs_df, file_status = DataEngineSupreme.load_all_data(search_paths)
+        league_status = {league: file_status[league] for league in LEAGUE_FILES if league in file_status}
+        try:
+            compile_store(matches, store_dir, key, league_status)
+        except OSError:
+            return matches, calendar_df, refs_df, file_status  # sem permissão de escrita: cópia em memória
+        # Reabre pelo store para este processo também usar as páginas compartilhadas
+        stored = open_store(store_dir, key)
+        return stored[0], calendar_df, refs_df, file_status
+
+    matches, file_status = stored
+    calendar_df = DataEngineSupreme._load_calendar(search_paths, file_status)
+    refs_df = DataEngineSupreme._load_referees(search_paths, file_status)
+    return matches, calendar_df, refs_df, file_status
+
+
+def _writeable(values: np.ndarray) -> bool:
+    """Algum array da cadeia de views aceita escrita (o to_numpy do pandas 3 devolve uma view
+    travada de um bloco que pode continuar gravável)"""
+    while isinstance(values, np.ndarray):
+        if values.flags.writeable:
+            return True
+        values = values.base
+    return False
+
+
+def _read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame com os blocos numéricos em arrays writeable=False, um bloco por dtype
+
+    Os frames do store mmap já são travados e voltam sem cópia. Não mexe em opções
+    globais do pandas: a trava vale só para os arrays do snapshot.
+    """
+    numeric = [c for c in df.columns if isinstance(df[c].dtype, np.dtype) and df[c].dtype.kind in 'biufM']
+    if not any(_writeable(df[c].to_numpy()) for c in numeric):
+        return df
+
+    parts = []
+    for _, columns in df[numeric].dtypes.groupby(df[numeric].dtypes.astype(str), sort=False):
+        values = df[list(columns.index)].to_numpy(copy=True)
+        values.flags.writeable = False
+        parts.append(pd.DataFrame(values, index=df.index, columns=columns.index, copy=False))
+    other = [c for c in df.columns if c not in set(numeric)]
+    if other:
+        parts.append(df[other])
+    return pd.concat(parts, axis=1)[df.columns] if parts else df
+
+
+def load_snapshot(search_paths: List[str] = SEARCH_PATHS) -> DataSnapshot:
+    """Carrega os CSVs uma vez num DataSnapshot imutável, marcado com a versão lida"""
+    version = data_version(search_paths)
+    matches, calendar, referees, file_status = load_all_data(search_paths)
+    return DataSnapshot(
+        version=version,
+        matches=_read_only(matches),
+        calendar=_read_only(calendar),
+        referees=_read_only(referees),
+        file_status=MappingProxyType(file_status)
+    )
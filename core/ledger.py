@@ -0,0 +1,446 @@
+"""
+Ledger de apostas em SQLite (WAL): histórico, favoritos, alertas e streak por usuário
+
+Antes tudo vivia em listas do st.session_state: sumia ao reiniciar e cada métrica
+percorria a lista inteira. Aqui cada tabela tem o usuário na chave primária (a
+"partição" do usuário é um intervalo contíguo do índice) e os totais por mercado
+ficam em bet_totals, mantida por triggers a cada insert/update/delete em bets:
+
+    ROI, win rate, performance por mercado   O(mercados), sem ler as apostas
+    curva da banca                           tabela equity, só cresce: lê os pontos novos
+    aposta por id / favorito / streak        O(log n) pela chave primária
+    apostas novas desde um id                O(log n + novas)
+
+WAL deixa o app (várias sessões) e scripts lerem enquanto uma escrita acontece.
+As conexões são por thread; a escrita é serializada por um lock do processo.
+
+Uso:
+    ledger = Ledger.open()
+    bet_id = ledger.add_bet('local', {'jogo': 'Arsenal x Chelsea', 'mercado': 'Over 9.5', 'stake': 50, 'odd': 1.9})
+    ledger.update_bet_result('local', bet_id, 'win', 95)
+    ledger.totals('local')        # {'bets': 1, 'wins': 1, 'stake': 50.0, ...}
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.config import LEDGER_FILE
+
+# Colunas próprias de bets; o resto da aposta vai em extra (JSON)
+BET_COLUMNS = ['id', 'timestamp', 'jogo', 'data', 'market', 'mercado', 'odd', 'stake', 'prob', 'result', 'return']
+SCHEMA_VERSION = 1  # PRAGMA user_version; ver Ledger._migrate
+EMPTY_STREAK = {'current': 0, 'best': 0, 'total_wins': 0, 'total_bets': 0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL DEFAULT 0,      -- muda quando o histórico é limpo/restaurado
+    streak_current INTEGER NOT NULL DEFAULT 0,
+    streak_best INTEGER NOT NULL DEFAULT 0,
+    streak_wins INTEGER NOT NULL DEFAULT 0,
+    streak_bets INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS bets (
+    user TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    timestamp TEXT,
+    jogo TEXT,
+    data TEXT,
+    market TEXT,
+    mercado TEXT NOT NULL DEFAULT '',
+    odd REAL,
+    stake REAL NOT NULL DEFAULT 0,
+    prob REAL,
+    result TEXT NOT NULL DEFAULT 'pending',
+    retorno REAL NOT NULL DEFAULT 0,
+    extra TEXT,
+    PRIMARY KEY (user, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bets_user_result ON bets (user, result);
+
+CREATE TABLE IF NOT EXISTS bet_totals (
+    user TEXT NOT NULL,
+    mercado TEXT NOT NULL,
+    bets INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    stake REAL NOT NULL DEFAULT 0,
+    win_stake REAL NOT NULL DEFAULT 0,
+    win_return REAL NOT NULL DEFAULT 0,
+    loss_stake REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user, mercado)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS bets_totals_insert AFTER INSERT ON bets BEGIN
+    INSERT INTO bet_totals (user, mercado) VALUES (NEW.user, NEW.mercado) ON CONFLICT DO NOTHING;
+    UPDATE bet_totals SET
+        bets = bets + 1,
+        wins = wins + (NEW.result = 'win'),
+        losses = losses + (NEW.result = 'loss'),
+        stake = stake + NEW.stake,
+        win_stake = win_stake + (NEW.result = 'win') * NEW.stake,
+        win_return = win_return + (NEW.result = 'win') * NEW.retorno,
+        loss_stake = loss_stake + (NEW.result = 'loss') * NEW.stake
+    WHERE user = NEW.user AND mercado = NEW.mercado;
+END;
+
+CREATE TRIGGER IF NOT EXISTS bets_totals_delete AFTER DELETE ON bets BEGIN
+    UPDATE bet_totals SET
+        bets = bets - 1,
+        wins = wins - (OLD.result = 'win'),
+        losses = losses - (OLD.result = 'loss'),
+        stake = stake - OLD.stake,
+        win_stake = win_stake - (OLD.result = 'win') * OLD.stake,
+        win_return = win_return - (OLD.result = 'win') * OLD.retorno,
+        loss_stake = loss_stake - (OLD.result = 'loss') * OLD.stake
+    WHERE user = OLD.user AND mercado = OLD.mercado;
+END;
+
+CREATE TRIGGER IF NOT EXISTS bets_totals_update AFTER UPDATE OF result, retorno, stake, mercado ON bets BEGIN
+    UPDATE bet_totals SET
+        bets = bets - 1,
+        wins = wins - (OLD.result = 'win'),
+        losses = losses - (OLD.result = 'loss'),
+        stake = stake - OLD.stake,
+        win_stake = win_stake - (OLD.result = 'win') * OLD.stake,
+        win_return = win_return - (OLD.result = 'win') * OLD.retorno,
+        loss_stake = loss_stake - (OLD.result = 'loss') * OLD.stake
+    WHERE user = OLD.user AND mercado = OLD.mercado;
+    INSERT INTO bet_totals (user, mercado) VALUES (NEW.user, NEW.mercado) ON CONFLICT DO NOTHING;
+    UPDATE bet_totals SET
+        bets = bets + 1,
+        wins = wins + (NEW.result = 'win'),
+        losses = losses + (NEW.result = 'loss'),
+        stake = stake + NEW.stake,
+        win_stake = win_stake + (NEW.result = 'win') * NEW.stake,
+        win_return = win_return + (NEW.result = 'win') * NEW.retorno,
+        loss_stake = loss_stake + (NEW.result = 'loss') * NEW.stake
+    WHERE user = NEW.user AND mercado = NEW.mercado;
+END;
+
+-- Curva da banca: um ponto por mudança no lucro de uma aposta (resolução ou correção),
+-- com o acumulado já somado; a curva só cresce no fim e é lida a partir de um seq
+CREATE TABLE IF NOT EXISTS equity (
+    user TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    bet_id INTEGER NOT NULL,
+    profit REAL NOT NULL,
+    cumulative REAL NOT NULL,
+    PRIMARY KEY (user, seq)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS bets_equity_insert AFTER INSERT ON bets
+WHEN NEW.result IN ('win', 'loss') BEGIN
+    INSERT INTO equity (user, seq, bet_id, profit, cumulative) VALUES (
+        NEW.user,
+        (SELECT COALESCE(MAX(seq), -1) + 1 FROM equity WHERE user = NEW.user),
+        NEW.id,
+        CASE NEW.result WHEN 'win' THEN NEW.retorno - NEW.stake ELSE -NEW.stake END,
+        COALESCE((SELECT cumulative FROM equity WHERE user = NEW.user ORDER BY seq DESC LIMIT 1), 0)
+        + CASE NEW.result WHEN 'win' THEN NEW.retorno - NEW.stake ELSE -NEW.stake END
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS bets_equity_update AFTER UPDATE OF result, retorno, stake ON bets
+WHEN (CASE NEW.result WHEN 'win' THEN NEW.retorno - NEW.stake WHEN 'loss' THEN -NEW.stake ELSE 0 END)
+  != (CASE OLD.result WHEN 'win' THEN OLD.retorno - OLD.stake WHEN 'loss' THEN -OLD.stake ELSE 0 END) BEGIN
+    INSERT INTO equity (user, seq, bet_id, profit, cumulative) VALUES (
+        NEW.user,
+        (SELECT COALESCE(MAX(seq), -1) + 1 FROM equity WHERE user = NEW.user),
+        NEW.id,
+        (CASE NEW.result WHEN 'win' THEN NEW.retorno - NEW.stake WHEN 'loss' THEN -NEW.stake ELSE 0 END)
+        - (CASE OLD.result WHEN 'win' THEN OLD.retorno - OLD.stake WHEN 'loss' THEN -OLD.stake ELSE 0 END),
+        COALESCE((SELECT cumulative FROM equity WHERE user = NEW.user ORDER BY seq DESC LIMIT 1), 0)
+        + (CASE NEW.result WHEN 'win' THEN NEW.retorno - NEW.stake WHEN 'loss' THEN -NEW.stake ELSE 0 END)
+        - (CASE OLD.result WHEN 'win' THEN OLD.retorno - OLD.stake WHEN 'loss' THEN -OLD.stake ELSE 0 END)
+    );
+END;
+
+CREATE TABLE IF NOT EXISTS favorites (
+    user TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    added_at TEXT,
+    PRIMARY KEY (user, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS alerts (
+    user TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message TEXT,
+    created_at TEXT,
+    payload TEXT,
+    PRIMARY KEY (user, seq)
+) WITHOUT ROWID;
+"""
+
+
+class Ledger:
+    """Histórico de apostas, favoritos, alertas e streak de cada usuário num arquivo SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            self._conn().executescript(SCHEMA)  # executescript faz o próprio commit
+        self._migrate()
+
+    @classmethod
+    def open(cls, path: str = LEDGER_FILE) -> 'Ledger':
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        return cls(path)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _migrate(self):
+        """user_version 0 -> 1: curva da banca (equity) das apostas já resolvidas antes da tabela existir"""
+        with self._transaction() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
+            conn.execute("DELETE FROM equity")
+            conn.execute(
+                "INSERT INTO equity (user, seq, bet_id, profit, cumulative) "
+                "SELECT user, ROW_NUMBER() OVER w - 1, id, profit, SUM(profit) OVER w FROM ("
+                "    SELECT user, id, CASE result WHEN 'win' THEN retorno - stake ELSE -stake END AS profit "
+                "    FROM bets WHERE result IN ('win', 'loss')"
+                ") WINDOW w AS (PARTITION BY user ORDER BY id)")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _ensure_user(self, conn: sqlite3.Connection, user: str):
+        conn.execute("INSERT INTO users (user) VALUES (?) ON CONFLICT DO NOTHING", (user,))
+
+    # ------------------------------------------------------------------
+    # APOSTAS
+    # ------------------------------------------------------------------
+
+    def add_bet(self, user: str, bet: Dict) -> int:
+        """Grava a aposta com o próximo id do usuário e devolve o id"""
+        with self._transaction() as conn:
+            self._ensure_user(conn, user)
+            bet_id = conn.execute("SELECT COALESCE(MAX(id), -1) + 1 FROM bets WHERE user = ?", (user,)).fetchone()[0]
+            self._insert_bet(conn, user, bet_id, bet)
+        return bet_id
+
+    def _insert_bet(self, conn: sqlite3.Connection, user: str, bet_id: int, bet: Dict):
+        extra = {k: v for k, v in bet.items() if k not in BET_COLUMNS}
+        conn.execute(
+            "INSERT INTO bets (user, id, timestamp, jogo, data, market, mercado, odd, stake, prob, result, retorno, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (user, bet_id, bet.get('timestamp') or datetime.now().isoformat(), bet.get('jogo'), bet.get('data'),
+             bet.get('market'), str(bet.get('mercado', '')), _float(bet.get('odd')), _float(bet.get('stake')) or 0.0,
+             _float(bet.get('prob')), bet.get('result') or 'pending', _float(bet.get('return')) or 0.0,
+             json.dumps(extra, ensure_ascii=False, default=str) if extra else None)
+        )
+
+    def update_bet_result(self, user: str, bet_id: int, result: str, return_value: float = 0) -> bool:
+        """Resultado da aposta + streak do usuário na mesma transação; False se o id não existe"""
+        with self._transaction() as conn:
+            cursor = conn.execute("UPDATE bets SET result = ?, retorno = ? WHERE user = ? AND id = ?",
+                                  (result, float(return_value), user, bet_id))
+            if not cursor.rowcount:
+                return False
+            self._ensure_user(conn, user)
+            if result == 'win':
+                conn.execute("UPDATE users SET streak_current = streak_current + 1, streak_wins = streak_wins + 1, "
+                             "streak_best = MAX(streak_best, streak_current + 1), streak_bets = streak_bets + 1 "
+                             "WHERE user = ?", (user,))
+            else:
+                conn.execute("UPDATE users SET streak_current = 0, streak_bets = streak_bets + 1 WHERE user = ?", (user,))
+        return True
+
+    def bets(self, user: str, since_id: int = 0, limit: int = None) -> List[Dict]:
+        """Apostas do usuário em ordem de id, a partir de since_id"""
+        query = "SELECT * FROM bets WHERE user = ? AND id >= ? ORDER BY id"
+        params = [user, since_id]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [_bet_dict(row) for row in self._conn().execute(query, params)]
+
+    def recent_bets(self, user: str, limit: int) -> List[Dict]:
+        """Últimas `limit` apostas do usuário, em ordem de id"""
+        rows = self._conn().execute("SELECT * FROM bets WHERE user = ? ORDER BY id DESC LIMIT ?", (user, limit))
+        return [_bet_dict(row) for row in rows][::-1]
+
+    def pending_bets(self, user: str, limit: int = None) -> List[Dict]:
+        """Apostas ainda sem resultado (índice user, result), em ordem de id"""
+        query = "SELECT * FROM bets WHERE user = ? AND result = 'pending' ORDER BY id"
+        params = [user]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [_bet_dict(row) for row in self._conn().execute(query, params)]
+
+    def bet(self, user: str, bet_id: int) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM bets WHERE user = ? AND id = ?", (user, bet_id)).fetchone()
+        return _bet_dict(row) if row else None
+
+    def clear_bets(self, user: str):
+        """Apaga o histórico e zera a streak (nova geração do usuário)"""
+        with self._transaction() as conn:
+            self._clear(conn, user)
+
+    def _clear(self, conn: sqlite3.Connection, user: str):
+        self._ensure_user(conn, user)
+        conn.execute("DELETE FROM bets WHERE user = ?", (user,))
+        conn.execute("DELETE FROM bet_totals WHERE user = ?", (user,))
+        conn.execute("DELETE FROM equity WHERE user = ?", (user,))
+        conn.execute("UPDATE users SET generation = generation + 1, streak_current = 0, streak_best = 0, "
+                     "streak_wins = 0, streak_bets = 0 WHERE user = ?", (user,))
+
+    def generation(self, user: str) -> int:
+        row = self._conn().execute("SELECT generation FROM users WHERE user = ?", (user,)).fetchone()
+        return row[0] if row else 0
+
+    # ------------------------------------------------------------------
+    # AGREGADOS (bet_totals e equity, mantidas pelos triggers)
+    # ------------------------------------------------------------------
+
+    def market_totals(self, user: str) -> pd.DataFrame:
+        """Uma linha por mercado: bets, wins, losses, stake, win_stake, win_return, loss_stake, profit"""
+        frame = pd.read_sql_query("SELECT * FROM bet_totals WHERE user = ? AND bets > 0 ORDER BY mercado",
+                                  self._conn(), params=(user,))
+        frame['profit'] = frame['win_return'] - frame['win_stake'] - frame['loss_stake']
+        return frame.drop(columns='user')
+
+    def totals(self, user: str) -> Dict:
+        """Somas de todos os mercados; profit = lucro das apostas resolvidas (último ponto da curva)"""
+        row = self._conn().execute(
+            "SELECT COALESCE(SUM(bets), 0), COALESCE(SUM(wins), 0), COALESCE(SUM(losses), 0), COALESCE(SUM(stake), 0), "
+            "COALESCE(SUM(win_return), 0), COALESCE(SUM(win_return - win_stake - loss_stake), 0) "
+            "FROM bet_totals WHERE user = ?", (user,)).fetchone()
+        return {'bets': row[0], 'wins': row[1], 'losses': row[2], 'stake': row[3], 'win_return': row[4],
+                'profit': row[5]}
+
+    def equity(self, user: str, since_seq: int = 0) -> np.ndarray:
+        """Lucro acumulado após cada ponto da curva da banca, a partir de since_seq"""
+        rows = self._conn().execute("SELECT cumulative FROM equity WHERE user = ? AND seq >= ? ORDER BY seq",
+                                    (user, since_seq))
+        return np.array([row[0] for row in rows], dtype=float)
+
+    # ------------------------------------------------------------------
+    # STREAK, FAVORITOS E ALERTAS
+    # ------------------------------------------------------------------
+
+    def streak(self, user: str) -> Dict:
+        row = self._conn().execute("SELECT streak_current, streak_best, streak_wins, streak_bets FROM users "
+                                   "WHERE user = ?", (user,)).fetchone()
+        return dict(zip(EMPTY_STREAK, row)) if row else dict(EMPTY_STREAK)
+
+    def favorites(self, user: str) -> List[Dict]:
+        rows = self._conn().execute("SELECT id, name, added_at FROM favorites WHERE user = ? ORDER BY added_at",
+                                    (user,))
+        return [dict(row) for row in rows]
+
+    def is_favorite(self, user: str, game_id: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM favorites WHERE user = ? AND id = ?", (user, game_id)).fetchone() is not None
+
+    def add_favorite(self, user: str, game_id: str, name: str, added_at: str = None):
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO favorites (user, id, name, added_at) VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                         (user, game_id, name, added_at or datetime.now().isoformat()))
+
+    def remove_favorite(self, user: str, game_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM favorites WHERE user = ? AND id = ?", (user, game_id))
+
+    def alerts(self, user: str, limit: int = None) -> List[Dict]:
+        """Alertas mais recentes primeiro"""
+        query = "SELECT message, created_at, payload FROM alerts WHERE user = ? ORDER BY seq DESC"
+        params = [user]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [{**json.loads(row['payload'] or '{}'), 'message': row['message'], 'created_at': row['created_at']}
+                for row in self._conn().execute(query, params)]
+
+    def alert_count(self, user: str) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM alerts WHERE user = ?", (user,)).fetchone()[0]
+
+    def add_alert(self, user: str, alert: Dict):
+        with self._transaction() as conn:
+            self._insert_alert(conn, user, alert)
+
+    def _insert_alert(self, conn: sqlite3.Connection, user: str, alert: Dict):
+        seq = conn.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM alerts WHERE user = ?", (user,)).fetchone()[0]
+        payload = {k: v for k, v in alert.items() if k not in ('message', 'created_at')}
+        conn.execute("INSERT INTO alerts (user, seq, message, created_at, payload) VALUES (?, ?, ?, ?, ?)",
+                     (user, seq, alert.get('message', ''), alert.get('created_at') or datetime.now().isoformat(),
+                      json.dumps(payload, ensure_ascii=False, default=str) if payload else None))
+
+    # ------------------------------------------------------------------
+    # BACKUP (formato JSON do BackupEngine)
+    # ------------------------------------------------------------------
+
+    def export_user(self, user: str) -> Dict:
+        return {
+            'favorites': self.favorites(user),
+            'bets_history': self.bets(user),
+            'streak': self.streak(user),
+            'alerts': self.alerts(user)[::-1]
+        }
+
+    def import_user(self, user: str, data: Dict):
+        """Substitui os dados do usuário pelos do backup, numa transação"""
+        with self._transaction() as conn:
+            self._clear(conn, user)
+            conn.execute("DELETE FROM favorites WHERE user = ?", (user,))
+            conn.execute("DELETE FROM alerts WHERE user = ?", (user,))
+            for i, bet in enumerate(data.get('bets_history', [])):
+                self._insert_bet(conn, user, int(bet.get('id', i)), bet)
+            for fav in data.get('favorites', []):
+                conn.execute("INSERT INTO favorites (user, id, name, added_at) VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                             (user, fav['id'], fav.get('name'), fav.get('added_at')))
+            for alert in data.get('alerts', []):
+                self._insert_alert(conn, user, alert)
+            streak = {**EMPTY_STREAK, **data.get('streak', {})}
+            conn.execute("UPDATE users SET streak_current = ?, streak_best = ?, streak_wins = ?, streak_bets = ? "
+                         "WHERE user = ?", (streak['current'], streak['best'], streak['total_wins'],
+                                            streak['total_bets'], user))
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bet_dict(row: sqlite3.Row) -> Dict:
+    bet = {key: row[key] for key in row.keys() if key not in ('user', 'retorno', 'extra')}
+    bet['return'] = row['retorno']
+    if row['extra']:
+        bet.update(json.loads(row['extra']))
+    return {k: v for k, v in bet.items() if v is not None}
@@ -0,0 +1,124 @@
+"""
+Store compilado dos jogos em arquivos .npy mapeados em memória
+
+App, bot e serviço rodando na mesma máquina leem os mesmos CSVs; sem o store cada
+processo faz o parse e guarda sua própria cópia do DataFrame. Compilado uma vez por
+versão dos dados, o store guarda cada coluna numérica num .npy aberto com
+np.load(mmap_mode='r'): todos os processos compartilham as mesmas páginas do cache
+do sistema operacional, sem cópia e sem parse.
+
+Layout:
+    .match_store/
+        v_<chave>/
+            manifest.json       # colunas, blocos, categorias e status dos arquivos
+            b00.npy, b01.npy    # um bloco (colunas x linhas) por tipo numérico
+            t000.npy, ...       # códigos de cada coluna de texto
+
+As colunas numéricas (~120: estatísticas e odds) ficam em um bloco 2D por tipo, que
+o pandas usa direto como bloco consolidado - só leitura e compartilhado, e sem o
+custo de um DataFrame com um bloco por coluna nas seleções de linhas. Colunas de
+texto (times, datas, árbitro, liga) ficam como códigos int32 + categorias no
+manifesto e são decodificadas ao abrir; são poucas.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import timed
+
+MANIFEST_FILE = "manifest.json"
+STORE_FORMAT = 2  # entra na chave: mudar o layout invalida os stores já compilados
+
+
+def store_key(version: tuple, search_paths: List[str]) -> str:
+    """Chave do store: versão dos CSVs + pastas de origem (bases diferentes não colidem)"""
+    raw = repr((STORE_FORMAT, version, [os.path.abspath(p) for p in search_paths]))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _version_dir(root: str, key: str) -> str:
+    return os.path.join(root, f"v_{key}")
+
+
+@timed('match_store_compile')
+def compile_store(matches: pd.DataFrame, root: str, key: str, file_status: Dict = None) -> str:
+    """Grava os jogos em root/v_<chave>/ (escrita em pasta temporária + rename atômico)"""
+    os.makedirs(root, exist_ok=True)
+    target = _version_dir(root, key)
+    if os.path.isdir(target):
+        return target
+
+    tmp = tempfile.mkdtemp(prefix='.tmp_', dir=root)
+    blocks, text = {}, []
+    try:
+        for name in matches.columns:
+            col = matches[name]
+            if col.dtype.kind in 'biuf':
+                blocks.setdefault(col.dtype.str, []).append(name)
+            else:
+                filename = f"t{len(text):03d}.npy"
+                codes, categories = pd.factorize(col, use_na_sentinel=True)
+                np.save(os.path.join(tmp, filename), codes.astype(np.int32))
+                text.append({'name': name, 'file': filename, 'categories': [str(c) for c in categories]})
+
+        # Um .npy (colunas x linhas) por tipo numérico: vira um bloco consolidado do pandas
+        numeric = []
+        for i, (dtype, names) in enumerate(blocks.items()):
+            filename = f"b{i:02d}.npy"
+            np.save(os.path.join(tmp, filename), np.stack([matches[n].to_numpy() for n in names]))
+            numeric.append({'file': filename, 'dtype': dtype, 'columns': names})
+
+        with open(os.path.join(tmp, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'rows': len(matches), 'columns': list(matches.columns),
+                       'blocks': numeric, 'text': text,
+                       'file_status': dict(file_status or {})}, f, ensure_ascii=False)
+
+        os.rename(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(target):  # outro processo pode ter compilado a mesma versão antes
+            raise
+    else:
+        _remove_old_versions(root, keep=os.path.basename(target))
+    return target
+
+
+def _remove_old_versions(root: str, keep: str):
+    """Apaga versões antigas; processos que ainda as mapeiam continuam lendo (Linux/macOS)"""
+    for name in os.listdir(root):
+        if name.startswith('v_') and name != keep:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+@timed('match_store_open')
+def open_store(root: str, key: str) -> Optional[Tuple[pd.DataFrame, Dict]]:
+    """(jogos, status dos arquivos) da versão compilada, ou None se ainda não existe"""
+    target = _version_dir(root, key)
+    try:
+        with open(os.path.join(target, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # .T de (colunas x linhas) é a mesma memória: cada arquivo vira um bloco do DataFrame, sem cópia
+    frames = [
+        pd.DataFrame(np.load(os.path.join(target, block['file']), mmap_mode='r').view(np.ndarray).T,
+                     columns=block['columns'], copy=False)
+        for block in manifest['blocks']
+    ]
+    text = {}
+    for column in manifest['text']:
+        codes = np.load(os.path.join(target, column['file']), mmap_mode='r')
+        categories = np.array(column['categories'] + [np.nan], dtype=object)
+        text[column['name']] = categories[codes]  # código -1 (ausente) cai no NaN do fim
+
+    # Colunas agrupadas por tipo (reordenar copiaria os blocos); acesso é sempre por nome
+    matches = pd.concat(frames + [pd.DataFrame(text)], axis=1)
+    return matches, manifest['file_status']
@@ -0,0 +1,172 @@
+"""
+Instrumentação leve dos caminhos quentes: contagem de chamadas e histograma de latência
+
+Uso:
+    @timed('predict_full')
+    def predict_full(...): ...
+
+    with timer('render Dashboard'):
+        ...
+
+    registry.snapshot()       # dict por operação (tabela no app)
+    registry.to_json()        # exportação JSON
+    registry.to_prometheus()  # formato texto do Prometheus
+"""
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+# Limites superiores dos buckets (ms); o último bucket (+Inf) é implícito
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class MetricsRegistry:
+    """Contadores e histogramas por operação, seguros para várias threads/sessões"""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+    def observe(self, name: str, elapsed_ms: float, error: bool = False):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = {
+                    'count': 0,
+                    'errors': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'buckets': [0] * (len(self.buckets_ms) + 1)
+                }
+                self._stats[name] = stats
+
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+            for i, bound in enumerate(self.buckets_ms):
+                if elapsed_ms <= bound:
+                    stats['buckets'][i] += 1
+                    break
+            else:
+                stats['buckets'][-1] += 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _quantile_ms(self, buckets: List[int], count: int, q: float) -> float:
+        """Limite superior do bucket que contém o quantil (estimativa do histograma)"""
+        target = q * count
+        cumulative = 0
+        for bound, n in zip(self.buckets_ms, buckets):
+            cumulative += n
+            if cumulative >= target:
+                return float(bound)
+        return float('inf')
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Cópia consistente das métricas, ordenada por tempo total"""
+        with self._lock:
+            raw = {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in self._stats.items()}
+
+        result = {}
+        for name, stats in sorted(raw.items(), key=lambda kv: kv[1]['total_ms'], reverse=True):
+            count = stats['count']
+            result[name] = {
+                'count': count,
+                'errors': stats['errors'],
+                'total_ms': round(stats['total_ms'], 3),
+                'avg_ms': round(stats['total_ms'] / count, 3) if count else 0.0,
+                'max_ms': round(stats['max_ms'], 3),
+                'p50_ms': self._quantile_ms(stats['buckets'], count, 0.50),
+                'p95_ms': self._quantile_ms(stats['buckets'], count, 0.95),
+                'p99_ms': self._quantile_ms(stats['buckets'], count, 0.99),
+                'buckets': {
+                    **{str(bound): n for bound, n in zip(self.buckets_ms, stats['buckets'])},
+                    '+Inf': stats['buckets'][-1]
+                }
+            }
+        return result
+
+    def to_json(self) -> str:
+        snapshot = self.snapshot()
+        # inf não é JSON válido
+        for stats in snapshot.values():
+            for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+                if stats[key] == float('inf'):
+                    stats[key] = None
+        return json.dumps({
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'buckets_ms': list(self.buckets_ms),
+            'operations': snapshot
+        }, indent=2, ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = 'futprevisao') -> str:
+        """Formato de exposição texto do Prometheus (histograma em segundos)"""
+        metric = f"{prefix}_call_duration_seconds"
+        errors_metric = f"{prefix}_call_errors_total"
+
+        with self._lock:
+            raw = {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in self._stats.items()}
+
+        lines = [
+            f"# HELP {metric} Latência das operações instrumentadas.",
+            f"# TYPE {metric} histogram"
+        ]
+        for name, stats in sorted(raw.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip(self.buckets_ms, stats['buckets']):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{op="{label}",le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{op="{label}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'{metric}_sum{{op="{label}"}} {stats["total_ms"] / 1000:.6f}')
+            lines.append(f'{metric}_count{{op="{label}"}} {stats["count"]}')
+
+        lines += [
+            f"# HELP {errors_metric} Chamadas que terminaram em exceção.",
+            f"# TYPE {errors_metric} counter"
+        ]
+        for name, stats in sorted(raw.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{errors_metric}{{op="{label}"}} {stats["errors"]}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def timer(name: str, metrics: MetricsRegistry = None):
+    """Mede o bloco; exceções contam como erro (controle de fluxo tipo st.stop não)"""
+    metrics = metrics or registry
+    error = False
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        metrics.observe(name, (time.perf_counter() - start) * 1000, error)
+
+
+def timed(name: str = None, metrics: MetricsRegistry = None) -> Callable:
+    """Decorator de timer(); o nome padrão é o __qualname__ da função"""
+    def decorator(fn: Callable) -> Callable:
+        op = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(op, metrics):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
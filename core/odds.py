@@ -0,0 +1,364 @@
+"""
+Odds reais: colunas de odds dos CSVs num array (jogos x casas x mercados) + fontes plugáveis
+
+Os CSVs do football-data trazem, por jogo, odds de abertura e de fechamento de várias
+casas para 1X2, gols acima/abaixo de 2.5 e handicap asiático:
+
+    B365H / B365CH       Bet365 1X2 casa (abertura / fechamento)
+    P>2.5 / PC>2.5       Pinnacle gols acima de 2.5
+    MaxAHH / AvgAHH      máxima / média do mercado no handicap asiático
+
+OddsStore.from_matches extrai todas essas colunas uma vez para dois arrays float32
+(abertura e fechamento) de forma (jogos x casas x mercados); NaN = casa sem odd.
+
+Jogos futuros (e mercados que os CSVs não têm, como escanteios e cartões) chegam
+por fontes plugáveis (OddsSource). A fonte padrão lê arquivos largados na pasta
+odds/ com as colunas Data, HomeTeam, AwayTeam, Casa, Mercado, Odd (e, opcional,
+Fechamento); o Mercado das linhas do app é "<tipo> <mercado>" (ex.: "Escanteios
+Totais Over 9.5").
+
+Uso:
+    store = load_odds(matches)
+    store.quotes('Arsenal', 'Chelsea', date='20/12/2025')       # casa -> mercado -> odd
+    store.lookup([('Arsenal', 'Chelsea', '20/12/2025')], ['Escanteios Totais Over 9.5'])  # melhor odd
+"""
+
+import glob
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import BASE_ODD, ODDS_DIR, SEARCH_PATHS
+from core.metrics import timed
+
+# Casa -> (prefixo nas colunas de 1X2, prefixo nas de gols/handicap); None = casa não cota o mercado
+ODDS_BOOKMAKERS: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    'Bet365': ('B365', 'B365'),
+    'Pinnacle': ('PS', 'P'),
+    'Betfair': ('BFE', 'BFE'),
+    'Betfred': ('BFD', None),
+    'BetMGM': ('BMGM', None),
+    'BetVictor': ('BV', None),
+    'Bwin': ('BW', None),
+    'Coral': ('CL', None),
+    'Ladbrokes': ('LB', None),
+    'Máxima do mercado': ('Max', 'Max'),
+    'Média do mercado': ('Avg', 'Avg'),
+}
+# Não são casas: ficam fora da melhor odd e da comparação entre casas
+AGGREGATES = {'Máxima do mercado', 'Média do mercado'}
+
+# Mercado -> (grupo do prefixo, sufixo); fechamento = prefixo + 'C' + sufixo
+CSV_MARKETS: Dict[str, Tuple[int, str]] = {
+    '1X2 Casa': (0, 'H'),
+    '1X2 Empate': (0, 'D'),
+    '1X2 Fora': (0, 'A'),
+    'Gols Over 2.5': (1, '>2.5'),
+    'Gols Under 2.5': (1, '<2.5'),
+    'AH Casa': (1, 'AHH'),
+    'AH Fora': (1, 'AHA'),
+}
+
+# Handicap asiático: a odd só vale para a linha do jogo (AHh na abertura, AHCh no fechamento,
+# do ponto de vista do mandante); a seleção leva a linha no nome ('AH Casa -0.5', 'AH Fora +0.5')
+AH_MARKETS = ('AH Casa', 'AH Fora')
+
+QUOTE_COLUMNS = ['Data', 'HomeTeam', 'AwayTeam', 'Casa', 'Mercado', 'Odd']
+CLOSING_COLUMN = 'Fechamento'  # opcional nas cotações: odd de fechamento do mercado
+
+
+def line_market(line: Dict) -> str:
+    """Nome do mercado de uma linha de generate_all_lines nas cotações ('Escanteios Totais Over 9.5')"""
+    return f"{line['tipo']} {line['mercado']}"
+
+
+def odds_column(bookmaker: str, market: str, closing: bool = False) -> Optional[str]:
+    """Nome da coluna do football-data ('Pinnacle', 'Gols Over 2.5', closing) -> 'PC>2.5'"""
+    group, suffix = CSV_MARKETS[market]
+    prefix = ODDS_BOOKMAKERS[bookmaker][group]
+    if prefix is None:
+        return None
+    return f"{prefix}C{suffix}" if closing else f"{prefix}{suffix}"
+
+
+def side_line(market: str, home_line):
+    """Linha da seleção de handicap ('AH Casa' ou 'AH Fora') a partir da linha do mandante"""
+    return home_line if market == 'AH Casa' else -home_line
+
+
+def ah_market(market: str, home_line: float) -> str:
+    """Nome da seleção de handicap com a linha: ('AH Fora', -0.5) -> 'AH Fora +0.5'"""
+    return f"{market} {side_line(market, home_line) + 0.0:+g}"
+
+
+def split_ah(market: str) -> Optional[Tuple[str, float]]:
+    """('AH Casa', -0.5) de 'AH Casa -0.5'; None se não for handicap com linha"""
+    base, _, line = str(market).rpartition(' ')
+    if base not in AH_MARKETS:
+        return None
+    try:
+        return base, float(line)
+    except ValueError:
+        return None
+
+
+# ==============================================================================
+# STORE
+# ==============================================================================
+
+class OddsStore:
+    """Odds de abertura/fechamento por (jogo, casa, mercado) com índice por jogo"""
+
+    def __init__(self, keys: List[Tuple[str, str, str]], bookmakers: List[str], markets: List[str],
+                 odds: np.ndarray, closing: np.ndarray = None, ah_lines: np.ndarray = None):
+        self.keys = keys                  # (data, mandante, visitante) de cada linha
+        self.bookmakers = bookmakers
+        self.markets = markets
+        self.odds = odds                  # jogos x casas x mercados (float32, NaN = sem odd)
+        self.closing = closing if closing is not None else np.full_like(odds, np.nan)
+        self.ah_lines = ah_lines if ah_lines is not None else np.full((len(keys), 2), np.nan, dtype=np.float32)
+        self.book_index = {b: i for i, b in enumerate(bookmakers)}
+        self.market_index = {m: i for i, m in enumerate(markets)}
+        self._rows = {key: i for i, key in enumerate(keys)}
+        self.real_mask = np.array([b not in AGGREGATES for b in bookmakers], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def empty(cls) -> 'OddsStore':
+        return cls([], [], [], np.zeros((0, 0, 0), dtype=np.float32))
+
+    @classmethod
+    @timed('odds_extract')
+    def from_matches(cls, matches: pd.DataFrame) -> 'OddsStore':
+        """Todas as colunas de odds conhecidas dos jogos, numa passada por coluna"""
+        n = len(matches)
+        markets = list(CSV_MARKETS)
+        present = [b for b in ODDS_BOOKMAKERS
+                   if any(odds_column(b, m) in matches.columns for m in markets if odds_column(b, m))]
+        odds = np.full((n, len(present), len(markets)), np.nan, dtype=np.float32)
+        closing = np.full_like(odds, np.nan)
+        for b, bookmaker in enumerate(present):
+            for m, market in enumerate(markets):
+                for target, is_closing in ((odds, False), (closing, True)):
+                    column = odds_column(bookmaker, market, is_closing)
+                    if column in matches.columns:
+                        target[:, b, m] = pd.to_numeric(matches[column], errors='coerce').to_numpy(np.float32)
+
+        ah_lines = np.column_stack([
+            pd.to_numeric(matches[c], errors='coerce').to_numpy(np.float32) if c in matches.columns
+            else np.full(n, np.nan, dtype=np.float32)
+            for c in ('AHh', 'AHCh')
+        ]) if n else np.zeros((0, 2), dtype=np.float32)
+
+        keys = list(zip(matches['Date'].astype(str), matches['HomeTeam'].astype(str), matches['AwayTeam'].astype(str)))
+        return cls(keys, present, markets, odds, closing, ah_lines)
+
+    @classmethod
+    def from_quotes(cls, quotes: pd.DataFrame) -> 'OddsStore':
+        """Store a partir de cotações no formato longo (QUOTE_COLUMNS), ex.: arquivos de odds/"""
+        if quotes.empty:
+            return cls.empty()
+        quotes = quotes.assign(Odd=pd.to_numeric(quotes['Odd'], errors='coerce')).dropna(subset=['Odd'])
+        keys_index = pd.MultiIndex.from_frame(quotes[['Data', 'HomeTeam', 'AwayTeam']].astype(str))
+        key_codes, keys = pd.factorize(keys_index)
+        book_codes, bookmakers = pd.factorize(quotes['Casa'].astype(str))
+        market_codes, markets = pd.factorize(quotes['Mercado'].astype(str))
+
+        odds = np.full((len(keys), len(bookmakers), len(markets)), np.nan, dtype=np.float32)
+        odds[key_codes, book_codes, market_codes] = quotes['Odd'].to_numpy(np.float32)  # repetida: vale a última
+        closing = np.full_like(odds, np.nan)
+        if CLOSING_COLUMN in quotes.columns:
+            closing[key_codes, book_codes, market_codes] = pd.to_numeric(
+                quotes[CLOSING_COLUMN], errors='coerce').to_numpy(np.float32)
+        return cls(list(keys), list(bookmakers), list(markets), odds, closing)
+
+    def merge(self, other: 'OddsStore') -> 'OddsStore':
+        """União dos dois stores; onde ambos têm odd para o mesmo jogo/casa/mercado, vale `other`"""
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        keys = self.keys + [k for k in other.keys if k not in self._rows]
+        bookmakers = self.bookmakers + [b for b in other.bookmakers if b not in self.book_index]
+        markets = self.markets + [m for m in other.markets if m not in self.market_index]
+        rows = {k: i for i, k in enumerate(keys)}
+        books = {b: i for i, b in enumerate(bookmakers)}
+        mkts = {m: i for i, m in enumerate(markets)}
+
+        def expand(store: 'OddsStore', source: np.ndarray, target: np.ndarray):
+            r = np.array([rows[k] for k in store.keys], dtype=np.intp)
+            b = np.array([books[x] for x in store.bookmakers], dtype=np.intp)
+            m = np.array([mkts[x] for x in store.markets], dtype=np.intp)
+            if len(r) and len(b) and len(m):
+                block = target[np.ix_(r, b, m)]
+                target[np.ix_(r, b, m)] = np.where(np.isnan(source), block, source)
+
+        shape = (len(keys), len(bookmakers), len(markets))
+        odds, closing = np.full(shape, np.nan, dtype=np.float32), np.full(shape, np.nan, dtype=np.float32)
+        for store in (self, other):
+            expand(store, store.odds, odds)
+            expand(store, store.closing, closing)
+        ah_lines = np.full((len(keys), 2), np.nan, dtype=np.float32)
+        ah_lines[:len(self.keys)] = self.ah_lines
+        return OddsStore(keys, bookmakers, markets, odds, closing, ah_lines)
+
+    # ------------------------------------------------------------------
+    # CONSULTA
+    # ------------------------------------------------------------------
+
+    def row(self, home: str, away: str, date: str) -> Optional[int]:
+        """Linha do jogo (a data separa o jogo futuro dos confrontos já disputados)"""
+        return self._rows.get((str(date), home, away))
+
+    def quotes(self, home: str, away: str, date: str, closing: bool = False) -> Dict[str, Dict[str, float]]:
+        """Casa -> mercado -> odd do jogo (só o que existe)"""
+        i = self.row(home, away, date)
+        if i is None:
+            return {}
+        source = self.closing if closing else self.odds
+        result = {}
+        for b, bookmaker in enumerate(self.bookmakers):
+            values = {m: round(float(source[i, b, j]), 2) for j, m in enumerate(self.markets) if not np.isnan(source[i, b, j])}
+            if values:
+                result[bookmaker] = values
+        return result
+
+    def market_odds(self, home: str, away: str, date: str, market: str) -> Dict[str, float]:
+        """Casa -> odd de um mercado do jogo (casas reais, sem máxima/média)"""
+        i, m = self.row(home, away, date), self.market_index.get(market)
+        if i is None or m is None:
+            return {}
+        return {b: round(float(self.odds[i, j, m]), 2) for j, b in enumerate(self.bookmakers)
+                if self.real_mask[j] and not np.isnan(self.odds[i, j, m])}
+
+    def lookup(self, fixtures: Sequence[Tuple], markets: Sequence[str], bookmaker: str = None,
+               closing: bool = False) -> np.ndarray:
+        """Odds (jogos x mercados) de uma casa ou, sem casa, a melhor entre as casas reais; NaN sem odd
+
+        fixtures: (mandante, visitante, data)
+        markets: lista comum a todos os jogos, ou uma lista (de mesmo tamanho) por jogo
+        """
+        n = len(fixtures)
+        matched = [self.row(home, away, date) for home, away, date in fixtures]
+        found = np.array([r is not None for r in matched], dtype=bool)
+        rows = np.array([r or 0 for r in matched], dtype=np.intp)
+
+        per_fixture = len(markets) > 0 and isinstance(markets[0], (list, tuple))
+        names = [list(m) for m in markets] if per_fixture else [list(markets)] * n
+        width = len(names[0]) if names else 0
+        cols = np.array([[self.market_index.get(m, -1) for m in ms] for ms in names], dtype=np.intp).reshape(n, width)
+
+        if not len(self) or not len(self.markets):
+            return np.full((n, width), np.nan)
+        source = self.closing if closing else self.odds
+        if bookmaker is not None:
+            b = self.book_index.get(bookmaker)
+            if b is None:
+                return np.full((n, width), np.nan)
+            values = source[rows[:, None], b, np.maximum(cols, 0)]
+        else:
+            block = source[rows[:, None], :, np.maximum(cols, 0)][..., self.real_mask]  # jogos x mercados x casas
+            values = np.fmax.reduce(block, axis=2) if block.shape[2] else np.full((n, width), np.nan)
+        values = np.where(found[:, None] & (cols >= 0), values, np.nan)
+        return values.astype(float).round(2)  # float32 -> 2 casas, como as odds do arquivo
+
+
+def expected_values(probs, odds, fallback: float = BASE_ODD) -> np.ndarray:
+    """EV (%) de cada probabilidade (%) contra a odd real; fallback onde não há odd"""
+    probs = np.asarray(probs, dtype=float) / 100
+    odds = np.where(np.isnan(np.asarray(odds, dtype=float)), fallback, odds)
+    return (probs * (odds - 1) - (1 - probs)) * 100
+
+
+# ==============================================================================
+# FONTES PLUGÁVEIS
+# ==============================================================================
+
+class OddsSource(ABC):
+    """Fonte de cotações para jogos futuros: fetch() devolve um DataFrame em QUOTE_COLUMNS
+
+    Subclasse sem fetch() não instancia (TypeError já no register_source, não no load_odds).
+    """
+    name = 'fonte'
+
+    @abstractmethod
+    def fetch(self) -> pd.DataFrame:
+        """Cotações atuais da fonte (DataFrame vazio em QUOTE_COLUMNS quando não há nenhuma)"""
+
+
+class FileDropSource(OddsSource):
+    """Arquivos .csv largados numa pasta (ex.: exportados de um feed ou digitados)"""
+    name = 'arquivos'
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self._cache: Tuple = (None, pd.DataFrame(columns=QUOTE_COLUMNS))
+
+    @classmethod
+    def open(cls, search_paths: List[str] = SEARCH_PATHS) -> Optional['FileDropSource']:
+        for base_path in search_paths:
+            folder = os.path.join(base_path, ODDS_DIR)
+            if os.path.isdir(folder):
+                return cls(folder)
+        return None
+
+    def signature(self) -> tuple:
+        """(arquivo, mtime) dos .csv da pasta - muda quando um arquivo é largado ou trocado"""
+        files = sorted(glob.glob(os.path.join(self.folder, '*.csv')))
+        return tuple((f, os.stat(f).st_mtime_ns) for f in files)
+
+    def fetch(self) -> pd.DataFrame:
+        signature = self.signature()
+        if signature == self._cache[0]:
+            return self._cache[1]
+
+        frames = []
+        for filepath, _ in signature:
+            try:
+                frame = pd.read_csv(filepath, encoding='utf-8')
+            except Exception:
+                continue  # arquivo ilegível não derruba as demais cotações
+            if set(QUOTE_COLUMNS) <= set(frame.columns):
+                frames.append(frame[[c for c in frame.columns if c in QUOTE_COLUMNS or c == CLOSING_COLUMN]])
+        quotes = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=QUOTE_COLUMNS)
+        self._cache = (signature, quotes)
+        return quotes
+
+
+_sources: List[OddsSource] = []
+
+
+def register_source(source: OddsSource):
+    """Acrescenta uma fonte (API de uma casa, feed, ...) às usadas por load_odds"""
+    if not isinstance(source, OddsSource):
+        raise TypeError(f"fonte de odds deve ser uma instância de OddsSource, não {type(source).__name__}")
+    _sources.append(source)
+
+
+def drop_version(search_paths: List[str] = SEARCH_PATHS) -> tuple:
+    """Assinatura da pasta odds/ (vazia sem pasta): entra na chave de cache dos motores"""
+    drop = FileDropSource.open(search_paths)
+    return drop.signature() if drop else ()
+
+
+def default_sources(search_paths: List[str] = SEARCH_PATHS) -> List[OddsSource]:
+    drop = FileDropSource.open(search_paths)
+    return ([drop] if drop else []) + list(_sources)
+
+
+@timed('odds_load')
+def load_odds(matches: pd.DataFrame, sources: List[OddsSource] = None,
+              search_paths: List[str] = SEARCH_PATHS) -> OddsStore:
+    """Odds dos CSVs + cotações das fontes (as fontes sobrepõem os CSVs)"""
+    store = OddsStore.from_matches(matches)
+    for source in (default_sources(search_paths) if sources is None else sources):
+        try:
+            store = store.merge(OddsStore.from_quotes(source.fetch()))
+        except Exception:
+            continue  # fonte fora do ar: segue com o que já tem
+    return store
@@ -0,0 +1,306 @@
+"""
+Oráculo: recomendações automáticas, scanner e chat de análise
+"""
+
+import re
+from difflib import get_close_matches
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import BASE_ODD
+from core.metrics import timed
+from core.odds import expected_values, line_market
+from core.predict import PredictionEngineSupreme
+from core.shopping import shop
+
+
+class OraculoSupreme:
+    """Oráculo com recomendações automáticas"""
+
+    def __init__(self, df: pd.DataFrame, refs: pd.DataFrame, calendar: pd.DataFrame, predictor: PredictionEngineSupreme):
+        self.df = df
+        self.refs = refs
+        self.calendar = calendar
+        self.predictor = predictor
+
+    @timed('auto_recommendations')
+    def auto_recommendations(self, date_filter: str = None, league_filter: str = 'Todas', n_games: int = 5) -> List[Dict]:
+        """Gera recomendações filtradas por data e liga"""
+
+        recommendations = []
+        calendar = self.calendar
+
+        # Filtrar por data
+        if date_filter:
+            calendar = calendar[calendar['Data'] == date_filter]
+
+        # Filtrar por liga
+        if league_filter != 'Todas':
+            calendar = calendar[calendar['Liga'] == league_filter]
+
+        referee_col = self._referee_column(calendar)
+        candidates = []
+        for _, row in calendar.head(30).iterrows():
+            home = row['HomeTeam']
+            away = row['AwayTeam']
+
+            pred = self.predictor.predict_full(home, away, referee=row.get(referee_col) if referee_col else None)
+
+            if pred and pred['confidence']['score'] >= 70:
+                smart_line = self.predictor.find_smart_line(pred)
+
+                if smart_line and smart_line['prob'] >= 65:
+                    candidates.append((row, pred, smart_line))
+
+        odds, evs = self._estimate_ev(candidates)
+        for (row, pred, smart_line), odd, ev in zip(candidates, odds, evs):
+            recommendations.append({
+                'jogo': f"{row['HomeTeam']} x {row['AwayTeam']}",
+                'data': row.get('Data', 'N/A'),
+                'liga': row.get('Liga', 'N/A'),
+                'linha': smart_line['mercado'],
+                'prob': smart_line['prob'],
+                'confidence': pred['confidence']['score'],
+                'odd': odd,
+                'ev': ev,
+                'pred': pred
+            })
+
+        recommendations = sorted(recommendations, key=lambda x: x['ev'], reverse=True)
+        return recommendations[:n_games]
+
+    def _referee_column(self, calendar: pd.DataFrame):
+        """Coluna de árbitro do calendário, quando o arquivo tiver uma
+
+        O calendario_ligas.csv distribuído não tem Arbitro/Referee: sem essa coluna o
+        scanner e as recomendações projetam os cartões sem o ajuste do árbitro.
+        """
+        return next((c for c in ('Arbitro', 'Referee') if c in calendar.columns), None)
+
+    def _estimate_ev(self, candidates: List[Tuple]) -> Tuple[List[float], List[float]]:
+        """Odd e EV (%) da linha de cada (linha do calendário, pred, linha): uma consulta às odds reais
+
+        Sem cotação para o jogo/mercado, a odd é BASE_ODD.
+        """
+        if not candidates:
+            return [], []
+        probs = np.array([line['prob'] for _, _, line in candidates], dtype=float)
+        odds = np.full(len(candidates), np.nan)
+        if self.predictor.odds is not None:
+            fixtures = [(row['HomeTeam'], row['AwayTeam'], row.get('Data')) for row, _, _ in candidates]
+            odds = self.predictor.odds.lookup(fixtures, [[line_market(line)] for _, _, line in candidates])[:, 0]
+        odds = np.where(np.isnan(odds), BASE_ODD, odds)
+        return odds.round(2).tolist(), expected_values(probs, odds).tolist()
+
+    def scan(self, date_filter: str, min_conf: int = 70, min_prob: float = 60, min_ev: float = 10) -> List[Dict]:
+        """Scanner multi-critério: oportunidades do dia ordenadas por score"""
+        calendar_filtered = self.calendar[self.calendar['Data'] == date_filter]
+        referee_col = self._referee_column(calendar_filtered)
+
+        candidates = []
+        for _, row in calendar_filtered.iterrows():
+            referee = row.get(referee_col) if referee_col else None
+            pred = self.predictor.predict_full(row['HomeTeam'], row['AwayTeam'], referee=referee)
+
+            if pred and pred['confidence']['score'] >= min_conf:
+                smart_line = self.predictor.find_smart_line(pred)
+
+                if smart_line and smart_line['prob'] >= min_prob:
+                    candidates.append((row, pred, smart_line))
+
+        opportunities = []
+        odds, evs = self._estimate_ev(candidates)
+        for (row, pred, smart_line), odd, ev in zip(candidates, odds, evs):
+            if ev >= min_ev:
+                opportunity = {
+                    'Jogo': f"{row['HomeTeam']} x {row['AwayTeam']}",
+                    'Data': row.get('Data', 'N/A'),
+                    'Linha': smart_line['mercado'],
+                    'Prob (%)': smart_line['prob'],
+                    'Confiança': pred['confidence']['score'],
+                    'Odd': odd,
+                    'EV (%)': ev,
+                    'Score': pred['confidence']['score'] + smart_line['prob'] / 2
+                }
+                if referee_col:
+                    referee = row.get(referee_col)
+                    opportunity['Árbitro'] = referee if isinstance(referee, str) else '-'
+                opportunities.append(opportunity)
+
+        return sorted(opportunities, key=lambda x: x['Score'], reverse=True)
+
+    def line_shopping(self, date_filter: str, league_filter: str = 'Todas', reference: str = None) -> pd.DataFrame:
+        """Melhor preço, prob. justa e arbitragem de todos os eventos cotados nos jogos do dia"""
+        calendar = self.calendar[self.calendar['Data'] == date_filter]
+        if league_filter != 'Todas':
+            calendar = calendar[calendar['Liga'] == league_filter]
+        fixtures = list(zip(calendar['HomeTeam'], calendar['AwayTeam'], calendar['Data']))
+        return shop(self.predictor.odds, fixtures, reference)
+
+    def processar_chat(self, query: str, contexto: Dict) -> Dict:
+        query_lower = query.lower()
+
+        if any(w in query_lower for w in ['analisa', 'analise', ' x ', 'vs']):
+            return self._analise_completa(query, contexto)
+        elif any(w in query_lower for w in ['top', 'melhores', 'recomenda']):
+            return self._top_jogos(contexto)
+        elif any(w in query_lower for w in ['comparar', 'comparado']):
+            return self._comparacao(query, contexto)
+        else:
+            return self._fallback()
+
+    def _analise_completa(self, query: str, contexto: Dict) -> Dict:
+        times = self._extrair_times(query)
+
+        if len(times) < 2:
+            return {
+                'texto': '⚠️ Não consegui identificar 2 times. Tente: "Analisa Arsenal x Chelsea"',
+                'tipo': 'erro'
+            }
+
+        home, away = times[0], times[1]
+        pred = self.predictor.predict_full(home, away)
+
+        if not pred:
+            return {
+                'texto': f'⚠️ Dados insuficientes para {home} ou {away}.',
+                'tipo': 'erro'
+            }
+
+        contexto['ultimo_jogo'] = {'nome': f"{home} x {away}", 'pred': pred}
+        smart_line = self.predictor.find_smart_line(pred)
+
+        texto = f"""
+## 🎯 ANÁLISE SUPREMA
+
+### {home} ⚔️ {away}
+
+<div class="card-info">
+
+#### ⚽ ESCANTEIOS
+
+**Projeção {home}:** {pred['corners']['home']:.2f} escanteios  
+**Projeção {away}:** {pred['corners']['away']:.2f} escanteios  
+**Total Esperado:** {pred['corners']['total']:.2f} escanteios
+
+**Margens de Segurança:**
+- P80: {pred['corners']['p80']} escanteios
+- P95: {pred['corners']['p95']} escanteios
+
+</div>
+
+<div class="card-light">
+
+#### 🟨 CARTÕES
+
+**Total:** {pred['cards']['total']:.2f} cartões  
+**{home}:** {pred['cards']['home']:.2f} cartões  
+**{away}:** {pred['cards']['away']:.2f} cartões
+
+</div>
+
+<div class="card-success">
+
+#### 💎 CONFIANÇA
+
+**Score:** {pred['confidence']['score']}/100 {pred['confidence']['label']}  
+**Volatilidade:** {pred['volatility']['home']:.1f}% (casa) | {pred['volatility']['away']:.1f}% (fora)
+
+</div>
+
+{'<div class="card-success">#### 🎯 LINHA RECOMENDADA: ' + smart_line["mercado"] + f' (Prob: {smart_line["prob"]:.1f}%)</div>' if smart_line else ''}
+"""
+
+        return {'texto': texto, 'tipo': 'analise'}
+
+    def _top_jogos(self, contexto: Dict) -> Dict:
+        recomendacoes = self.auto_recommendations(
+            date_filter=contexto.get('dashboard_date'),
+            league_filter=contexto.get('dashboard_league', 'Todas'),
+            n_games=5
+        )
+
+        if not recomendacoes:
+            return {
+                'texto': '⚠️ Nenhuma oportunidade de alta confiança encontrada.',
+                'tipo': 'info'
+            }
+
+        texto = "## 🔥 TOP 5 OPORTUNIDADES\n\n"
+
+        for i, rec in enumerate(recomendacoes, 1):
+            texto += f"""
+<div class="card-success">
+
+### #{i} {rec['jogo']}
+
+**Linha:** {rec['linha']}  
+**Probabilidade:** {rec['prob']:.1f}%  
+**Confiança:** {rec['confidence']}/100  
+**EV Estimado:** {rec['ev']:+.1f}% @ {rec['odd']:.2f}
+
+</div>
+"""
+
+        return {'texto': texto, 'tipo': 'recomendacoes'}
+
+    def _comparacao(self, query: str, contexto: Dict) -> Dict:
+        if 'ultimo_jogo' not in contexto:
+            return {'texto': '⚠️ Analise um jogo primeiro para comparar.', 'tipo': 'erro'}
+
+        times = self._extrair_times(query)
+
+        if len(times) < 2:
+            return {'texto': '⚠️ Especifique o jogo para comparar.', 'tipo': 'erro'}
+
+        home, away = times[0], times[1]
+        pred_novo = self.predictor.predict_full(home, away)
+
+        if not pred_novo:
+            return {'texto': f'⚠️ Dados insuficientes para {home} x {away}.', 'tipo': 'erro'}
+
+        ultimo = contexto['ultimo_jogo']
+        pred_antigo = ultimo['pred']
+
+        texto = f"""
+## ⚖️ COMPARAÇÃO
+
+### {ultimo['nome']} vs {home} x {away}
+
+| Métrica | Jogo Anterior | Jogo Novo | Diferença |
+|---------|---------------|-----------|-----------|
+| **Escanteios** | {pred_antigo['corners']['total']:.2f} | {pred_novo['corners']['total']:.2f} | {abs(pred_antigo['corners']['total'] - pred_novo['corners']['total']):.2f} |
+| **Confiança** | {pred_antigo['confidence']['score']} | {pred_novo['confidence']['score']} | {abs(pred_antigo['confidence']['score'] - pred_novo['confidence']['score'])} |
+| **P80** | {pred_antigo['corners']['p80']} | {pred_novo['corners']['p80']} | {abs(pred_antigo['corners']['p80'] - pred_novo['corners']['p80'])} |
+
+**Melhor Jogo:** {'Anterior' if pred_antigo['confidence']['score'] > pred_novo['confidence']['score'] else 'Novo'}
+"""
+
+        return {'texto': texto, 'tipo': 'comparacao'}
+
+    def _extrair_times(self, query: str) -> List[str]:
+        all_teams = list(self.df['HomeTeam'].unique())
+        words = re.findall(r'[A-ZÀ-Ÿ][a-zà-ÿ]+(?:\s[A-ZÀ-Ÿ][a-zà-ÿ]+)*', query)
+
+        teams_found = []
+        for word in words:
+            match = get_close_matches(word, all_teams, n=1, cutoff=0.5)
+            if match:
+                teams_found.append(match[0])
+
+        return list(set(teams_found))
+
+    def _fallback(self) -> Dict:
+        return {
+            'texto': """
+⚠️ **Comando não reconhecido**
+
+**Exemplos:**
+- "Analisa Arsenal x Chelsea"
+- "Top 5 jogos de hoje"
+- "Comparado ao anterior, qual melhor?"
+""",
+            'tipo': 'ajuda'
+        }
@@ -0,0 +1,356 @@
+"""
+Motores matemático, de confiança e de predição (escanteios/cartões)
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import BASE_ODD, BOOKMAKERS, HISTORY_SEASONS
+from core.metrics import timed
+from core.odds import line_market
+
+
+# Linhas precificadas por generate_all_lines (e pelo backtest): tipo, rótulo, projeção, linhas, ícone
+LINE_MARKETS = [
+    ('Escanteios Totais', "Over {}", ('corners', 'total'), [8.5, 9.5, 10.5, 11.5, 12.5, 13.5], '⚽'),
+    ('Escanteios Casa', "Casa Over {}", ('corners', 'home'), [2.5, 3.5, 4.5, 5.5], '🏠'),
+    ('Escanteios Fora', "Fora Over {}", ('corners', 'away'), [2.5, 3.5, 4.5, 5.5], '✈️'),
+    ('Cartões Totais', "Over {}", ('cards', 'total'), [2.5, 3.5, 4.5, 5.5], '🟨'),
+]
+
+
+def _poisson():
+    """scipy.stats leva ~1s para importar: só é carregado no primeiro cálculo de linha"""
+    from scipy.stats import poisson
+    return poisson
+
+# ==============================================================================
+# MATH ENGINE
+# ==============================================================================
+
+class MathEngineSupreme:
+    """Motor matemático avançado"""
+
+    @staticmethod
+    def weighted_average(values: np.ndarray, recent_weight: float = 0.6) -> float:
+        if len(values) == 0:
+            return 0.0
+        weights = np.linspace(1 - recent_weight, 1 + recent_weight, len(values))
+        return np.average(values, weights=weights)
+
+    @staticmethod
+    def form_factor(recent_results: List[str], n_games: int = 5) -> float:
+        if not recent_results:
+            return 1.0
+        recent = recent_results[-n_games:]
+        wins = recent.count('W')
+        if wins >= 4:
+            return 1.15
+        elif wins >= 3:
+            return 1.10
+        elif wins >= 2:
+            return 1.05
+        elif wins >= 1:
+            return 0.95
+        else:
+            return 0.85
+
+    @staticmethod
+    def volatility_index(values: np.ndarray) -> float:
+        if len(values) < 2:
+            return 0.0
+        mean = np.mean(values)
+        if mean == 0:
+            return 0.0
+        std = np.std(values)
+        return (std / mean) * 100
+
+    @staticmethod
+    def poisson_probability(lmbda: float, k: int) -> float:
+        return _poisson().pmf(k, lmbda)
+
+    @staticmethod
+    @timed('monte_carlo_simulation')
+    def monte_carlo_simulation(lmbda: float, n_sims: int = 10000) -> Dict:
+        samples = np.random.poisson(lmbda, n_sims)
+        return {
+            'samples': samples,
+            'mean': float(np.mean(samples)),
+            'p50': int(np.percentile(samples, 50)),
+            'p80': int(np.percentile(samples, 80)),
+            'p95': int(np.percentile(samples, 95)),
+            'over_9_5': float(np.mean(samples >= 10)),
+            'over_10_5': float(np.mean(samples >= 11)),
+            'over_11_5': float(np.mean(samples >= 12)),
+            'over_12_5': float(np.mean(samples >= 13))
+        }
+
+    @staticmethod
+    def kelly_criterion(prob: float, odds: float, bankroll: float, fraction: float = 0.25) -> float:
+        if odds <= 1 or prob <= 0 or prob >= 1:
+            return 0.0
+        b = odds - 1
+        q = 1 - prob
+        kelly = (b * prob - q) / b
+        if kelly <= 0:
+            return 0.0
+        return max(0, min(kelly * fraction * bankroll, bankroll * 0.05))
+
+    @staticmethod
+    def expected_value(prob: float, odds: float) -> float:
+        return (prob * (odds - 1)) - (1 - prob)
+
+# ==============================================================================
+# CONFIDENCE ENGINE
+# ==============================================================================
+
+class ConfidenceEngine:
+    """Motor de cálculo de confiança"""
+
+    @staticmethod
+    def calculate_confidence(n_games: int, volatility: float, h2h_consistency: float = 0.5) -> Tuple[int, str]:
+        if n_games >= 15:
+            sample_score = 40
+        elif n_games >= 10:
+            sample_score = 30
+        elif n_games >= 5:
+            sample_score = 20
+        else:
+            sample_score = 10
+
+        if volatility < 20:
+            volatility_score = 40
+        elif volatility < 30:
+            volatility_score = 30
+        elif volatility < 40:
+            volatility_score = 20
+        else:
+            volatility_score = 10
+
+        h2h_score = int(h2h_consistency * 20)
+        total_score = sample_score + volatility_score + h2h_score
+
+        if total_score >= 80:
+            label = "🟢 Alta"
+        elif total_score >= 60:
+            label = "🟡 Média"
+        else:
+            label = "🔴 Baixa"
+
+        return total_score, label
+
+    @staticmethod
+    def get_confidence_color(score: int, theme: str = 'light') -> str:
+        if score >= 80:
+            return "#D1FAE5" if theme == 'light' else "#064e3b"
+        elif score >= 60:
+            return "#FEF3C7" if theme == 'light' else "#78350f"
+        else:
+            return "#FEE2E2" if theme == 'light' else "#7f1d1d"
+
+# ==============================================================================
+# PREDICTION ENGINE
+# ==============================================================================
+
+class PredictionEngineSupreme:
+    """Motor de predição avançado"""
+
+    def __init__(self, df: pd.DataFrame, history=None, history_seasons: int = HISTORY_SEASONS, referees=None,
+                 calibration=None, odds=None):
+        self.df = df
+        self.referees = referees  # RefereeIndex opcional: ajusta os cartões pelo árbitro do jogo
+        self.calibration = calibration  # CalibrationMaps opcional: prob. Poisson -> prob. calibrada
+        self.odds = odds  # OddsStore opcional: cotações reais por jogo/casa/mercado
+        self.math_engine = MathEngineSupreme()
+        self.confidence_engine = ConfidenceEngine()
+        self._positions = None  # índice time -> jogos, montado no primeiro predict_batch
+        # SeasonStore opcional: temporadas anteriores entram antes dos jogos atuais
+        self.history = history
+        self.history_seasons = history_seasons if history is not None else 0
+        self._history_frames: Dict[str, pd.DataFrame] = {}
+
+    @timed('predict_full')
+    def predict_full(self, home_team: str, away_team: str, league: str = None, referee: str = None) -> Optional[Dict]:
+        home_data = self.df[(self.df['HomeTeam'] == home_team) | (self.df['AwayTeam'] == home_team)]
+        away_data = self.df[(self.df['HomeTeam'] == away_team) | (self.df['AwayTeam'] == away_team)]
+
+        if self.history_seasons:
+            home_data = self._with_history(home_team, home_data)
+            away_data = self._with_history(away_team, away_data)
+
+        return self._predict_from(home_team, away_team, home_data, away_data, referee)
+
+    @timed('predict_batch')
+    def predict_batch(self, fixtures: List[Tuple]) -> List[Optional[Dict]]:
+        """predict_full para vários jogos: o histórico de cada time sai de um índice montado uma vez
+
+        fixtures: (casa, fora) ou (casa, fora, árbitro)
+        """
+        positions = self._team_positions()
+        empty = np.array([], dtype=np.int64)
+        team_frames = {}
+
+        def games_of(team: str) -> pd.DataFrame:
+            if team not in team_frames:
+                current = self.df.iloc[positions.get(team, empty)]
+                team_frames[team] = self._with_history(team, current) if self.history_seasons else current
+            return team_frames[team]
+
+        return [self._predict_from(home, away, games_of(home), games_of(away), *rest) for home, away, *rest in fixtures]
+
+    def _team_positions(self) -> Dict[str, np.ndarray]:
+        """Time -> posições (em ordem) dos jogos como mandante ou visitante; uma passada no DataFrame"""
+        if self._positions is None:
+            # Um jogo nunca tem o mesmo time dos dois lados: basta agrupar mandantes + visitantes juntos
+            rows = np.tile(np.arange(len(self.df)), 2)
+            teams = np.concatenate([self.df['HomeTeam'].to_numpy(), self.df['AwayTeam'].to_numpy()])
+            groups = pd.Series(rows).groupby(teams, sort=False).indices
+            self._positions = {team: np.sort(rows[idx]) for team, idx in groups.items()}
+        return self._positions
+
+    def _with_history(self, team: str, current: pd.DataFrame) -> pd.DataFrame:
+        """Jogos das últimas history_seasons temporadas (só as partições do time) + temporada atual"""
+        if team not in self._history_frames:
+            self._history_frames[team] = self.history.team_history(team, self.history_seasons)
+        past = self._history_frames[team]
+        if past.empty:
+            return current
+        return pd.concat([past[past.columns.intersection(current.columns)], current], ignore_index=True)
+
+    def _predict_from(self, home_team: str, away_team: str, home_data: pd.DataFrame, away_data: pd.DataFrame,
+                      referee: str = None) -> Optional[Dict]:
+        if home_data.empty or away_data.empty:
+            return None
+
+        corners = self._calculate_corners(home_team, away_team, home_data, away_data)
+        cards = self._calculate_cards(home_team, away_team, home_data, away_data, referee)
+        goals = self._calculate_goals(home_data, away_data)
+        fouls = self._calculate_fouls(home_data, away_data)
+
+        volatility_home = self.math_engine.volatility_index(home_data['Total_Corners'].values)
+        confidence_score, confidence_label = self.confidence_engine.calculate_confidence(
+            n_games=min(len(home_data), len(away_data)),
+            volatility=(volatility_home + self.math_engine.volatility_index(away_data['Total_Corners'].values)) / 2
+        )
+
+        return {
+            'corners': corners,
+            'cards': cards,
+            'goals': goals,
+            'fouls': fouls,
+            'confidence': {
+                'score': confidence_score,
+                'label': confidence_label
+            },
+            'volatility': {
+                'home': volatility_home,
+                'away': self.math_engine.volatility_index(away_data['Total_Corners'].values)
+            },
+            'games_played': {
+                'home': len(home_data),
+                'away': len(away_data)
+            }
+        }
+
+    def _calculate_corners(self, home_team: str, away_team: str, home_data: pd.DataFrame, away_data: pd.DataFrame) -> Dict:
+        home_as_home = home_data[home_data['HomeTeam'] == home_team]
+        away_as_away = away_data[away_data['AwayTeam'] == away_team]
+
+        corners_home = self.math_engine.weighted_average(home_as_home['HC'].values[-10:]) if len(home_as_home) > 0 else 5.0
+        corners_away = self.math_engine.weighted_average(away_as_away['AC'].values[-10:]) if len(away_as_away) > 0 else 4.5
+
+        corners_home_proj = corners_home * 1.15
+        corners_away_proj = corners_away * 0.90
+        total = corners_home_proj + corners_away_proj
+
+        return {
+            'home': corners_home_proj,
+            'away': corners_away_proj,
+            'total': total,
+            'p80': int(np.ceil(total + 1.5)),
+            'p95': int(np.ceil(total + 3.0))
+        }
+
+    def _calculate_cards(self, home_team: str, away_team: str, home_data: pd.DataFrame, away_data: pd.DataFrame,
+                         referee: str = None) -> Dict:
+        cards_home = home_data['HY'].mean() if 'HY' in home_data.columns else 2.0
+        cards_away = away_data['AY'].mean() if 'AY' in away_data.columns else 2.0
+
+        ref = self.referees.get(referee) if (self.referees is not None and referee) else None
+        if ref:
+            # Fatores em amarelos (mesma definição de HY/AY), já com o viés casa/fora do árbitro
+            cards_home *= ref['home_factor']
+            cards_away *= ref['away_factor']
+
+        return {
+            'home': cards_home,
+            'away': cards_away,
+            'total': cards_home + cards_away,
+            'referee': ref
+        }
+
+    def _calculate_goals(self, home_data: pd.DataFrame, away_data: pd.DataFrame) -> Dict:
+        return {
+            'home': home_data['FTHG'].mean(),
+            'away': away_data['FTAG'].mean(),
+            'total': home_data['FTHG'].mean() + away_data['FTAG'].mean()
+        }
+
+    def _calculate_fouls(self, home_data: pd.DataFrame, away_data: pd.DataFrame) -> Dict:
+        return {
+            'home': home_data['HF'].mean(),
+            'away': away_data['AF'].mean(),
+            'total': home_data['HF'].mean() + away_data['AF'].mean()
+        }
+
+    @timed('generate_all_lines')
+    def generate_all_lines(self, prediction: Dict) -> List[Dict]:
+        lines = []
+        poisson = _poisson()
+
+        for tipo, label, (group, side), thresholds, icon in LINE_MARKETS:
+            projection = prediction[group][side]
+            # Todas as linhas do mercado numa chamada (e calibradas numa interpolação)
+            raw = (1 - poisson.cdf(np.array(thresholds, dtype=int), projection)) * 100
+            probs = self.calibration.apply(tipo, raw) if self.calibration is not None else raw
+            for threshold, prob, prob_raw in zip(thresholds, probs, raw):
+                lines.append({
+                    'tipo': tipo,
+                    'mercado': label.format(threshold),
+                    'projecao': projection,
+                    'prob': prob,
+                    'prob_poisson': prob_raw,
+                    'icon': icon
+                })
+
+        return lines
+
+    def find_smart_line(self, prediction: Dict) -> Dict:
+        all_lines = self.generate_all_lines(prediction)
+        good_lines = [l for l in all_lines if 60 <= l['prob'] <= 75]
+        if not good_lines:
+            good_lines = [l for l in all_lines if l['prob'] >= 55]
+        if good_lines:
+            return max(good_lines, key=lambda x: x['prob'])
+        return None
+
+    def get_bookmaker_odds(self, base_odd: float = BASE_ODD, home: str = None, away: str = None,
+                           date: str = None, market: str = None) -> Dict:
+        """Odds reais das casas para o mercado do jogo; sem cotação, simula a partir de base_odd"""
+        if self.odds is not None and home and away and date and market:
+            quotes = self.odds.market_odds(home, away, date, market)
+            if quotes:
+                return {bookie: round(odd, 2) for bookie, odd in quotes.items()}
+
+        odds = {}
+        for bookie, config in BOOKMAKERS.items():
+            odds[bookie] = round(base_odd * config['factor'], 2)
+        return odds
+
+    def line_odds(self, home: str, away: str, date: str, lines: List[Dict]) -> np.ndarray:
+        """Melhor odd real de cada linha (NaN sem cotação), numa consulta ao OddsStore"""
+        if self.odds is None or not date:
+            return np.full(len(lines), np.nan)
+        return self.odds.lookup([(home, away, date)], [line_market(l) for l in lines])[0]
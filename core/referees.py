@@ -0,0 +1,301 @@
+"""
+Índice de árbitros: nome canônico -> cartões/jogo, taxa de vermelhos e fatores casa/fora
+
+Fontes:
+    coluna Referee dos jogos         Premier League, Championship e Premiership
+    arbitros_5_ligas_2025_2026.csv  médias mantidas à mão, só para ligas sem coluna Referee
+    arbitros.csv                     Fator manual por árbitro (sobrepõe o fator calculado)
+
+Os CSVs do football-data usam "A Taylor" e os arquivos manuais "Anthony Taylor": os
+dois viram a chave canônica "a taylor" (inicial + sobrenome, sem acento). A consulta
+por jogo é um dict.get.
+
+Os fatores seguem a definição de cartão da projeção (só amarelos, HY/AY): amarelos/jogo
+do árbitro para o mandante e para o visitante divididos pela média da liga em cada lado,
+o que já embute o viés casa/fora do árbitro. Sem amarelos (ligas do arquivo manual sem
+Cartoes_Amarelos), fator = cartões/jogo / REFEREE_BASELINE_CARDS nos dois lados.
+
+As estatísticas dos jogos são somas mantidas por RefereeAggregator: a cada snapshot
+novo só as linhas acrescentadas desde o anterior passam pelo groupby (os arquivos da
+temporada crescem rodada a rodada); uma liga cujo arquivo foi reescrito é refeita.
+"""
+
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.config import LEAGUE_FILES, REFEREE_BASELINE_CARDS, REFEREE_FACTORS_FILE, SEARCH_PATHS
+from core.data_loader import find_file
+
+
+SUM_COLUMNS = ['games', 'cards', 'reds', 'home_cards', 'away_cards', 'home_yellows', 'away_yellows']
+_FINGERPRINT = ['Date', 'HomeTeam', 'AwayTeam']
+
+
+def _ascii(text: str) -> str:
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def canonical_name(name) -> str:
+    """'Anthony Taylor' / 'A Taylor' / 'A. Taylor' -> 'a taylor'"""
+    if not isinstance(name, str):
+        return ''
+    tokens = _ascii(name).lower().replace('.', ' ').replace('-', ' ').split()
+    if not tokens:
+        return ''
+    if len(tokens) == 1:
+        return tokens[0]
+    return f"{tokens[0][0]} {tokens[-1]}"
+
+
+def _canonical_series(names: pd.Series) -> pd.Series:
+    """canonical_name por valor distinto (poucos árbitros, muitos jogos)"""
+    codes, uniques = pd.factorize(names)
+    keys = np.array([canonical_name(u) for u in uniques] + [''], dtype=object)
+    return pd.Series(keys[codes], index=names.index)
+
+
+def league_of(name, leagues=LEAGUE_FILES) -> Optional[str]:
+    """Liga do arquivo manual -> liga do app ('Premiership Escócia' -> 'Premiership')"""
+    if not isinstance(name, str):
+        return None
+    text = _ascii(name).lower()
+    matches = [league for league in leagues if text.startswith(_ascii(league).lower())]
+    return max(matches, key=len) if matches else None
+
+
+# ==============================================================================
+# AGREGAÇÃO INCREMENTAL
+# ==============================================================================
+
+class RefereeAggregator:
+    """Somas por (liga, árbitro) dos jogos com coluna Referee, atualizadas por delta"""
+
+    def __init__(self):
+        self.sums = pd.DataFrame(columns=['League', 'key', 'name'] + SUM_COLUMNS).set_index(['League', 'key'])
+        self.rows: Dict[str, int] = {}       # liga -> linhas já agregadas
+        self.last: Dict[str, tuple] = {}     # liga -> (Date, HomeTeam, AwayTeam) da última linha agregada
+        self.rows_ingested = 0               # linhas que passaram pelo groupby (para conferir o delta)
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, matches: pd.DataFrame, position: int) -> tuple:
+        row = matches.iloc[position]
+        return tuple(str(row.get(c)) for c in _FINGERPRINT)
+
+    def update(self, matches: pd.DataFrame) -> int:
+        """Agrega as linhas novas de cada liga; devolve quantas linhas foram processadas"""
+        if 'Referee' not in matches.columns or matches.empty:
+            return 0
+
+        with self._lock:
+            groups = matches.groupby('League', sort=False).indices
+            delta, reset = [], [league for league in self.rows if league not in groups]
+            for league in reset:
+                del self.rows[league], self.last[league]
+            for league, positions in groups.items():
+                seen = self.rows.get(league, 0)
+                appended = 0 < seen <= len(positions) and \
+                    self._fingerprint(matches, positions[seen - 1]) == self.last.get(league)
+                if not appended and seen:
+                    reset.append(league)  # arquivo reescrito (ou encolheu): refaz a liga
+                start = seen if appended else 0
+                delta.append(positions[start:])
+                self.rows[league] = len(positions)
+                self.last[league] = self._fingerprint(matches, positions[-1])
+
+            sums = self.sums
+            if reset:
+                sums = sums.drop(index=reset, level='League', errors='ignore')
+
+            new = matches.iloc[np.concatenate(delta)] if delta else matches.iloc[:0]
+            new = new[new['Referee'].notna()]
+            if not new.empty:
+                sums = self._add(sums, new)
+
+            self.sums = sums
+            self.rows_ingested += len(new)
+            return len(new)
+
+    @staticmethod
+    def _add(sums: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+        """Um groupby nas linhas novas, somado às somas existentes"""
+        home_reds = rows['HR'] if 'HR' in rows.columns else 0
+        away_reds = rows['AR'] if 'AR' in rows.columns else 0
+        home_cards = rows['HY'] + home_reds
+        away_cards = rows['AY'] + away_reds
+        delta = rows.assign(
+            key=_canonical_series(rows['Referee']),
+            games=1,
+            cards=home_cards + away_cards,
+            reds=home_reds + away_reds,
+            home_cards=home_cards,
+            away_cards=away_cards,
+            home_yellows=rows['HY'],
+            away_yellows=rows['AY']
+        ).groupby(['League', 'key'], sort=False).agg(
+            name=('Referee', 'last'), **{c: (c, 'sum') for c in SUM_COLUMNS}
+        )
+        delta = delta[delta.index.get_level_values('key') != '']
+
+        if sums.empty:
+            return delta
+        merged = sums[SUM_COLUMNS].add(delta[SUM_COLUMNS], fill_value=0)
+        merged['name'] = delta['name'].combine_first(sums['name'])
+        return merged
+
+    def leagues(self) -> List[str]:
+        """Ligas com dados de árbitro nos jogos"""
+        return list(self.sums.index.get_level_values('League').unique())
+
+    def stats(self) -> pd.DataFrame:
+        """Uma linha por árbitro (somando ligas): jogos, cartões/jogo, vermelhos e viés casa/fora"""
+        with self._lock:
+            sums = self.sums
+        if sums.empty:
+            return pd.DataFrame(columns=['name', 'league', 'games', 'cards_per_game', 'red_rate',
+                                         'home_cards_per_game', 'away_cards_per_game', 'away_bias',
+                                         'home_yellows_per_game', 'away_yellows_per_game'])
+
+        flat = sums.reset_index()
+        main_league = flat.sort_values('games').drop_duplicates('key', keep='last').set_index('key')['League']
+        per_ref = flat.groupby('key', sort=False).agg(name=('name', 'last'), **{c: (c, 'sum') for c in SUM_COLUMNS})
+        games = per_ref['games']
+        return pd.DataFrame({
+            'name': per_ref['name'],
+            'league': main_league.reindex(per_ref.index),
+            'games': games.astype(int),
+            'cards_per_game': per_ref['cards'] / games,
+            'red_rate': per_ref['reds'] / games,
+            'home_cards_per_game': per_ref['home_cards'] / games,
+            'away_cards_per_game': per_ref['away_cards'] / games,
+            # > 0: mostra mais cartões ao visitante
+            'away_bias': (per_ref['away_cards'] - per_ref['home_cards']) / games,
+            'home_yellows_per_game': per_ref['home_yellows'] / games,
+            'away_yellows_per_game': per_ref['away_yellows'] / games
+        })
+
+
+_shared_aggregator = RefereeAggregator()
+
+
+def shared_aggregator() -> RefereeAggregator:
+    """Agregador do processo: cada snapshot novo só acrescenta as linhas que chegaram"""
+    return _shared_aggregator
+
+
+def yellow_baselines(matches: pd.DataFrame) -> Dict[Optional[str], tuple]:
+    """Liga -> (amarelos/jogo do mandante, do visitante); chave None = todas as ligas"""
+    if matches.empty or not {'HY', 'AY'}.issubset(matches.columns):
+        return {}
+    means = {None: (float(matches['HY'].mean()), float(matches['AY'].mean()))}
+    if 'League' in matches.columns:
+        by_league = matches.groupby('League', sort=False)[['HY', 'AY']].mean()
+        means.update({league: (float(h), float(a)) for league, (h, a) in by_league.iterrows()})
+    return means
+
+
+def _set_factors(entry: Dict, baselines: Dict[Optional[str], tuple], manual: float = None):
+    """factor, home_factor e away_factor de uma entrada do índice (na definição só amarelos)"""
+    if manual is not None:
+        entry['factor'] = entry['home_factor'] = entry['away_factor'] = float(manual)
+        return
+    home_base, away_base = baselines.get(entry.pop('app_league', None)) or baselines.get(None) or (np.nan, np.nan)
+    home, away = entry['home_yellows_per_game'], entry['away_yellows_per_game']
+    if np.isnan([home, away, home_base, away_base]).any() or not home_base or not away_base:
+        entry['factor'] = entry['home_factor'] = entry['away_factor'] = entry['cards_per_game'] / REFEREE_BASELINE_CARDS
+        return
+    entry['home_factor'] = home / home_base
+    entry['away_factor'] = away / away_base
+    entry['factor'] = (home + away) / (home_base + away_base)
+
+
+# ==============================================================================
+# ÍNDICE
+# ==============================================================================
+
+class RefereeIndex:
+    """Consulta O(1) das estatísticas de um árbitro pelo nome (qualquer grafia)"""
+
+    def __init__(self, entries: Dict[str, Dict]):
+        self.entries = entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str) -> Optional[Dict]:
+        return self.entries.get(canonical_name(name)) if name else None
+
+    def names(self) -> List[str]:
+        return sorted(entry['name'] for entry in self.entries.values())
+
+    @classmethod
+    def build(cls, matches: pd.DataFrame, referees: pd.DataFrame = None,
+              factors: pd.DataFrame = None, aggregator: RefereeAggregator = None) -> 'RefereeIndex':
+        """aggregator: somas já mantidas entre snapshots (sem ele, agrega `matches` do zero)"""
+        if aggregator is None:
+            aggregator = RefereeAggregator()
+        aggregator.update(matches)
+        covered = set(aggregator.leagues())
+        entries: Dict[str, Dict] = {}
+
+        # 1) Arquivo manual, só para ligas sem coluna Referee nos jogos
+        if referees is not None and not referees.empty and 'Arbitro' in referees.columns:
+            static = referees.assign(_key=_canonical_series(referees['Arbitro']))
+            column = lambda name, default: static[name] if name in static.columns else pd.Series(default, index=static.index)
+            games = pd.to_numeric(column('Jogos_Apitados', 0), errors='coerce').fillna(0)
+            reds = pd.to_numeric(column('Cartoes_Vermelhos', 0), errors='coerce').fillna(0)
+            yellows = pd.to_numeric(column('Cartoes_Amarelos', np.nan), errors='coerce')
+            avgs = pd.to_numeric(column('Media_Cartoes_Por_Jogo', REFEREE_BASELINE_CARDS), errors='coerce')
+            for key, name, league, avg, n, red, yellow in zip(static['_key'], static['Arbitro'], column('Liga', ''),
+                                                              avgs.fillna(REFEREE_BASELINE_CARDS), games, reds, yellows):
+                if key and league_of(league) not in covered:
+                    # O arquivo não separa casa/fora: metade para cada lado
+                    ypg = float(yellow / n) / 2 if n and not np.isnan(yellow) else np.nan
+                    entries[key] = {
+                        'name': name, 'league': league, 'app_league': league_of(league), 'games': int(n),
+                        'cards_per_game': float(avg), 'red_rate': float(red / n) if n else 0.0,
+                        'home_cards_per_game': float(avg) / 2, 'away_cards_per_game': float(avg) / 2,
+                        'away_bias': 0.0, 'home_yellows_per_game': ypg, 'away_yellows_per_game': ypg,
+                        'source': 'arquivo'
+                    }
+
+        # 2) Estatísticas dos jogos (sobrepõem o arquivo manual)
+        stats = aggregator.stats()
+        for key, row in zip(stats.index, stats.itertuples(index=False)):
+            entries[key] = {
+                'name': entries.get(key, {}).get('name', row.name), 'league': row.league,
+                'games': int(row.games), 'cards_per_game': float(row.cards_per_game),
+                'red_rate': float(row.red_rate),
+                'home_cards_per_game': float(row.home_cards_per_game),
+                'away_cards_per_game': float(row.away_cards_per_game),
+                'away_bias': float(row.away_bias),
+                'home_yellows_per_game': float(row.home_yellows_per_game),
+                'away_yellows_per_game': float(row.away_yellows_per_game),
+                'app_league': row.league, 'source': 'jogos'
+            }
+
+        # 3) Fatores: manual quando existe (igual nos dois lados), senão amarelos / média da liga
+        manual = {}
+        if factors is not None and not factors.empty:
+            manual = dict(zip(_canonical_series(factors['Nome']), factors['Fator']))
+        baselines = yellow_baselines(matches)
+        for key, entry in entries.items():
+            _set_factors(entry, baselines, manual.get(key))
+
+        return cls(entries)
+
+    @classmethod
+    def load(cls, matches: pd.DataFrame, referees: pd.DataFrame = None,
+             search_paths: List[str] = SEARCH_PATHS) -> 'RefereeIndex':
+        """build() com o agregador do processo, lendo arbitros.csv (opcional) de search_paths"""
+        factors = None
+        path = find_file(REFEREE_FACTORS_FILE, search_paths)
+        if path:
+            try:
+                factors = pd.read_csv(path, encoding='utf-8')
+            except Exception:
+                factors = None
+        return cls.build(matches, referees, factors, aggregator=shared_aggregator())
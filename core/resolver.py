@@ -0,0 +1,65 @@
+"""
+Resolução de nomes de times digitados para os nomes canônicos dos CSVs
+"""
+
+import re
+import unicodedata
+from difflib import get_close_matches
+from typing import Iterable, Optional, Tuple
+
+# Apelidos digitados pelos usuários -> nomes usados nos CSVs (Football-Data)
+TEAM_ALIASES = {
+    'manchester united': 'Man United', 'man utd': 'Man United', 'manchester utd': 'Man United',
+    'manchester city': 'Man City', 'spurs': 'Tottenham', 'tottenham hotspur': 'Tottenham',
+    'wolverhampton': 'Wolves', 'nottingham forest': "Nott'm Forest", 'forest': "Nott'm Forest",
+    'newcastle united': 'Newcastle', 'west ham united': 'West Ham', 'brighton & hove albion': 'Brighton',
+    'psg': 'Paris SG', 'paris saint-germain': 'Paris SG',
+    'atletico madrid': 'Ath Madrid', 'atl. madrid': 'Ath Madrid', 'athletic club': 'Ath Bilbao',
+    'real betis': 'Betis', 'real sociedad': 'Sociedad', 'rayo vallecano': 'Vallecano', 'espanyol': 'Espanol',
+    'bayern': 'Bayern Munich', 'borussia dortmund': 'Dortmund', 'bayer leverkusen': 'Leverkusen',
+    'gladbach': "M'gladbach", 'eintracht frankfurt': 'Ein Frankfurt', 'frankfurt': 'Ein Frankfurt',
+    'leipzig': 'RB Leipzig', 'koln': 'FC Koln', 'bremen': 'Werder Bremen', 'hsv': 'Hamburg',
+    'inter milan': 'Inter', 'ac milan': 'Milan', 'as monaco': 'Monaco', 'olympique lyon': 'Lyon',
+    'olympique marseille': 'Marseille',
+}
+
+
+def _fold(text: str) -> str:
+    """Minúsculas sem acentos (Fenerbahçe -> fenerbahce)"""
+    text = unicodedata.normalize('NFKD', text.strip().lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+class TeamResolver:
+    """Resolve nomes digitados para os nomes canônicos dos CSVs"""
+
+    FIXTURE_SEPARATOR = re.compile(r'\s+(?:x|vs\.?|versus|contra)\s+|\s+-\s+')
+    COMMAND_WORDS = re.compile(r'^(?:analisa(?:r)?|analise|previsão|previsao|jogo)\s+')
+
+    def __init__(self, teams: Iterable[str]):
+        self.teams = sorted(set(teams))
+        self._by_folded = {_fold(t): t for t in self.teams}
+        self._aliases = {_fold(k): v for k, v in TEAM_ALIASES.items() if v in self._by_folded.values()}
+        self._memo = {}
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Nome canônico ou None (exato -> apelido -> fuzzy), memoizado"""
+        key = _fold(name)
+        if key not in self._memo:
+            team = self._by_folded.get(key) or self._aliases.get(key)
+            if team is None:
+                match = get_close_matches(key, list(self._by_folded), n=1, cutoff=0.6)
+                team = self._by_folded[match[0]] if match else None
+            self._memo[key] = team
+        return self._memo[key]
+
+    def resolve_fixture(self, user_query: str) -> Optional[Tuple[str, str]]:
+        """'arsenal vs chelsea' -> ('Arsenal', 'Chelsea'); None se não for um confronto"""
+        query = self.COMMAND_WORDS.sub('', _fold(user_query))
+        parts = self.FIXTURE_SEPARATOR.split(query, maxsplit=1)
+        if len(parts) != 2:
+            return None
+        home, away = self.resolve(parts[0]), self.resolve(parts[1])
+        if home and away and home != away:
+            return home, away
+        return None
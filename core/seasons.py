@@ -0,0 +1,250 @@
+"""
+Histórico de temporadas particionado por liga/temporada, com poda de partições
+
+Layout (mesmo código de liga e temporada das URLs do football-data.co.uk):
+
+    historico/
+        index.json          # partição -> liga, temporada, jogos, times, mtime
+        E0/2425.csv
+        E0/2324.csv
+        SP1/2425.csv
+        ...
+
+A temporada atual continua nos arquivos de LEAGUE_FILES; o histórico só guarda
+temporadas encerradas. O índice permite responder "últimas N temporadas do time X"
+lendo apenas as partições em que X jogou, sem montar um DataFrame com tudo.
+
+Uso:
+    store = SeasonStore.open()                      # procura historico/ em SEARCH_PATHS
+    store.team_history('Arsenal', last_n=2)         # lê só E0/2425.csv e E0/2324.csv
+    store.load(leagues=['La Liga'], seasons=['2425'])
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from core.config import CURRENT_SEASON, HISTORY_DIR, HISTORY_SEASONS, LEAGUE_CODES, SEARCH_PATHS
+from core.data_loader import DataEngineSupreme
+from core.metrics import timed
+
+INDEX_FILE = "index.json"
+
+_CODE_TO_LEAGUE = {code: league for league, code in LEAGUE_CODES.items()}
+
+
+# ==============================================================================
+# TEMPORADAS
+# ==============================================================================
+
+def season_code(start_year: int) -> str:
+    """2025 -> '2526' (formato das URLs /mmz4281/<temporada>/)"""
+    return f"{start_year % 100:02d}{(start_year + 1) % 100:02d}"
+
+
+def season_start(code: str) -> int:
+    """'2526' -> 2025 ('9900' -> 1999)"""
+    yy = int(code[:2])
+    return (1900 if yy >= 90 else 2000) + yy
+
+
+def previous_seasons(n: int, current: str = CURRENT_SEASON) -> List[str]:
+    """As n temporadas anteriores a `current`, da mais recente para a mais antiga"""
+    start = season_start(current)
+    return [season_code(start - i) for i in range(1, n + 1)]
+
+
+def partition_path(root: str, league_code: str, season: str) -> str:
+    return os.path.join(root, league_code, f"{season}.csv")
+
+
+def _read_csv(filepath: str, **kwargs) -> pd.DataFrame:
+    try:
+        return pd.read_csv(filepath, encoding='utf-8', **kwargs)
+    except UnicodeDecodeError:
+        return pd.read_csv(filepath, encoding='latin1', **kwargs)
+
+
+def _partition_entry(filepath: str, league_code: str, season: str) -> Dict:
+    """Metadados de uma partição para o índice (só lê as colunas de times)"""
+    teams = _read_csv(filepath, usecols=lambda c: c in ('HomeTeam', 'AwayTeam'))
+    names = set()
+    for col in ('HomeTeam', 'AwayTeam'):
+        if col in teams.columns:
+            names.update(teams[col].dropna().astype(str))
+    return {
+        'league': _CODE_TO_LEAGUE.get(league_code, league_code),
+        'code': league_code,
+        'season': season,
+        'rows': len(teams),
+        'teams': sorted(names),
+        'mtime_ns': os.stat(filepath).st_mtime_ns
+    }
+
+
+def write_partition(root: str, league_code: str, season: str, content: bytes) -> str:
+    """Grava o CSV bruto de uma liga/temporada na partição e atualiza o índice"""
+    filepath = partition_path(root, league_code, season)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'wb') as f:
+        f.write(content)
+
+    index = _read_index(root)
+    index[f"{league_code}/{season}"] = _partition_entry(filepath, league_code, season)
+    _write_index(root, index)
+    return filepath
+
+
+def _read_index(root: str) -> Dict[str, Dict]:
+    try:
+        with open(os.path.join(root, INDEX_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(root: str, index: Dict[str, Dict]):
+    tmp = os.path.join(root, INDEX_FILE + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(index.items())), f, indent=1, ensure_ascii=False)
+    os.replace(tmp, os.path.join(root, INDEX_FILE))
+
+
+# ==============================================================================
+# SEASON STORE
+# ==============================================================================
+
+class SeasonStore:
+    """Leitura podada do histórico: índice em memória + cache LRU de partições"""
+
+    def __init__(self, root: str, cache_size: int = 32):
+        self.root = root
+        self.cache_size = cache_size
+        self.partitions_read = 0  # leituras de CSV (para conferir a poda)
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.index = self._load_index()
+        self._by_team = self._team_index()
+
+    @classmethod
+    def open(cls, search_paths: List[str] = SEARCH_PATHS, **kwargs) -> Optional['SeasonStore']:
+        """Store da primeira pasta historico/ encontrada, ou None (histórico é opcional)"""
+        for base_path in search_paths:
+            root = os.path.join(base_path, HISTORY_DIR)
+            if os.path.isdir(root):
+                return cls(root, **kwargs)
+        return None
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """index.json, refeito para as partições novas/alteradas desde a última gravação"""
+        index = _read_index(self.root)
+        on_disk = {}
+        for code in sorted(os.listdir(self.root)):
+            league_dir = os.path.join(self.root, code)
+            if not os.path.isdir(league_dir):
+                continue
+            for filename in os.listdir(league_dir):
+                if filename.endswith('.csv'):
+                    on_disk[f"{code}/{filename[:-4]}"] = os.path.join(league_dir, filename)
+
+        stale = [key for key, path in on_disk.items()
+                 if key not in index or index[key]['mtime_ns'] != os.stat(path).st_mtime_ns]
+        removed = [key for key in index if key not in on_disk]
+
+        if stale or removed:
+            for key in removed:
+                del index[key]
+            for key in stale:
+                code, season = key.split('/')
+                index[key] = _partition_entry(on_disk[key], code, season)
+            try:
+                _write_index(self.root, index)
+            except OSError:
+                pass  # pasta só leitura: o índice fica só em memória
+        return index
+
+    def _team_index(self) -> Dict[str, List[str]]:
+        """Time -> partições em que jogou"""
+        by_team: Dict[str, List[str]] = {}
+        for key, entry in self.index.items():
+            for team in entry['teams']:
+                by_team.setdefault(team, []).append(key)
+        return by_team
+
+    def seasons(self) -> List[str]:
+        """Temporadas disponíveis, da mais recente para a mais antiga"""
+        return sorted({e['season'] for e in self.index.values()}, key=season_start, reverse=True)
+
+    def partitions(self, leagues: List[str] = None, seasons: List[str] = None, team: str = None) -> List[str]:
+        """Chaves 'código/temporada' que podem conter os jogos pedidos (poda só pelo índice)"""
+        keys = self._by_team.get(team, []) if team is not None else self.index.keys()
+        codes = None if leagues is None else {LEAGUE_CODES.get(l, l) for l in leagues}
+        wanted = None if seasons is None else set(seasons)
+        selected = [
+            key for key in keys
+            if (codes is None or self.index[key]['code'] in codes)
+            and (wanted is None or self.index[key]['season'] in wanted)
+        ]
+        # Mais antiga primeiro: a ordem cronológica que as janelas [-10:] esperam
+        return sorted(selected, key=lambda k: (season_start(self.index[k]['season']), k))
+
+    def read_partition(self, key: str) -> pd.DataFrame:
+        """Partição normalizada como os CSVs da temporada atual (+ League e Season)"""
+        entry = self.index[key]
+        filepath = partition_path(self.root, entry['code'], entry['season'])
+        cache_key = (key, entry['mtime_ns'])
+
+        with self._lock:
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                return self._cache[cache_key]
+
+        df = DataEngineSupreme.normalize_columns(_read_csv(filepath)).copy()  # .copy() desfragmenta
+        df = df.assign(
+            League=entry['league'],
+            Season=entry['season'],
+            Total_Corners=df['HC'] + df['AC'],
+            Total_Cards=df['HY'] + df['AY'],
+            Total_Goals=df['FTHG'] + df['FTAG'],
+            Total_Fouls=df['HF'] + df['AF']
+        )
+
+        with self._lock:
+            self.partitions_read += 1
+            self._cache[cache_key] = df
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return df
+
+    @timed('history_load')
+    def load(self, leagues: List[str] = None, seasons: List[str] = None, teams: List[str] = None) -> pd.DataFrame:
+        """Jogos das partições selecionadas; com `teams`, só os jogos desses times"""
+        if teams is None:
+            keys = self.partitions(leagues, seasons)
+        else:
+            keys = sorted({k for t in teams for k in self.partitions(leagues, seasons, team=t)},
+                          key=lambda k: (season_start(self.index[k]['season']), k))
+        if not keys:
+            return pd.DataFrame()
+
+        frames = [self.read_partition(k) for k in keys]
+        if teams is not None:
+            frames = [f[f['HomeTeam'].isin(teams) | f['AwayTeam'].isin(teams)] for f in frames]
+        return pd.concat(frames, ignore_index=True)
+
+    def team_history(self, team: str, last_n: int, before: str = CURRENT_SEASON) -> pd.DataFrame:
+        """Jogos do time nas last_n temporadas anteriores a `before` (mais antigos primeiro)"""
+        if last_n <= 0:
+            return pd.DataFrame()
+        return self.load(seasons=previous_seasons(last_n, before), teams=[team])
+
+
+def open_history(search_paths: List[str] = SEARCH_PATHS) -> Optional[SeasonStore]:
+    """Store para os preditores do app/serviço: None com HISTORY_SEASONS = 0 ou sem historico/"""
+    if HISTORY_SEASONS <= 0:
+        return None
+    return SeasonStore.open(search_paths)
@@ -0,0 +1,144 @@
+"""
+Line shopping: melhor preço por seleção, margem das casas, probabilidade justa e arbitragem
+
+Um evento (1X2, gols O/U 2.5, handicap asiático, "Escanteios Totais O/U 9.5" das
+cotações largadas em odds/) é um grupo de seleções que somam 100%. Para cada jogo e
+grupo, numa passada sobre o OddsStore (as seleções de handicap levam a linha de
+abertura do jogo no nome, ex.: "AH Casa -0.5"):
+
+    overround   soma de 1/odd das seleções (1.05 = margem de 5% da casa)
+    prob. justa 1/odd dividida pelo overround (sem a margem); consenso = média das
+                casas com o grupo completo, ou a casa de referência (ex.: Pinnacle)
+    melhor odd  maior preço de cada seleção entre as casas reais (bolsas já sem a comissão)
+    arbitragem  soma de 1/melhor odd < 1: apostar em todas as seleções, cada uma na
+                melhor casa, lucra em qualquer resultado
+
+Uso:
+    shop(store, [('Arsenal', 'Chelsea', '20/12/2025')])
+    shop(store, fixtures, reference='Pinnacle')
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import EXCHANGE_COMMISSION
+from core.metrics import timed
+from core.odds import AH_MARKETS, OddsStore, ah_market
+
+# Grupos fixos dos CSVs; os de acima/abaixo são montados a partir dos nomes dos mercados
+CSV_GROUPS = [
+    ('1X2', ['1X2 Casa', '1X2 Empate', '1X2 Fora']),
+    ('Handicap asiático', ['AH Casa', 'AH Fora']),
+]
+
+SHOP_COLUMNS = ['Jogo', 'Data', 'Evento', 'Seleção', 'Melhor odd', 'Casa', 'Prob. justa (%)',
+                'Valor (%)', 'Margem média (%)', 'Overround melhor (%)', 'Arbitragem', 'Stake arb. (%)']
+
+
+def market_groups(markets: Sequence[str]) -> List[Tuple[str, List[str]]]:
+    """(evento, seleções) com todas as seleções presentes em `markets`"""
+    available = set(markets)
+    groups = [(name, selections) for name, selections in CSV_GROUPS if available.issuperset(selections)]
+    for market in markets:
+        if ' Over ' in market:
+            under = market.replace(' Over ', ' Under ', 1)
+            if under in available:
+                groups.append((market.replace(' Over ', ' O/U ', 1), [market, under]))
+    return groups
+
+
+def _group_prices(store: OddsStore, rows: np.ndarray, cols: List[int], reference: int = None) -> Tuple:
+    """Melhor odd, casa da melhor odd, prob. justa e margens de um grupo em todos os jogos
+
+    Devolve arrays (jogos x seleções) e (jogos): best, best_book, fair, avg_margin, best_overround
+    """
+    real = np.flatnonzero(store.real_mask)
+    block = store.odds[np.ix_(rows, real, cols)].astype(float).round(2)  # jogos x casas x seleções
+    commission = np.array([EXCHANGE_COMMISSION.get(store.bookmakers[b], 0.0) for b in real])
+    block = 1 + (block - 1) * (1 - commission[None, :, None])       # odd líquida nas bolsas
+    complete = ~np.isnan(block).any(axis=2)                          # casa cotou todas as seleções
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        implied = 1 / block
+        overround = np.where(complete, implied.sum(axis=2), np.nan)  # jogos x casas
+        normalized = implied / overround[:, :, None]
+
+        n_complete = complete.sum(axis=1)
+        fair = np.where(complete[:, :, None], normalized, 0).sum(axis=1) / n_complete[:, None]
+        avg_margin = np.where(complete, overround, 0).sum(axis=1) / n_complete - 1
+        if reference is not None and reference in real:
+            r = int(np.flatnonzero(real == reference)[0])
+            fair = np.where(complete[:, r, None], normalized[:, r, :], fair)
+
+        best = np.fmax.reduce(block, axis=1) if len(real) else np.full((len(rows), len(cols)), np.nan)
+        best_book = real[np.where(np.isnan(block), -np.inf, block).argmax(axis=1)] if len(real) else None
+        best_overround = (1 / best).sum(axis=1)                      # NaN se faltar alguma seleção
+    return best, best_book, fair, avg_margin, best_overround
+
+
+@timed('line_shopping')
+def shop(store: OddsStore, fixtures: Sequence[Tuple[str, str, str]], reference: str = None) -> pd.DataFrame:
+    """Uma linha por (jogo, evento, seleção) com cotação; fixtures: (mandante, visitante, data)"""
+    if store is None or not len(store) or not len(fixtures):
+        return pd.DataFrame(columns=SHOP_COLUMNS)
+
+    matched = [store.row(home, away, date) for home, away, date in fixtures]
+    found = np.array([r is not None for r in matched], dtype=bool)
+    rows = np.array([r for r in matched if r is not None], dtype=np.intp)
+    if not len(rows):
+        return pd.DataFrame(columns=SHOP_COLUMNS)
+    games = [f"{home} x {away}" for (home, away, _), ok in zip(fixtures, found) if ok]
+    dates = [date for (_, _, date), ok in zip(fixtures, found) if ok]
+    ref_index = store.book_index.get(reference) if reference else None
+
+    frames = []
+    for event, selections in market_groups(store.markets):
+        cols = [store.market_index[s] for s in selections]
+        best, best_book, fair, avg_margin, best_overround = _group_prices(store, rows, cols, ref_index)
+        quoted = ~np.isnan(best).all(axis=1)
+        k = len(selections)
+        events, names = event, np.tile(selections, len(rows))
+        if selections == list(AH_MARKETS):
+            # A odd do handicap só vale na linha de abertura do jogo (AHh): sem ela, fica de fora
+            lines = store.ah_lines[rows, 0]
+            quoted &= ~np.isnan(lines)
+            events = np.repeat([f"{event} {line + 0.0:+g}" for line in lines], k)
+            names = [ah_market(s, line) for line in lines for s in selections]
+        if not quoted.any():
+            continue
+
+        arbitrage = best_overround < 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stakes = np.where(arbitrage[:, None], (1 / best) / best_overround[:, None] * 100, np.nan)
+        frames.append(pd.DataFrame({
+            'Jogo': np.repeat(games, k),
+            'Data': np.repeat(dates, k),
+            'Evento': events,
+            'Seleção': names,
+            'Melhor odd': best.ravel(),
+            'Casa': [store.bookmakers[b] for b in best_book.ravel()],
+            'Prob. justa (%)': fair.ravel() * 100,
+            'Valor (%)': (best * fair - 1).ravel() * 100,
+            'Margem média (%)': np.repeat(avg_margin * 100, k),
+            'Overround melhor (%)': np.repeat(best_overround * 100, k),
+            'Arbitragem': np.repeat(arbitrage, k),
+            'Stake arb. (%)': stakes.ravel()
+        })[np.repeat(quoted, k) & ~np.isnan(best.ravel())])
+
+    if not frames:
+        return pd.DataFrame(columns=SHOP_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def arbitrages(shopping: pd.DataFrame) -> pd.DataFrame:
+    """Um evento com arbitragem por linha: lucro garantido e a casa/stake de cada seleção"""
+    arb = shopping[shopping['Arbitragem']]
+    if arb.empty:
+        return pd.DataFrame(columns=['Jogo', 'Data', 'Evento', 'Lucro (%)', 'Apostas'])
+    return arb.groupby(['Jogo', 'Data', 'Evento'], sort=False).apply(lambda g: pd.Series({
+        'Lucro (%)': 100 / g['Overround melhor (%)'].iloc[0] * 100 - 100,
+        'Apostas': ' | '.join(f"{s} @ {o:.2f} ({c}, {p:.0f}%)" for s, o, c, p in
+                              zip(g['Seleção'], g['Melhor odd'], g['Casa'], g['Stake arb. (%)']))
+    }), include_groups=False).reset_index().sort_values('Lucro (%)', ascending=False, ignore_index=True)
@@ -0,0 +1,135 @@
+"""
+Varredura de parâmetros do modelo sobre o backtest walk-forward
+
+Os candidatos (grade completa ou amostra aleatória de SEARCH_SPACE) são avaliados
+num pool de processos. O estado "antes do jogo" (core.backtest.prepare) é montado
+uma vez no processo principal e enviado uma vez a cada processo pelo initializer;
+cada candidato só roda evaluate() - projeções, linhas e linha recomendada.
+
+O leaderboard traz acerto, ROI a odd fixa, brier e erro de calibração (ECE) no
+trecho de treino e o ROI no trecho final da temporada (teste), que não entra na
+ordenação: um ROI de treino muito acima do de teste é sinal de sobreajuste.
+
+Uso:
+    features = prepare(matches, max_window=max(SEARCH_SPACE['window']))
+    board = run_sweep(features, random_candidates(200), workers=4)
+"""
+
+import itertools
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.backtest import BacktestFeatures, BacktestParams, evaluate
+from core.config import BASE_ODD
+from core.metrics import timed
+
+# Valores testados por parâmetro (o padrão atual de cada um está incluído)
+SEARCH_SPACE: Dict[str, List] = {
+    'corners_home_factor': [1.00, 1.05, 1.10, 1.15, 1.20],
+    'corners_away_factor': [0.80, 0.85, 0.90, 0.95, 1.00],
+    'recent_weight': [0.0, 0.2, 0.4, 0.6, 0.8],
+    'window': [5, 8, 10, 15, 20],
+    'band': [(55, 70), (60, 75), (65, 80), (70, 85)],
+    # Limiares do motor legado V31 (inf = desligado)
+    'pressure': [(np.inf, np.inf), (6.0, 4.5), (5.0, 4.0), (7.0, 5.0)],
+    'violence_high': [np.inf, 11.5, 12.5, 13.5],
+}
+
+TEST_FRACTION = 0.3  # trecho final da temporada fora da ordenação
+
+
+def _params(candidate: Dict) -> BacktestParams:
+    """Candidato da SEARCH_SPACE (com pares band/pressure) -> BacktestParams"""
+    values = dict(candidate)
+    if 'band' in values:
+        values['band_low'], values['band_high'] = values.pop('band')
+    if 'pressure' in values:
+        values['pressure_high'], values['pressure_med'] = values.pop('pressure')
+    return replace(BacktestParams(), **values)
+
+
+def grid_candidates(space: Dict[str, List] = SEARCH_SPACE) -> List[Dict]:
+    """Produto cartesiano completo (cuidado: cresce rápido)"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_candidates(n: int, space: Dict[str, List] = SEARCH_SPACE, seed: int = 0) -> List[Dict]:
+    """n candidatos distintos sorteados da grade; o primeiro é sempre o modelo atual"""
+    rng = random.Random(seed)
+    defaults = asdict(BacktestParams())
+    current = {name: _current_value(name, values, defaults) for name, values in space.items()}
+    seen, candidates = set(), []
+    total = int(np.prod([len(v) for v in space.values()]))
+    for candidate in itertools.chain([current], (
+            {name: rng.choice(values) for name, values in space.items()} for _ in itertools.count())):
+        key = tuple(repr(candidate[name]) for name in space)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(candidate)
+        if len(candidates) >= min(n, total):
+            return candidates
+
+
+def _current_value(name: str, values: List, defaults: Dict):
+    if name == 'band':
+        return (defaults['band_low'], defaults['band_high'])
+    if name == 'pressure':
+        return (defaults['pressure_high'], defaults['pressure_med'])
+    return defaults.get(name, values[0])
+
+
+# ==============================================================================
+# AVALIAÇÃO (processos do pool)
+# ==============================================================================
+
+_features: Optional[BacktestFeatures] = None
+_split: Optional[np.ndarray] = None
+
+
+def _init_worker(features: BacktestFeatures, split: np.ndarray):
+    global _features, _split
+    _features, _split = features, split
+
+
+def _score(candidates: List[Dict], odd: float, min_conf: int) -> List[Dict]:
+    rows = []
+    for candidate in candidates:
+        result = evaluate(_features, _params(candidate))
+        train = result.subset(~_split).summary(odd, min_conf)
+        test = result.subset(_split).summary(odd, min_conf)
+        rows.append({**candidate, **train, 'roi_teste': test['roi'], 'apostas_teste': test['apostas']})
+    return rows
+
+
+@timed('parameter_sweep')
+def run_sweep(features: BacktestFeatures, candidates: List[Dict], workers: int = None,
+              odd: float = BASE_ODD, min_conf: int = 0, sort_by: str = 'roi',
+              test_fraction: float = TEST_FRACTION) -> pd.DataFrame:
+    """Leaderboard dos candidatos, do melhor para o pior em `sort_by` (ece/brier: menor é melhor)"""
+    split = np.arange(len(features.games)) >= int(len(features.games) * (1 - test_fraction))
+    workers = min(workers or os.cpu_count() or 1, len(candidates))
+
+    if workers <= 1:
+        _init_worker(features, split)
+        rows = _score(candidates, odd, min_conf)
+    else:
+        # Lotes: cada tarefa leva vários candidatos (o estado já está no processo)
+        size = max(1, len(candidates) // (workers * 4))
+        batches = [candidates[i:i + size] for i in range(0, len(candidates), size)]
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(features, split)) as pool:
+            rows = [row for batch in pool.map(_score, batches, itertools.repeat(odd), itertools.repeat(min_conf))
+                    for row in batch]
+
+    board = pd.DataFrame(rows)
+    ascending = sort_by in ('ece', 'brier')
+    return board.sort_values(sort_by, ascending=ascending, na_position='last').reset_index(drop=True)
@@ -0,0 +1,141 @@
+"""
+Renderização do bilhete em PNG (Construtor do app, bot e benchmarks)
+"""
+
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List
+
+from core.metrics import timed
+from core.predict import MathEngineSupreme
+
+
+@timed('create_ticket_image')
+def render_ticket(bilhete: List[Dict], odd_combinada: float, theme: str = 'light', banca: float = 1000.0) -> BytesIO:
+    """Cria imagem PNG PROFISSIONAL do bilhete"""
+    from PIL import Image, ImageDraw
+
+    # Configurações PRO
+    width = 800
+    n_selections = len(bilhete)
+    header_height = 120
+    selection_height = 100
+    stats_height = 180
+    footer_height = 60
+
+    height = header_height + (n_selections * selection_height) + stats_height + footer_height
+
+    # Cores profissionais baseadas no tema
+    if theme == 'light':
+        bg_color = (248, 250, 252)  # #F8FAFC
+        card_color = (255, 255, 255)
+        text_color = (30, 41, 59)    # #1E293B
+        accent_color = (59, 130, 246) # #3B82F6
+        border_color = (226, 232, 240)
+    else:
+        bg_color = (15, 23, 42)      # #0f172a
+        card_color = (30, 41, 59)    # #1e293b
+        text_color = (241, 245, 249) # #f1f5f9
+        accent_color = (59, 130, 246)
+        border_color = (71, 85, 105)
+
+    # Criar imagem
+    img = Image.new('RGB', (width, height), bg_color)
+    draw = ImageDraw.Draw(img)
+
+    # === HEADER ===
+    y = 20
+
+    # Logo/Título
+    draw.text((width//2, y), "⚽", fill=accent_color, anchor="mm", font=None)
+    y += 30
+    draw.text((width//2, y), "FUTPREVISÃO V36.3 PRO", fill=accent_color, anchor="mm", font=None)
+    y += 25
+    draw.text((width//2, y), "Bilhete Premium", fill=text_color, anchor="mm", font=None)
+    y += 30
+
+    # Linha divisória
+    draw.line([(40, y), (width-40, y)], fill=accent_color, width=3)
+    y += 30
+
+    # === SELEÇÕES ===
+    for i, sel in enumerate(bilhete):
+        # Card da seleção
+        card_y = y
+        card_height = 90
+
+        # Fundo do card
+        draw.rectangle(
+            [(50, card_y), (width-50, card_y + card_height)],
+            fill=card_color,
+            outline=border_color,
+            width=2
+        )
+
+        # Número da seleção
+        draw.text((70, card_y + 15), f"🎯 SELEÇÃO #{i+1}", fill=accent_color, font=None)
+
+        # Jogo
+        draw.text((70, card_y + 35), sel['jogo'], fill=text_color, font=None)
+
+        # Mercado
+        draw.text((70, card_y + 55), f"💎 {sel['mercado']}", fill=text_color, font=None)
+
+        # Odd e Prob
+        draw.text((70, card_y + 75),
+                 f"📊 Odd: {sel['odd']:.2f} | Prob: {sel.get('prob', 0):.0f}%",
+                 fill=text_color, font=None)
+
+        y += card_height + 15
+
+    # Linha divisória
+    draw.line([(40, y), (width-40, y)], fill=accent_color, width=3)
+    y += 30
+
+    # === ESTATÍSTICAS ===
+    draw.text((width//2, y), "📊 ESTATÍSTICAS DO BILHETE", fill=accent_color, anchor="mm", font=None)
+    y += 30
+
+    # Calcular estatísticas
+    prob_combinada = 1.0
+    for sel in bilhete:
+        prob_combinada *= sel.get('prob', 70) / 100
+
+    avg_confidence = sum(sel.get('confidence', 75) for sel in bilhete) / len(bilhete)
+
+    # Stake Kelly (exemplo)
+    stake_kelly = MathEngineSupreme.kelly_criterion(prob_combinada, odd_combinada, banca)
+
+    # EV
+    ev = MathEngineSupreme.expected_value(prob_combinada, odd_combinada) * 100
+
+    # Mostrar stats
+    stats_x = 70
+    draw.text((stats_x, y), f"💰 Odd Combinada: {odd_combinada:.2f}x", fill=text_color, font=None)
+    y += 25
+    draw.text((stats_x, y), f"💵 Stake Kelly: R$ {stake_kelly:.2f}", fill=text_color, font=None)
+    y += 25
+    draw.text((stats_x, y), f"📈 EV Total: {ev:+.1f}%", fill=text_color, font=None)
+    y += 25
+    draw.text((stats_x, y), f"🎯 Confiança Média: {avg_confidence:.1f}/100", fill=text_color, font=None)
+    y += 25
+    draw.text((stats_x, y), f"🎲 Prob. Combinada: {prob_combinada*100:.1f}%", fill=text_color, font=None)
+    y += 35
+
+    # Linha divisória
+    draw.line([(40, y), (width-40, y)], fill=accent_color, width=3)
+    y += 20
+
+    # === FOOTER ===
+    timestamp = datetime.now().strftime("%d/%m/%Y • %H:%M")
+    backup_id = f"FP{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+    draw.text((width//2, y), f"📅 {timestamp}", fill=text_color, anchor="mm", font=None)
+    y += 20
+    draw.text((width//2, y), f"💾 ID: {backup_id}", fill=text_color, anchor="mm", font=None)
+
+    # Converter para bytes
+    buf = BytesIO()
+    img.save(buf, format='PNG', quality=95)
+    buf.seek(0)
+    return buf
@@ -0,0 +1,169 @@
+"""
+Validação declarativa dos jogos: todas as regras numa única passada por liga
+
+As regras são dados (coluna, limite, mensagem), não código: a matriz das colunas
+envolvidas é extraída uma vez e comparada com os vetores de limites de todas as
+regras de uma vez. O resultado traz, por regra, as posições das linhas que violam
+(posição dentro do arquivo da liga; linha do CSV = posição + 2).
+
+Relatórios ficam em cache pelo hash do conteúdo do arquivo: um CSV que não mudou
+não é revalidado (nem na carga, nem nos testes de saúde do painel).
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import timed
+
+REQUIRED_COLUMNS = ['HomeTeam', 'AwayTeam', 'HC', 'AC', 'HY', 'AY']
+MIN_ROWS = 10
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Faixa válida [low, high] para um grupo de colunas"""
+    name: str
+    columns: Tuple[str, ...]
+    message: str
+    low: float = -np.inf
+    high: float = np.inf
+
+
+RULES: List[Rule] = [
+    Rule('escanteios_negativos', ('HC', 'AC'), "Escanteios negativos detectados", low=0),
+    Rule('escanteios_impossiveis', ('HC', 'AC'), "Escanteios impossíveis (>25) detectados", high=25),
+    Rule('cartoes_negativos', ('HY', 'AY'), "Cartões negativos detectados", low=0),
+]
+
+
+@dataclass
+class ValidationReport:
+    rows: int
+    missing_columns: List[str] = field(default_factory=list)
+    violations: Dict[str, np.ndarray] = field(default_factory=dict)  # regra -> posições das linhas
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def counts(self) -> Dict[str, int]:
+        return {name: len(rows) for name, rows in self.violations.items()}
+
+
+# ==============================================================================
+# VALIDAÇÃO
+# ==============================================================================
+
+def _rule_plan(rules: List[Rule]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Colunas distintas + um par (coluna, limites) por coluna de cada regra"""
+    columns = list(dict.fromkeys(c for rule in rules for c in rule.columns))
+    pair_col = np.array([columns.index(c) for rule in rules for c in rule.columns], dtype=np.intp)
+    low = np.array([rule.low for rule in rules for _ in rule.columns], dtype=float)
+    high = np.array([rule.high for rule in rules for _ in rule.columns], dtype=float)
+    starts = np.cumsum([0] + [len(rule.columns) for rule in rules[:-1]])
+    return columns, pair_col, low, high, starts
+
+
+@timed('validate')
+def validate(df: pd.DataFrame, rules: List[Rule] = RULES, min_rows: int = MIN_ROWS) -> ValidationReport:
+    """Avalia todas as regras numa passada; errors mantém a ordem de RULES"""
+    report = ValidationReport(rows=len(df))
+
+    # Verificar colunas essenciais
+    report.missing_columns = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if report.missing_columns:
+        report.errors.append(f"Colunas ausentes: {report.missing_columns}")
+        return report
+
+    columns, pair_col, low, high, starts = _rule_plan(rules)
+    values = df[columns].to_numpy(dtype=float)[:, pair_col]  # linhas x (regra, coluna)
+    bad = (values < low) | (values > high)                    # NaN nunca viola
+    per_rule = np.logical_or.reduceat(bad, starts, axis=1) if len(df) else np.zeros((0, len(rules)), bool)
+
+    for i, rule in enumerate(rules):
+        rows = np.flatnonzero(per_rule[:, i])
+        if len(rows):
+            report.violations[rule.name] = rows
+            report.errors.append(rule.message)
+
+    # Verificar se tem dados suficientes
+    if len(df) < min_rows:
+        report.errors.append(f"Amostra muito pequena ({len(df)} jogos)")
+
+    return report
+
+
+# ==============================================================================
+# CACHE POR HASH DE ARQUIVO
+# ==============================================================================
+
+_CACHE_SIZE = 256
+_reports: OrderedDict = OrderedDict()
+_hashes: Dict[Tuple[str, int, int], str] = {}
+_lock = threading.Lock()
+
+
+def file_hash(filepath: str) -> str:
+    """sha1 do conteúdo; memorizado por (caminho, mtime, tamanho) para não reler o arquivo"""
+    stat = os.stat(filepath)
+    key = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+    digest = _hashes.get(key)
+    if digest is None:
+        with open(filepath, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        _hashes[key] = digest
+    return digest
+
+
+def cached_report(digest: str) -> Optional[ValidationReport]:
+    with _lock:
+        report = _reports.get(digest)
+        if report is not None:
+            _reports.move_to_end(digest)
+        return report
+
+
+def remember_report(digest: str, report: ValidationReport):
+    """Guarda um relatório (ex.: vindo de um processo do pool de carga)"""
+    with _lock:
+        _reports[digest] = report
+        _reports.move_to_end(digest)
+        while len(_reports) > _CACHE_SIZE:
+            _reports.popitem(last=False)
+
+
+def validate_cached(df: pd.DataFrame, digest: str) -> ValidationReport:
+    """validate(), reaproveitando o relatório de um arquivo com o mesmo conteúdo"""
+    report = cached_report(digest)
+    if report is None:
+        report = validate(df)
+        remember_report(digest, report)
+    return report
+
+
+def validate_leagues(df: pd.DataFrame, league_files: Dict[str, str]) -> Dict[str, ValidationReport]:
+    """Relatório por liga do DataFrame já carregado; só revalida ligas cujo arquivo mudou
+
+    league_files: liga -> caminho do CSV de origem (ligas sem arquivo são validadas sem cache)
+    """
+    digests = {league: file_hash(path) for league, path in league_files.items() if path and os.path.exists(path)}
+    reports = {league: cached_report(digest) for league, digest in digests.items()}
+
+    # Tudo em cache: nenhuma passada no DataFrame
+    pending = [league for league in league_files if reports.get(league) is None]
+    if pending:
+        groups = df.groupby('League', sort=False).indices
+        for league in pending:
+            if league in groups:
+                part = df.iloc[groups[league]]
+                reports[league] = validate_cached(part, digests[league]) if league in digests else validate(part)
+
+    return {league: report for league, report in reports.items() if report is not None}
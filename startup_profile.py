@@ -0,0 +1,104 @@
+"""
+⏱️ PERFIL DE INICIALIZAÇÃO - FutPrevisão
+Mede o custo de importação dos módulos pesados e o tempo de execução do app.py
+(primeira execução a frio e reruns) sem abrir navegador.
+
+Uso:
+    python startup_profile.py
+    python startup_profile.py --reruns 5 --json perfil.json
+
+Cada import é medido num subprocesso novo, para não herdar módulos já carregados.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+HEAVY_MODULES = [
+    'streamlit',
+    'pandas',
+    'numpy',
+    'plotly.express',
+    'plotly.graph_objects',
+    'scipy.stats',
+    'PIL.Image',
+    'core.predict',
+    'core.oraculo',
+]
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def import_cost(module: str) -> float:
+    """Segundos para importar o módulo num interpretador limpo"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True, text=True, cwd=os.path.dirname(APP_FILE)
+    )
+    if result.returncode != 0:
+        return float('nan')
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def app_runs(reruns: int) -> Dict:
+    """Tempo da primeira execução (dados + motores a frio) e dos reruns seguintes"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_FILE, default_timeout=120)
+    at.session_state['tutorial_completed'] = True
+
+    t0 = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t0
+
+    warm = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - t0)
+
+    return {
+        'cold_s': round(cold, 3),
+        'rerun_s': [round(w, 3) for w in warm],
+        'rerun_avg_s': round(sum(warm) / len(warm), 3) if warm else 0.0,
+        'errors': [str(e.value) for e in at.exception]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de inicialização do app")
+    parser.add_argument('--reruns', type=int, default=3, help="Reruns medidos após a execução a frio")
+    parser.add_argument('--skip-app', action='store_true', help="Mede só os imports")
+    parser.add_argument('--json', help="Salva o resultado em JSON (comparação entre versões)")
+    args = parser.parse_args()
+
+    result = {'imports_s': {}}
+
+    print("📦 Custo de importação (interpretador limpo)")
+    for module in HEAVY_MODULES:
+        cost = import_cost(module)
+        result['imports_s'][module] = round(cost, 3)
+        print(f"   {module:<22s} {cost * 1000:8.1f}ms")
+
+    if not args.skip_app:
+        print("\n🚀 Execução do app.py (AppTest)")
+        runs = app_runs(args.reruns)
+        result['app'] = runs
+        print(f"   Primeira execução     {runs['cold_s'] * 1000:8.1f}ms")
+        print(f"   Rerun (média de {len(runs['rerun_s'])})   {runs['rerun_avg_s'] * 1000:8.1f}ms")
+        if runs['errors']:
+            print(f"   ❌ Exceções: {runs['errors']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n📄 Resultado salvo: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
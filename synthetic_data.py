@@ -0,0 +1,410 @@
+"""
+🧪 GERADOR DE DADOS SINTÉTICOS - FutPrevisão
+CSVs no formato football-data.co.uk (mesmas colunas de Premier_League_25_26.csv),
+calendário (calendario_ligas.csv) e árbitros, para testar escala e benchmarks.
+
+Uso:
+    python synthetic_data.py --out /tmp/sintetico                       # 10 ligas, 1 temporada
+    python synthetic_data.py --out /tmp/grande --leagues 40 --seasons 20
+    python synthetic_data.py --out /tmp/x --teams 24 --played 0.7 --seed 7
+
+Modelo: cada time tem força de ataque/defesa (gols, finalizações e escanteios)
+e agressividade (faltas e cartões), com deriva entre temporadas. Escanteios e
+cartões seguem binomial negativa (sobredispersão como nos dados reais: média
+~5.2/4.6 escanteios e ~1.6/2.1 amarelos), ajustados pelo rigor do árbitro.
+Odds vêm de um modelo de Poisson para gols com margem por casa de aposta.
+
+Com o layout do app (padrão), as 10 primeiras ligas usam os nomes e arquivos de
+LEAGUE_FILES na temporada mais recente, então o app/bot/serviço carregam a pasta
+direto (search_paths=[pasta]). Ligas extras seguem o padrão Nome_AA_AA.csv e
+temporadas anteriores vão para historico/<código>/<temporada>.csv (SeasonStore);
+manifest.json lista tudo.
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from datetime import date, timedelta
+from math import factorial
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.config import CALENDAR_FILE, HISTORY_DIR, LEAGUE_CODES, LEAGUE_FILES, REFEREE_FACTORS_FILE, REFEREES_FILE
+from core.seasons import season_code, write_partition
+
+# Médias por jogo observadas nas ligas reais (mandante, visitante)
+BASE_RATES = {
+    'goals': (1.50, 1.20),
+    'shots': (13.3, 10.8),
+    'corners': (5.2, 4.6),
+    'fouls': (10.6, 11.0),
+    'yellows': (1.6, 2.1),
+    'reds': (0.055, 0.045)
+}
+# Variância = média * (1 + média / k) - k menor = mais sobredispersão
+NB_DISPERSION = {'corners': 12.0, 'yellows': 6.0, 'fouls': 40.0}
+
+# Casas de abertura/fechamento na ordem das colunas do football-data
+BOOKS_1X2 = {'B365': 0.055, 'BFD': 0.030, 'BMGM': 0.060, 'BV': 0.055, 'BW': 0.060,
+             'CL': 0.065, 'LB': 0.065, 'PS': 0.025}
+BOOKS_OU = {'B365': 0.060, 'P': 0.030}
+BOOKS_AH = {'B365': 0.055, 'P': 0.025}
+EXCHANGE_MARGIN = 0.015  # BFE (Betfair Exchange)
+
+KICKOFF_TIMES = ['12:30', '14:00', '15:00', '16:30', '17:30', '19:45', '20:00']
+
+CITY_NAMES = [
+    'Aurora', 'Bela Vista', 'Castelo', 'Dourados', 'Esmeralda', 'Fortaleza', 'Granada', 'Horizonte',
+    'Itaúna', 'Jacarandá', 'Lagoa', 'Monte Alto', 'Nova Era', 'Oriente', 'Palmeira', 'Quinta',
+    'Rio Claro', 'Serra', 'Terra Alta', 'União', 'Vale Verde', 'Xavantes', 'Ypiranga', 'Zênite'
+]
+CLUB_PREFIXES = ['FC', 'Atlético', 'Sporting', 'Real', 'União', 'Esporte', 'Racing', 'Olímpico']
+
+
+# ==============================================================================
+# ESTRUTURA (ligas, times, calendário)
+# ==============================================================================
+
+def season_label(start_year: int) -> str:
+    """2025 -> '25_26' (sufixo dos arquivos)"""
+    return f"{start_year % 100:02d}_{(start_year + 1) % 100:02d}"
+
+
+def file_stem(filename: str) -> str:
+    """'Premier_League_25_26.csv' -> 'Premier_League'"""
+    return re.sub(r'(_\d{2}_\d{2})?\.csv$', '', filename)
+
+
+def league_specs(n_leagues: int, app_layout: bool) -> List[Dict]:
+    specs = []
+    app_leagues = list(LEAGUE_FILES.items()) if app_layout else []
+    for i in range(n_leagues):
+        if i < len(app_leagues):
+            name, filename = app_leagues[i]
+            specs.append({'name': name, 'stem': file_stem(filename), 'app_file': filename, 'div': f"S{i + 1:02d}"})
+        else:
+            name = f"Liga Sintética {i + 1:02d}"
+            specs.append({'name': name, 'stem': f"Liga_Sintetica_{i + 1:02d}", 'app_file': None, 'div': f"S{i + 1:02d}"})
+    return specs
+
+
+def team_names(league_idx: int, n_teams: int) -> List[str]:
+    """Nomes únicos no conjunto todo (prefixo + cidade, com número da liga se precisar)"""
+    names = []
+    for t in range(n_teams):
+        city = CITY_NAMES[(t + league_idx * 7) % len(CITY_NAMES)]
+        prefix = CLUB_PREFIXES[(t // len(CITY_NAMES) + league_idx) % len(CLUB_PREFIXES)]
+        names.append(f"{prefix} {city} {league_idx + 1}")
+    return names
+
+
+def round_robin(n_teams: int, rng: np.random.Generator) -> List[List[Tuple[int, int]]]:
+    """Turno e returno pelo método do círculo: 2*(n-1) rodadas de n/2 jogos"""
+    teams = list(rng.permutation(n_teams))
+    if n_teams % 2:
+        teams.append(-1)  # folga
+    n = len(teams)
+    first_leg = []
+    for r in range(n - 1):
+        matches = []
+        for i in range(n // 2):
+            a, b = teams[i], teams[n - 1 - i]
+            if a >= 0 and b >= 0:
+                matches.append((a, b) if r % 2 == 0 else (b, a))
+        first_leg.append(matches)
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    second_leg = [[(b, a) for a, b in matches] for matches in first_leg]
+    return first_leg + second_leg
+
+
+def round_dates(start_year: int, n_rounds: int) -> List[date]:
+    """Uma rodada por semana a partir do 2º sábado de agosto, com pausa de inverno"""
+    first = date(start_year, 8, 8)
+    first += timedelta(days=(5 - first.weekday()) % 7)
+    dates = []
+    for r in range(n_rounds):
+        week = r + (3 if r >= n_rounds // 2 else 0)
+        dates.append(first + timedelta(weeks=week))
+    return dates
+
+
+# ==============================================================================
+# MODELO DOS JOGOS
+# ==============================================================================
+
+def _neg_binomial(rng: np.random.Generator, mean: np.ndarray, k: float) -> np.ndarray:
+    """Binomial negativa com média `mean` e dispersão k (Poisson-Gamma)"""
+    return rng.poisson(rng.gamma(k, np.maximum(mean, 1e-6) / k))
+
+
+def _odds(prob: np.ndarray, margin: float, rng: np.random.Generator) -> np.ndarray:
+    noise = rng.lognormal(0.0, 0.025, size=prob.shape)
+    return np.round(np.clip(1 / (prob * (1 + margin) * noise), 1.01, 51.0), 2)
+
+
+def _market_probs(lam_home: np.ndarray, lam_away: np.ndarray) -> Dict[str, np.ndarray]:
+    """1X2 e over 2.5 pelo modelo de Poisson independente (grade 0..10 gols)"""
+    goals = np.arange(11)
+    fact = np.array([factorial(g) for g in goals], dtype=float)
+    pmf_h = np.exp(-lam_home)[:, None] * lam_home[:, None] ** goals / fact
+    pmf_a = np.exp(-lam_away)[:, None] * lam_away[:, None] ** goals / fact
+    grid = pmf_h[:, :, None] * pmf_a[:, None, :]
+    home = np.tril(np.ones((11, 11)), -1)
+    p_home = (grid * home).sum(axis=(1, 2))
+    p_draw = np.einsum('nii->n', grid)
+    p_away = np.clip(1 - p_home - p_draw, 1e-4, 1)
+    total = lam_home + lam_away
+    p_under = np.exp(-total) * (1 + total + total ** 2 / 2)
+    return {'H': p_home, 'D': p_draw, 'A': p_away, 'over': 1 - p_under, 'under': p_under}
+
+
+def _odds_columns(lam_home: np.ndarray, lam_away: np.ndarray, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Colunas de odds (abertura, depois fechamento) na mesma ordem do football-data"""
+    cols = {}
+    opening = _market_probs(lam_home, lam_away)
+    # Fechamento: pequena deriva das forças até o apito (escalações, notícias)
+    drift = rng.normal(0, 0.06, size=lam_home.shape)
+    closing = _market_probs(lam_home * np.exp(drift), lam_away * np.exp(-drift))
+    handicap = np.round(-(lam_home - lam_away) * 1.6 * 4) / 4
+
+    for tag, probs in (('', opening), ('C', closing)):
+        books = {}
+        for book, margin in BOOKS_1X2.items():
+            for side in 'HDA':
+                books[(book, side)] = _odds(probs[side], margin, rng)
+                cols[f"{book}{tag}{side}"] = books[(book, side)]
+        for side in 'HDA':
+            cols[f"Max{tag}{side}"] = np.vstack([books[(b, side)] for b in BOOKS_1X2]).max(axis=0)
+        for side in 'HDA':
+            cols[f"Avg{tag}{side}"] = np.round(np.vstack([books[(b, side)] for b in BOOKS_1X2]).mean(axis=0), 2)
+        for side in 'HDA':
+            cols[f"BFE{tag}{side}"] = _odds(probs[side], EXCHANGE_MARGIN, rng)
+
+        ou = {}
+        for book, margin in BOOKS_OU.items():
+            ou[book] = (_odds(probs['over'], margin, rng), _odds(probs['under'], margin, rng))
+        for book in BOOKS_OU:
+            cols[f"{book}{tag}>2.5"], cols[f"{book}{tag}<2.5"] = ou[book]
+        cols[f"Max{tag}>2.5"] = np.maximum(*[ou[b][0] for b in BOOKS_OU])
+        cols[f"Max{tag}<2.5"] = np.maximum(*[ou[b][1] for b in BOOKS_OU])
+        cols[f"Avg{tag}>2.5"] = np.round(np.mean([ou[b][0] for b in BOOKS_OU], axis=0), 2)
+        cols[f"Avg{tag}<2.5"] = np.round(np.mean([ou[b][1] for b in BOOKS_OU], axis=0), 2)
+        cols[f"BFE{tag}>2.5"] = _odds(probs['over'], EXCHANGE_MARGIN, rng)
+        cols[f"BFE{tag}<2.5"] = _odds(probs['under'], EXCHANGE_MARGIN, rng)
+
+        line = handicap if tag == '' else handicap + rng.choice([-0.25, 0, 0, 0.25], size=handicap.shape)
+        cols[f"AH{tag}h"] = line
+        half = np.full(lam_home.shape, 0.5)
+        ah = {}
+        for book, margin in BOOKS_AH.items():
+            ah[book] = (_odds(half, margin, rng), _odds(half, margin, rng))
+            cols[f"{book}{tag}AHH"], cols[f"{book}{tag}AHA"] = ah[book]
+        cols[f"Max{tag}AHH"] = np.maximum(*[ah[b][0] for b in BOOKS_AH])
+        cols[f"Max{tag}AHA"] = np.maximum(*[ah[b][1] for b in BOOKS_AH])
+        cols[f"Avg{tag}AHH"] = np.round(np.mean([ah[b][0] for b in BOOKS_AH], axis=0), 2)
+        cols[f"Avg{tag}AHA"] = np.round(np.mean([ah[b][1] for b in BOOKS_AH], axis=0), 2)
+        cols[f"BFE{tag}AHH"] = _odds(half, EXCHANGE_MARGIN, rng)
+        cols[f"BFE{tag}AHA"] = _odds(half, EXCHANGE_MARGIN, rng)
+
+    return cols
+
+
+def simulate_matches(home_idx: np.ndarray, away_idx: np.ndarray, strength: Dict[str, np.ndarray],
+                     referee_factor: np.ndarray, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Estatísticas de todos os jogos de uma liga-temporada de uma vez"""
+    att, dfn, aggr = strength['attack'], strength['defense'], strength['aggression']
+    m = len(home_idx)
+
+    lam_home = BASE_RATES['goals'][0] * att[home_idx] / dfn[away_idx]
+    lam_away = BASE_RATES['goals'][1] * att[away_idx] / dfn[home_idx]
+    fthg, ftag = rng.poisson(lam_home), rng.poisson(lam_away)
+    hthg, htag = rng.binomial(fthg, 0.45), rng.binomial(ftag, 0.45)
+
+    dominance_home = np.sqrt(att[home_idx] / dfn[away_idx])
+    dominance_away = np.sqrt(att[away_idx] / dfn[home_idx])
+    hs = rng.poisson(BASE_RATES['shots'][0] * dominance_home)
+    as_ = rng.poisson(BASE_RATES['shots'][1] * dominance_away)
+    hst = np.maximum(rng.binomial(hs, 0.33), np.minimum(fthg, hs))
+    ast = np.maximum(rng.binomial(as_, 0.35), np.minimum(ftag, as_))
+
+    hc = _neg_binomial(rng, BASE_RATES['corners'][0] * dominance_home, NB_DISPERSION['corners'])
+    ac = _neg_binomial(rng, BASE_RATES['corners'][1] * dominance_away, NB_DISPERSION['corners'])
+
+    hf = _neg_binomial(rng, BASE_RATES['fouls'][0] * aggr[home_idx], NB_DISPERSION['fouls'])
+    af = _neg_binomial(rng, BASE_RATES['fouls'][1] * aggr[away_idx], NB_DISPERSION['fouls'])
+    hy = _neg_binomial(rng, BASE_RATES['yellows'][0] * aggr[home_idx] * referee_factor, NB_DISPERSION['yellows'])
+    ay = _neg_binomial(rng, BASE_RATES['yellows'][1] * aggr[away_idx] * referee_factor, NB_DISPERSION['yellows'])
+    hr = rng.poisson(BASE_RATES['reds'][0] * referee_factor, size=m)
+    ar = rng.poisson(BASE_RATES['reds'][1] * referee_factor, size=m)
+
+    result = np.where(fthg > ftag, 'H', np.where(fthg < ftag, 'A', 'D'))
+    half_result = np.where(hthg > htag, 'H', np.where(hthg < htag, 'A', 'D'))
+
+    return {
+        'FTHG': fthg, 'FTAG': ftag, 'FTR': result, 'HTHG': hthg, 'HTAG': htag, 'HTR': half_result,
+        'HS': hs, 'AS': as_, 'HST': np.minimum(hst, hs), 'AST': np.minimum(ast, as_),
+        'HF': hf, 'AF': af, 'HC': np.minimum(hc, 25), 'AC': np.minimum(ac, 25),
+        'HY': hy, 'AY': ay, 'HR': hr, 'AR': ar,
+        '_lam_home': lam_home, '_lam_away': lam_away
+    }
+
+
+# ==============================================================================
+# GERAÇÃO
+# ==============================================================================
+
+def generate_dataset(out_dir: str, n_leagues: int = 10, n_seasons: int = 1, n_teams: int = 20,
+                     last_season: int = 2025, played_fraction: float = 0.5, seed: int = 42,
+                     app_layout: bool = True) -> Dict:
+    """Grava ligas x temporadas, calendário e árbitros em out_dir e devolve o manifesto"""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    specs = league_specs(n_leagues, app_layout)
+    seasons = list(range(last_season - n_seasons + 1, last_season + 1))
+
+    manifest = {'seed': seed, 'teams_per_league': n_teams, 'seasons': [season_label(s) for s in seasons],
+                'leagues': {}, 'rows': 0}
+    calendar_parts = []
+    referee_rows = []
+    referee_factors = {}
+
+    for league_idx, spec in enumerate(specs):
+        teams = np.array(team_names(league_idx, n_teams), dtype=object)
+        n_refs = max(4, n_teams // 2 + 2)
+        refs = np.array([f"{chr(65 + r % 26)} Árbitro {league_idx + 1}-{r + 1}" for r in range(n_refs)], dtype=object)
+        ref_factor = np.clip(rng.normal(1.0, 0.15, n_refs), 0.6, 1.5)
+        referee_factors.update(dict(zip(refs, np.round(ref_factor, 2))))
+
+        strength = {
+            'attack': rng.lognormal(0, 0.18, n_teams),
+            'defense': rng.lognormal(0, 0.15, n_teams),
+            'aggression': rng.lognormal(0, 0.10, n_teams)
+        }
+        files = {}
+
+        for season in seasons:
+            label = season_label(season)
+            for key, sigma in (('attack', 0.06), ('defense', 0.05), ('aggression', 0.04)):
+                strength[key] = strength[key] * rng.lognormal(0, sigma, n_teams)
+
+            rounds = round_robin(n_teams, rng)
+            dates = round_dates(season, len(rounds))
+            n_played = len(rounds) if season != last_season else int(round(len(rounds) * played_fraction))
+
+            home_idx = np.array([h for r in rounds for h, _ in r])
+            away_idx = np.array([a for r in rounds for _, a in r])
+            round_of = np.array([i for i, r in enumerate(rounds) for _ in r])
+            day_offset = rng.integers(0, 3, size=len(home_idx))  # sábado a segunda
+            match_dates = [dates[r] + timedelta(days=int(d)) for r, d in zip(round_of, day_offset)]
+            kickoff = rng.choice(KICKOFF_TIMES, size=len(home_idx))
+
+            played = round_of < n_played
+            ref_idx = rng.integers(0, n_refs, size=len(home_idx))
+            stats = simulate_matches(home_idx[played], away_idx[played], strength, ref_factor[ref_idx[played]], rng)
+            lam_home, lam_away = stats.pop('_lam_home'), stats.pop('_lam_away')
+
+            df = pd.DataFrame({
+                'Div': spec['div'],
+                'Date': [d.strftime('%d/%m/%Y') for d, p in zip(match_dates, played) if p],
+                'Time': kickoff[played],
+                'HomeTeam': teams[home_idx[played]],
+                'AwayTeam': teams[away_idx[played]],
+                'FTHG': stats['FTHG'], 'FTAG': stats['FTAG'], 'FTR': stats['FTR'],
+                'HTHG': stats['HTHG'], 'HTAG': stats['HTAG'], 'HTR': stats['HTR'],
+                'Referee': refs[ref_idx[played]],
+                **{k: stats[k] for k in ('HS', 'AS', 'HST', 'AST', 'HF', 'AF', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR')},
+                **_odds_columns(lam_home, lam_away, rng)
+            })
+
+            if season == last_season:
+                filename = spec['app_file'] or f"{spec['stem']}_{label}.csv"
+                df.to_csv(os.path.join(out_dir, filename), index=False)
+            else:
+                # Temporadas encerradas vão para as partições historico/<código>/<temporada>.csv
+                code = LEAGUE_CODES.get(spec['name'], spec['div'])
+                write_partition(os.path.join(out_dir, HISTORY_DIR), code, season_code(season),
+                                df.to_csv(index=False).encode('utf-8'))
+                filename = os.path.join(HISTORY_DIR, code, f"{season_code(season)}.csv")
+            files[label] = filename
+            manifest['rows'] += len(df)
+
+            if season == last_season:
+                referee_rows.append(df[['Referee', 'HY', 'AY', 'HR', 'AR']].assign(Liga=spec['name']))
+                upcoming = ~played
+                calendar_parts.append(pd.DataFrame({
+                    'Data': [d.strftime('%d/%m/%Y') for d, u in zip(match_dates, upcoming) if u],
+                    'Hora': kickoff[upcoming],
+                    'Liga': spec['name'],
+                    'Time_Casa': teams[home_idx[upcoming]],
+                    'Time_Visitante': teams[away_idx[upcoming]]
+                }))
+
+        manifest['leagues'][spec['name']] = {'div': spec['div'], 'files': files}
+
+    calendar = pd.concat(calendar_parts, ignore_index=True) if calendar_parts else pd.DataFrame(
+        columns=['Data', 'Hora', 'Liga', 'Time_Casa', 'Time_Visitante'])
+    calendar.to_csv(os.path.join(out_dir, CALENDAR_FILE), index=False)
+
+    write_referee_files(out_dir, referee_rows, referee_factors)
+    manifest['calendar'] = CALENDAR_FILE
+    manifest['referees'] = [REFEREES_FILE, REFEREE_FACTORS_FILE]
+
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def write_referee_files(out_dir: str, referee_rows: List[pd.DataFrame], factors: Dict[str, float]):
+    """arbitros_5_ligas_*.csv (médias da temporada atual) e arbitros.csv (Nome, Fator)"""
+    if referee_rows:
+        games = pd.concat(referee_rows, ignore_index=True)
+        per_ref = games.groupby(['Liga', 'Referee']).agg(
+            Jogos_Apitados=('HY', 'size'),
+            Amarelos=('HY', 'sum'), Amarelos_F=('AY', 'sum'),
+            Vermelhos=('HR', 'sum'), Vermelhos_F=('AR', 'sum')
+        ).reset_index()
+        per_ref['Cartoes_Amarelos'] = per_ref['Amarelos'] + per_ref['Amarelos_F']
+        per_ref['Cartoes_Vermelhos'] = per_ref['Vermelhos'] + per_ref['Vermelhos_F']
+        per_ref['Total_Cartoes'] = per_ref['Cartoes_Amarelos'] + per_ref['Cartoes_Vermelhos']
+        per_ref['Media_Cartoes_Por_Jogo'] = (per_ref['Total_Cartoes'] / per_ref['Jogos_Apitados']).round(1)
+        per_ref = per_ref.rename(columns={'Referee': 'Arbitro'})[
+            ['Liga', 'Arbitro', 'Media_Cartoes_Por_Jogo', 'Jogos_Apitados',
+             'Cartoes_Amarelos', 'Cartoes_Vermelhos', 'Total_Cartoes']]
+    else:
+        per_ref = pd.DataFrame(columns=['Liga', 'Arbitro', 'Media_Cartoes_Por_Jogo', 'Jogos_Apitados',
+                                        'Cartoes_Amarelos', 'Cartoes_Vermelhos', 'Total_Cartoes'])
+    per_ref.to_csv(os.path.join(out_dir, REFEREES_FILE), index=False)
+
+    pd.DataFrame({'Nome': list(factors.keys()), 'Fator': list(factors.values())}).to_csv(
+        os.path.join(out_dir, REFEREE_FACTORS_FILE), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera CSVs sintéticos no formato football-data.co.uk")
+    parser.add_argument('--out', required=True, help="Pasta de saída")
+    parser.add_argument('--leagues', type=int, default=10)
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--teams', type=int, default=20, help="Times por liga")
+    parser.add_argument('--last-season', type=int, default=2025, help="Ano de início da temporada atual")
+    parser.add_argument('--played', type=float, default=0.5, help="Fração já jogada da temporada atual")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-app-layout', action='store_true', help="Não usa os nomes de LEAGUE_FILES")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    manifest = generate_dataset(
+        args.out, n_leagues=args.leagues, n_seasons=args.seasons, n_teams=args.teams,
+        last_season=args.last_season, played_fraction=args.played, seed=args.seed,
+        app_layout=not args.no_app_layout
+    )
+    n_files = sum(len(l['files']) for l in manifest['leagues'].values())
+    print(f"✅ {manifest['rows']:,} jogos em {n_files} arquivos ({len(manifest['leagues'])} ligas x "
+          f"{len(manifest['seasons'])} temporadas) -> {args.out}  [{time.perf_counter() - t0:.1f}s]")
+
+
+if __name__ == '__main__':
+    main()